@@ -1,11 +1,93 @@
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
+from app.enums.ai import EVectorDType
+from app.enums.database import EDatabaseProfile
+
 # Load environment variables from .env
 load_dotenv()
 
 
 class Config(BaseSettings):
-    pass
+    # Chat database
+    DB_PATH: str = "focal_first_ai.db"
+    DB_COLD_PATH: str = "focal_first_ai_cold.db"  # Archived chat sessions
+    DB_PROFILE: EDatabaseProfile = EDatabaseProfile.PRODUCTION
+    DB_ECHO: bool = False  # Log every SQL statement
+    DB_MMAP_SIZE: int = 256 * 1024 * 1024  # Bytes of the database file read through mmap
+    DB_CACHE_SIZE: int = 64 * 1024  # KiB of page cache per connection
+    DB_BUSY_TIMEOUT: int = 5000  # Milliseconds a connection waits for a lock before failing
+    DB_READ_POOL_SIZE: int = 16  # Connections for concurrent readers; writes use a single connection
+
+    # Message compression
+    COMPRESSION_MIN_BYTES: int = 512  # Message bodies from this size on are stored zstd-compressed
+    COMPRESSION_LEVEL: int = 3
+    COMPRESSION_DICT_SIZE: int = 64 * 1024  # Bytes of the shared dictionary trained on stored messages
+    COMPRESSION_DICT_SAMPLES: int = 4000  # Messages sampled to train the dictionary
+    COMPRESSION_DICT_MIN_SAMPLES: int = 200  # Large messages needed before a dictionary is trained
+    COMPRESSION_BATCH_SIZE: int = 200  # Existing messages compressed per background write
+
+    # LLM client registry
+    LLM_CLIENT_POOL_SIZE: int = 32  # Maximum number of cached LLM clients
+    LLM_CLIENT_IDLE_TTL: float = 900.0  # Seconds an unused client is kept alive
+
+    # Exact-match response cache
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_DB_PATH: str = "focal_first_ai_cache.db"
+    RESPONSE_CACHE_MEMORY_ENTRIES: int = 256
+    RESPONSE_CACHE_TTL: float = 7 * 24 * 3600.0  # Seconds
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # Semantic response cache
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_THRESHOLD: float = 0.92  # Minimum cosine similarity to serve a cached answer
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 2048
+    SEMANTIC_CACHE_EMBEDDING_MODEL: str = "nomic-embed-text"
+
+    # LLM scheduler
+    SCHEDULER_OLLAMA_CONCURRENCY: int = 2  # Concurrent calls on the local Ollama instance
+    SCHEDULER_REMOTE_CONCURRENCY: int = 8  # Concurrent calls per remote provider
+    SCHEDULER_MAX_QUEUE_DEPTH: int = 32
+    SCHEDULER_QUEUE_TIMEOUT: float = 60.0  # Seconds a call may wait for a free slot
+
+    # Background title generation
+    TITLE_BATCH_SIZE: int = 4  # Sessions titled by one LLM call when the backend is idle
+
+    # Session history cache for delta requests
+    HISTORY_CACHE_SESSIONS: int = 128
+
+    # Context window
+    CONTEXT_DEFAULT_MAX_TOKENS: int = 4096  # Used when the model has no `AIModel.max_tokens`
+    CONTEXT_RESPONSE_RESERVE: float = 0.25  # Share of the window kept free for the answer
+    CONTEXT_SUMMARY_SHARE: float = 0.2  # Share of the prompt budget given to the rolling summary
+
+    # Chat session list
+    SESSION_COUNT_TTL: int = 30  # Seconds a cached session total is served, changes through the API reset it
+    SESSION_VERSION_CACHE_SIZE: int = 1024  # Sessions whose version is kept in memory for ETag checks
+    READ_CACHE_MAX_BYTES: int = 16 * 1024 * 1024  # Rendered session lists and conversations kept in memory
+
+    # Database writes
+    WRITE_BATCH_WINDOW: float = 0.002  # Seconds the writer waits for more writes to commit together
+    WRITE_BATCH_MAX: int = 64  # Writes committed by one transaction at most
+    VACUUM_PAGES_PER_STEP: int = 512  # Free pages returned to the file system by one background write
+    FTS_MERGE_PAGES: int = 16  # Full-text index pages rewritten by one background write after deletes
+
+    # Message search
+    SEARCH_MAX_CANDIDATES: int = 5000  # Newest matches ranked per query, bounds the cost of very common words
+
+    # Document embeddings
+    EMBEDDING_DTYPE: EVectorDType = EVectorDType.FLOAT32  # Element type of stored chunk embeddings
+
+    # Chat history export and import
+    EXPORT_BATCH_SIZE: int = 1000  # Rows fetched per cursor round trip, and lines per streamed chunk
+    IMPORT_BATCH_SIZE: int = 2000  # Records written by one transaction
+
+    # Backups
+    BACKUP_DIRECTORY: str = "backups"  # Default target of local backups
+    BACKUP_PAGES_PER_STEP: int = 1024  # Database pages copied by one step of a full backup
+    BACKUP_STEP_SLEEP: float = 0.005  # Seconds between two steps, leaves the disk to the app
+    BACKUP_FULL_EVERY: int = 7  # Scheduled backups per full one, the others are incremental
+    BACKUP_COMPRESSION_LEVEL: int = 3
+    BACKUP_CHECK_INTERVAL: float = 60.0  # Seconds between two looks for due backup configurations
 
 config = Config()
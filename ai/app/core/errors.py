@@ -0,0 +1,23 @@
+class LLMSchedulerError(Exception):
+    """
+    Base error for LLM calls rejected by the scheduler, carrying the HTTP status to report.
+    """
+    status_code: int = 503
+
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+
+
+class QueueFullError(LLMSchedulerError):
+    """
+    Raised when the backend's wait queue is already at its depth limit.
+    """
+    status_code = 429
+
+
+class QueueTimeoutError(LLMSchedulerError):
+    """
+    Raised when a queued call waited longer than the queue timeout for a free slot.
+    """
+    status_code = 503
@@ -0,0 +1,117 @@
+import os
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Connection, Engine, MetaData, create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .compression import register_sql_functions
+from .migrations import LATEST_VERSION, create_document_chunks, create_message_index
+from .schema import ChatMessage, ChatSession, Document, DocumentChunk
+
+# Schema names of the two tiers on a connection
+HOT = "main"
+COLD = "cold"
+
+# Tables of an archived session, in the order rows are copied
+COLD_TABLES = [ChatSession.__table__, ChatMessage.__table__, Document.__table__, DocumentChunk.__table__]
+
+# Pragmas of the engine profile that apply to one attached file rather than to the whole connection
+SCHEMA_PRAGMAS = ("synchronous", "mmap_size", "cache_size")
+
+
+class ColdStorage:
+    """
+    Separate SQLite file holding archived chat sessions, with their messages, documents and full-text index.
+
+    Archived sessions are rarely opened, so keeping them out of the main file keeps its tables and indexes small
+    enough to stay in the page cache. The file is attached to a connection as the `cold` schema only when a query
+    needs it, and stays attached for the connection's lifetime. Its tables have the same names as in the main
+    file, so ORM queries read them through `options` (a schema translation) and SQL names them `cold.<table>`.
+    """
+
+    def __init__(self, path: str, pragmas: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.pragmas = pragmas or {}  # Of the engine profile, the file gets the same tuning as the main one
+        # The session table of the cold file, for Core statements that also touch tables of the main file
+        self.sessions = ChatSession.__table__.to_metadata(MetaData(), schema=COLD)
+
+    @property
+    def options(self) -> Dict[str, Any]:
+        """
+        Execution options running an ORM or Core statement on the cold tables.
+        """
+        return {"schema_translate_map": {None: COLD}}
+
+    def create(self) -> None:
+        """
+        Create the cold file with the current schema, or upgrade an existing one.
+        """
+        if os.path.exists(self.path):
+            self._upgrade()
+            return
+        engine = create_engine(f"sqlite:///{self.path}")
+
+        @event.listens_for(engine, "connect")
+        def _connect(dbapi_connection, _):
+            register_sql_functions(dbapi_connection)
+
+        with engine.begin() as connection:
+            # Both only take effect on an empty file
+            connection.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+            connection.exec_driver_sql(f"PRAGMA journal_mode = {self.pragmas.get('journal_mode', 'DELETE')}")
+            for table in COLD_TABLES:
+                table.create(connection)
+            create_message_index(connection)
+            connection.exec_driver_sql(f"PRAGMA user_version = {LATEST_VERSION}")
+        engine.dispose()
+
+    def _upgrade(self) -> None:
+        # Only version 9 changed the cold tables since the file was introduced
+        engine = create_engine(f"sqlite:///{self.path}")
+
+        @event.listens_for(engine, "connect")
+        def _connect(dbapi_connection, _):
+            # As in `migrate`, the rebuild of `documents` must not repoint foreign keys at the renamed table
+            dbapi_connection.execute("PRAGMA legacy_alter_table=ON")
+
+        try:
+            with engine.begin() as connection:
+                if connection.exec_driver_sql("PRAGMA user_version").scalar() < LATEST_VERSION:
+                    create_document_chunks(connection)
+                    connection.exec_driver_sql(f"PRAGMA user_version = {LATEST_VERSION}")
+        finally:
+            engine.dispose()
+
+    def _attach_statements(self) -> List[str]:
+        return [f"ATTACH DATABASE ? AS {COLD}"] + [
+            f"PRAGMA {COLD}.{pragma}={self.pragmas[pragma]}" for pragma in SCHEMA_PRAGMAS if pragma in self.pragmas
+        ]
+
+    def attach_on_connect(self, engine: Engine) -> None:
+        """
+        Attach the cold file to every new connection of `engine` right away.
+
+        ATTACH is refused inside a transaction, so connections that move sessions between the tiers as part of
+        larger writes need the file attached before their first one.
+        """
+        @event.listens_for(engine, "connect")
+        def _connect(dbapi_connection, connection_record):
+            attach, *pragmas = self._attach_statements()
+            dbapi_connection.execute(attach, (self.path,))
+            for pragma in pragmas:
+                dbapi_connection.execute(pragma)
+            connection_record.info[COLD] = True
+
+    def attach_connection(self, connection: Connection) -> None:
+        if not connection.info.get(COLD):
+            attach, *pragmas = self._attach_statements()
+            connection.exec_driver_sql(attach, (self.path,))
+            for pragma in pragmas:
+                connection.exec_driver_sql(pragma)
+            connection.info[COLD] = True
+
+    async def attach(self, db: AsyncSession) -> None:
+        """
+        Attach the cold file to the connection of `db`, unless it already is.
+        """
+        await (await db.connection()).run_sync(self.attach_connection)
@@ -0,0 +1,114 @@
+import threading
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+import zstandard
+from sqlalchemy import String, TypeDecorator
+
+from app.core.config import config
+
+SQL_DECOMPRESS = "ls_decompress"
+
+
+class MessageCodec:
+    """
+    zstd compression of large message bodies.
+
+    Bodies of at least `min_bytes` are stored as zstd frames (BLOBs), smaller ones and bodies that do not shrink
+    stay plain text, so both kinds live side by side in the same column. Frames are compressed with the newest
+    shared dictionary, trained on stored messages, once there is one; each frame records the ID of its dictionary,
+    so frames from before a dictionary existed stay readable.
+    """
+
+    def __init__(self, min_bytes: int = config.COMPRESSION_MIN_BYTES, level: int = config.COMPRESSION_LEVEL):
+        self.min_bytes = min_bytes
+        self.level = level
+        self._dictionaries: Dict[int, zstandard.ZstdCompressionDict] = {}
+        self._current: Optional[zstandard.ZstdCompressionDict] = None
+        # zstd contexts must not be shared between threads, SQLite runs the SQL function on connection threads
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def dictionary_id(self) -> int:
+        """
+        ID of the dictionary new frames are compressed with, 0 when there is none yet.
+        """
+        return self._current.dict_id() if self._current else 0
+
+    def add_dictionary(self, data: bytes) -> int:
+        """
+        Make a trained dictionary available for reading, and use it for new frames.
+
+        Returns:
+            int: The dictionary ID recorded in frames.
+        """
+        dictionary = zstandard.ZstdCompressionDict(data)
+        with self._lock:
+            self._dictionaries[dictionary.dict_id()] = dictionary
+            self._current = dictionary
+            self._local = threading.local()
+        return dictionary.dict_id()
+
+    def load_dictionaries(self, dictionaries: Iterable[bytes]) -> None:
+        for data in dictionaries:
+            self.add_dictionary(data)
+
+    def compress(self, text: str) -> Union[str, bytes]:
+        raw = text.encode("utf-8")
+        if len(raw) < self.min_bytes:
+            return text
+        frame = self._compressor().compress(raw)
+        return frame if len(frame) < len(raw) else text
+
+    def decompress(self, value: Union[str, bytes, None]) -> Optional[str]:
+        """
+        Text of a stored body, compressed or not. Also registered as the SQL function `ls_decompress`.
+        """
+        if not isinstance(value, bytes):
+            return value
+        dictionary_id = zstandard.get_frame_parameters(value).dict_id
+        return self._decompressor(dictionary_id).decompress(value).decode("utf-8")
+
+    def _compressor(self) -> zstandard.ZstdCompressor:
+        cached: Optional[Tuple[int, zstandard.ZstdCompressor]] = getattr(self._local, "compressor", None)
+        if cached is None or cached[0] != self.dictionary_id:
+            compressor = zstandard.ZstdCompressor(level=self.level, dict_data=self._current)
+            cached = self._local.compressor = (self.dictionary_id, compressor)
+        return cached[1]
+
+    def _decompressor(self, dictionary_id: int) -> zstandard.ZstdDecompressor:
+        decompressors = getattr(self._local, "decompressors", None)
+        if decompressors is None:
+            decompressors = self._local.decompressors = {}
+        decompressor = decompressors.get(dictionary_id)
+        if decompressor is None:
+            if dictionary_id and dictionary_id not in self._dictionaries:
+                raise ValueError(f"Message compressed with unknown dictionary {dictionary_id}")
+            decompressor = zstandard.ZstdDecompressor(dict_data=self._dictionaries.get(dictionary_id))
+            decompressors[dictionary_id] = decompressor
+        return decompressor
+
+
+class CompressedText(TypeDecorator):
+    """
+    Text column whose large values are stored compressed by `message_codec`. Reads always return the text.
+    """
+    impl = String
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[str], dialect) -> Union[str, bytes, None]:
+        return None if value is None else message_codec.compress(value)
+
+    def process_result_value(self, value: Union[str, bytes, None], dialect) -> Optional[str]:
+        return message_codec.decompress(value)
+
+
+def register_sql_functions(dbapi_connection) -> None:
+    """
+    Add `ls_decompress(content)` to a SQLite connection, used by the full-text index to read message text.
+    """
+    dbapi_connection.create_function(SQL_DECOMPRESS, 1, message_codec.decompress, deterministic=True)
+
+
+# Shared codec of `ChatMessage.content`
+message_codec = MessageCodec()
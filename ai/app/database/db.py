@@ -1,25 +1,61 @@
-from sqlalchemy import create_engine
+from typing import AsyncGenerator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 
-from .schema import Base
+from app.core.config import config
+from .cold_storage import ColdStorage
+from .compression import message_codec
+from .engine_profiles import get_profile, create_sync_engine, create_async_sqlite_engine
+from .migrations import migrate
+from .schema import CompressionDictionary
 
 # SQLite database file
-DATABASE_URL = "sqlite:///focal_first_ai.db"
+DATABASE_PATH = config.DB_PATH
+DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
+ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{DATABASE_PATH}"
+
+# Pragmas, pool sizes and SQL logging of the engines, chosen by `config.DB_PROFILE`
+profile = get_profile()
+
+# Archived chat sessions live in a second file, attached as the `cold` schema when needed
+cold_storage = ColdStorage(config.DB_COLD_PATH, profile.pragmas)
 
 # Create the database engine
-engine = create_engine(
-    DATABASE_URL,
-    echo=True,
-    pool_size=10,
-    max_overflow=20,
-    pool_timeout=30
-)
+engine = create_sync_engine(DATABASE_URL, profile)
 
 # Create the session factory
 Session = sessionmaker(autocommit=False, autoflush=False,bind=engine)
 
-# Create tables in the database (if not already created)
-Base.metadata.create_all(engine)
+# Async engine and session factory over the same file, for use in async routes
+async_engine = create_async_sqlite_engine(ASYNC_DATABASE_URL, profile)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# Session factory of `db_writer`: one connection of its own when the profile has a dedicated writer
+async_write_engine = (
+    create_async_sqlite_engine(ASYNC_DATABASE_URL, profile, pool_size=1) if profile.dedicated_writer else async_engine
+)
+AsyncWriteSessionLocal = async_sessionmaker(
+    async_write_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+# Writes move archived sessions between the files inside their transactions
+cold_storage.attach_on_connect(async_write_engine.sync_engine)
+
+
+def init_database() -> None:
+    """
+    Create or upgrade both database files and load what reading them needs. Runs once at app startup, before
+    any query; nothing touches the files at import.
+    """
+    migrate(DATABASE_URL)
+    cold_storage.create()
+
+    # Dictionaries of compressed message bodies, needed to read them
+    with engine.connect() as connection:
+        message_codec.load_dictionaries(connection.scalars(
+            select(CompressionDictionary.dictionary).order_by(CompressionDictionary.created_at)
+        ))
 
 
 # Dependency to get the database session
@@ -29,3 +65,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Dependency to get an async database session, which does not block the event loop
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
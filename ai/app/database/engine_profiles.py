@@ -0,0 +1,86 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.core.config import config
+from app.enums.database import EDatabaseProfile
+from .compression import register_sql_functions
+
+
+@dataclass(frozen=True)
+class EngineProfile:
+    """
+    How the app's SQLite engines are tuned: the pragmas set on every new connection and the pool sizes.
+
+    SQLite runs any number of readers but a single writer at a time, and in WAL mode readers do not block on it.
+    Profiles with `dedicated_writer` therefore give reads a pool and writes one connection of their own, which
+    the single `db_writer` task keeps busy.
+    """
+    name: EDatabaseProfile
+    pragmas: Dict[str, Any] = field(default_factory=dict)  # Applied in order on every new connection
+    pool_size: int = 5
+    max_overflow: int = 10
+    dedicated_writer: bool = False
+
+
+def get_profile(name: EDatabaseProfile = config.DB_PROFILE) -> EngineProfile:
+    """
+    Engine profile `name`, with sizes taken from the config.
+    """
+    # Referential integrity is not a tuning knob, every profile enforces foreign keys
+    pragmas: Dict[str, Any] = {"foreign_keys": "ON", "busy_timeout": config.DB_BUSY_TIMEOUT}
+    if name == EDatabaseProfile.DEFAULT:
+        pragmas.update({"journal_mode": "DELETE", "synchronous": "FULL"})
+        return EngineProfile(name=name, pragmas=pragmas, pool_size=10, max_overflow=20)
+
+    pragmas.update({
+        # Readers never wait on the writer, and commits append to the log instead of rewriting pages
+        "journal_mode": "WAL",
+        # In WAL mode, NORMAL only fsyncs at checkpoints: a power loss may drop the last commits, never corrupts
+        "synchronous": "NORMAL",
+        "mmap_size": config.DB_MMAP_SIZE,
+        "cache_size": -config.DB_CACHE_SIZE,  # Negative sizes are in KiB
+        "temp_store": "MEMORY",
+    })
+    return EngineProfile(
+        name=name, pragmas=pragmas, pool_size=config.DB_READ_POOL_SIZE, max_overflow=0, dedicated_writer=True
+    )
+
+
+def _configure_connections(engine: Engine, pragmas: Dict[str, Any]) -> None:
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        for pragma, value in pragmas.items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+        cursor.close()
+        # The full-text index reads compressed message bodies through this function
+        register_sql_functions(dbapi_connection)
+
+
+def create_sync_engine(url: str, profile: EngineProfile) -> Engine:
+    """
+    Sync engine for `url`, tuned by `profile`.
+    """
+    engine = create_engine(
+        url, echo=config.DB_ECHO, pool_size=profile.pool_size, max_overflow=profile.max_overflow, pool_timeout=30
+    )
+    _configure_connections(engine, profile.pragmas)
+    return engine
+
+
+def create_async_sqlite_engine(url: str, profile: EngineProfile, pool_size: Optional[int] = None) -> AsyncEngine:
+    """
+    Async engine for `url`, tuned by `profile`. `pool_size` overrides the profile's pool, without overflow.
+    """
+    engine = create_async_engine(
+        url,
+        echo=config.DB_ECHO,
+        pool_size=pool_size or profile.pool_size,
+        max_overflow=0 if pool_size else profile.max_overflow,
+        pool_timeout=30
+    )
+    _configure_connections(engine.sync_engine, profile.pragmas)
+    return engine
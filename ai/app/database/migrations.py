@@ -0,0 +1,270 @@
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import Connection, create_engine, event
+
+from .compression import SQL_DECOMPRESS, register_sql_functions
+from .schema import Base, ChatMessage, ChatSession, CompressionDictionary, Document, DocumentChunk
+
+# A migration is `(version, description, upgrade)`; `upgrade` runs inside the migration's transaction
+Migration = Tuple[int, str, Callable[[Connection], None]]
+
+
+def _columns(connection: Connection, table: str) -> Dict[str, str]:
+    """
+    Column names of `table` mapped to their declared SQLite type.
+    """
+    return {row[1]: row[2].upper() for row in connection.exec_driver_sql(f"PRAGMA table_info({table})")}
+
+
+def _create_tables(connection: Connection) -> None:
+    # Only creates missing tables, so databases made by the old `create_all` at import are left as they are
+    Base.metadata.create_all(connection)
+
+
+def _rebuild_chat_messages(connection: Connection) -> None:
+    """
+    `chat_messages.session_id` was an INTEGER FK to `chat_sessions.id`, but always held the string session id.
+    Rebuild the table with a TEXT key referencing `chat_sessions.session_id`.
+    """
+    if _columns(connection, "chat_messages").get("session_id") != "INTEGER":
+        return
+
+    connection.exec_driver_sql("ALTER TABLE chat_messages RENAME TO chat_messages_old")
+    ChatMessage.__table__.create(connection)
+    # INTEGER affinity turned numeric-looking session ids into numbers, cast them back to text
+    connection.exec_driver_sql(
+        "INSERT INTO chat_messages (id, session_id, message_id, role, model, variant, content, created_at) "
+        "SELECT id, CAST(session_id AS TEXT), message_id, role, model, variant, content, created_at "
+        "FROM chat_messages_old"
+    )
+    connection.exec_driver_sql("DROP TABLE chat_messages_old")
+
+
+def _add_chat_indexes(connection: Connection) -> None:
+    for table in (ChatSession.__table__, ChatMessage.__table__):
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def _add_session_version(connection: Connection) -> None:
+    if "version" not in _columns(connection, "chat_sessions"):
+        connection.exec_driver_sql("ALTER TABLE chat_sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+
+def _add_message_search(connection: Connection) -> None:
+    """
+    Full-text index over `chat_messages.content`. It is an external content FTS5 table, so the text is stored
+    once; triggers keep the index in sync with every insert, update and delete, cascades included.
+    """
+    if "topic" not in _columns(connection, "chat_sessions"):
+        connection.exec_driver_sql("ALTER TABLE chat_sessions ADD COLUMN topic VARCHAR")
+
+    connection.exec_driver_sql(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS chat_messages_fts USING fts5("
+        "content, content='chat_messages', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2')"
+    )
+    connection.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS chat_messages_fts_insert AFTER INSERT ON chat_messages BEGIN "
+        "INSERT INTO chat_messages_fts (rowid, content) VALUES (new.id, new.content); END"
+    )
+    connection.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS chat_messages_fts_delete AFTER DELETE ON chat_messages BEGIN "
+        "INSERT INTO chat_messages_fts (chat_messages_fts, rowid, content) VALUES ('delete', old.id, old.content); END"
+    )
+    connection.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS chat_messages_fts_update AFTER UPDATE OF content ON chat_messages BEGIN "
+        "INSERT INTO chat_messages_fts (chat_messages_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+        "INSERT INTO chat_messages_fts (rowid, content) VALUES (new.id, new.content); END"
+    )
+    # Index the messages stored before the search existed
+    connection.exec_driver_sql("INSERT INTO chat_messages_fts (chat_messages_fts) VALUES ('rebuild')")
+
+
+def create_message_index(connection: Connection) -> None:
+    """
+    Full-text index of `chat_messages`, kept in sync by triggers. Shared with the cold storage file.
+
+    The index reads the text through the `chat_messages_text` view, which decompresses stored bodies.
+    """
+    connection.exec_driver_sql(
+        "CREATE VIEW IF NOT EXISTS chat_messages_text AS "
+        f"SELECT id, {SQL_DECOMPRESS}(content) AS content FROM chat_messages"
+    )
+    connection.exec_driver_sql(
+        "CREATE VIRTUAL TABLE chat_messages_fts USING fts5("
+        "content, content='chat_messages_text', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2')"
+    )
+    connection.exec_driver_sql(
+        "CREATE TRIGGER chat_messages_fts_insert AFTER INSERT ON chat_messages BEGIN "
+        f"INSERT INTO chat_messages_fts (rowid, content) VALUES (new.id, {SQL_DECOMPRESS}(new.content)); END"
+    )
+    connection.exec_driver_sql(
+        "CREATE TRIGGER chat_messages_fts_delete AFTER DELETE ON chat_messages BEGIN "
+        "INSERT INTO chat_messages_fts (chat_messages_fts, rowid, content) "
+        f"VALUES ('delete', old.id, {SQL_DECOMPRESS}(old.content)); END"
+    )
+    # Compressing a stored body rewrites the column but not the text, which needs no reindexing
+    connection.exec_driver_sql(
+        "CREATE TRIGGER chat_messages_fts_update AFTER UPDATE OF content ON chat_messages "
+        f"WHEN {SQL_DECOMPRESS}(old.content) IS NOT {SQL_DECOMPRESS}(new.content) BEGIN "
+        "INSERT INTO chat_messages_fts (chat_messages_fts, rowid, content) "
+        f"VALUES ('delete', old.id, {SQL_DECOMPRESS}(old.content)); "
+        f"INSERT INTO chat_messages_fts (rowid, content) VALUES (new.id, {SQL_DECOMPRESS}(new.content)); END"
+    )
+
+
+def _index_decompressed_content(connection: Connection) -> None:
+    """
+    Large message bodies are now stored compressed, so the full-text index reads the text through the
+    `chat_messages_text` view, which decompresses it. The index has to be recreated on the view and rebuilt.
+    """
+    CompressionDictionary.__table__.create(connection, checkfirst=True)
+    for trigger in ("insert", "delete", "update"):
+        connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS chat_messages_fts_{trigger}")
+    connection.exec_driver_sql("DROP TABLE IF EXISTS chat_messages_fts")
+
+    create_message_index(connection)
+    connection.exec_driver_sql("INSERT INTO chat_messages_fts (chat_messages_fts) VALUES ('rebuild')")
+
+
+def _cascade_session_documents(connection: Connection) -> None:
+    """
+    `documents.session_id` had no `ON DELETE CASCADE`, so deleting a session left its documents behind. SQLite
+    cannot alter a foreign key, rebuild the table with it.
+    """
+    foreign_keys = connection.exec_driver_sql("PRAGMA foreign_key_list(documents)").all()
+    if any(row[6] == "CASCADE" for row in foreign_keys):
+        return
+
+    connection.exec_driver_sql("ALTER TABLE documents RENAME TO documents_old")
+    Document.__table__.create(connection)
+    connection.exec_driver_sql(
+        "INSERT INTO documents (id, session_id, file_path, uploaded_at, embedding) "
+        "SELECT id, session_id, file_path, uploaded_at, embedding FROM documents_old"
+    )
+    connection.exec_driver_sql("DROP TABLE documents_old")
+
+
+def _add_backup_details(connection: Connection) -> None:
+    columns = _columns(connection, "backups")
+    for column, definition in [
+        ("kind", "VARCHAR NOT NULL DEFAULT 'full'"),
+        ("parent_id", "INTEGER REFERENCES backups (id)"),
+        ("duration", "FLOAT"),
+        ("source_bytes", "INTEGER"),
+        ("size_bytes", "INTEGER"),
+        ("throughput", "FLOAT"),
+        ("sessions", "INTEGER"),
+        ("checksum", "VARCHAR"),
+        ("error", "VARCHAR"),
+    ]:
+        if column not in columns:
+            connection.exec_driver_sql(f"ALTER TABLE backups ADD COLUMN {column} {definition}")
+    if "target_directory" not in _columns(connection, "backup_configurations"):
+        connection.exec_driver_sql("ALTER TABLE backup_configurations ADD COLUMN target_directory VARCHAR")
+
+
+def create_document_chunks(connection: Connection) -> None:
+    """
+    Embeddings move from one untyped blob per document to `document_chunks`, one packed vector per chunk. The
+    app never wrote `documents.embedding` and its format is unknown, so the column is kept as it is, but the
+    table is rebuilt to make it nullable. Also upgrades the cold file, which has its own `documents` table.
+    """
+    embedding = [row for row in connection.exec_driver_sql("PRAGMA table_info(documents)") if row[1] == "embedding"]
+    if embedding and embedding[0][3]:  # NOT NULL
+        connection.exec_driver_sql("ALTER TABLE documents RENAME TO documents_old")
+        Document.__table__.create(connection)
+        connection.exec_driver_sql(
+            "INSERT INTO documents (id, session_id, file_path, uploaded_at, embedding) "
+            "SELECT id, session_id, file_path, uploaded_at, embedding FROM documents_old"
+        )
+        connection.exec_driver_sql("DROP TABLE documents_old")
+    DocumentChunk.__table__.create(connection, checkfirst=True)
+
+
+# Ordered list of every schema change. Never edit a released migration, append a new one instead.
+MIGRATIONS: List[Migration] = [
+    (1, "Create missing tables", _create_tables),
+    (2, "Key chat messages by the string session id", _rebuild_chat_messages),
+    (3, "Add indexes for conversation and session list queries", _add_chat_indexes),
+    (4, "Add a version counter to chat sessions", _add_session_version),
+    (5, "Add full-text search over chat messages", _add_message_search),
+    (6, "Index chat messages through a decompressing view", _index_decompressed_content),
+    (7, "Delete documents together with their chat session", _cascade_session_documents),
+    (8, "Record timing, size and checksum of backups", _add_backup_details),
+    (9, "Store document embeddings per chunk as packed vectors", create_document_chunks),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_version(connection: Connection) -> int:
+    return connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def _enable_incremental_vacuum(engine) -> None:
+    """
+    Let the pages freed by deletes be returned to the file system with `PRAGMA incremental_vacuum`.
+
+    The auto-vacuum mode of an existing database only changes with a full VACUUM, which cannot run inside a
+    transaction, so this is done once, outside the migrations.
+    """
+    connection = engine.raw_connection()
+    try:
+        if connection.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:  # 2 is INCREMENTAL
+            print("Switching the database to incremental vacuum")
+            connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            connection.execute("VACUUM")
+    finally:
+        connection.close()
+
+
+def migrate(database_url: str) -> int:
+    """
+    Upgrade the database at `database_url` to the latest schema version, tracked in `PRAGMA user_version`.
+
+    Each pending migration runs in its own transaction, together with the version bump, so an interrupted
+    upgrade resumes from the last completed step. Foreign keys are off while migrating, and renames leave the
+    foreign keys of other tables on the original name, as tables get rebuilt. The database is also switched to
+    incremental auto-vacuum, once.
+
+    Args:
+        database_url (str): SQLAlchemy URL of the SQLite database.
+
+    Returns:
+        int: The schema version of the database after migrating.
+    """
+    engine = create_engine(database_url)
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, _):
+        # Let SQLite handle transactions itself, so DDL is transactional too
+        dbapi_connection.isolation_level = None
+        dbapi_connection.execute("PRAGMA foreign_keys=OFF")
+        # Tables are rebuilt by renaming the old one away: keep foreign keys of other tables on the original name
+        dbapi_connection.execute("PRAGMA legacy_alter_table=ON")
+        register_sql_functions(dbapi_connection)
+
+    @event.listens_for(engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    try:
+        with engine.begin() as connection:
+            version = get_version(connection)
+        if version > LATEST_VERSION:
+            print(f"Database schema version {version} is newer than this app ({LATEST_VERSION}), skipping migrations.")
+            return version
+
+        for target, description, upgrade in MIGRATIONS:
+            if target <= version:
+                continue
+            with engine.begin() as connection:
+                print(f"Migrating database to version {target}: {description}")
+                upgrade(connection)
+                connection.exec_driver_sql(f"PRAGMA user_version = {int(target)}")
+            version = target
+        _enable_incremental_vacuum(engine)
+        return version
+    finally:
+        engine.dispose()
@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import List, Optional
 
 from pygments.lexer import default
-from sqlalchemy import Column, ForeignKey, Table
+from sqlalchemy import Column, ForeignKey, Index, Table
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import (
     relationship,
@@ -11,6 +11,7 @@ from sqlalchemy.orm import (
 )
 
 from app.enums.chat import ERole
+from .compression import CompressedText
 
 Base = declarative_base()
 
@@ -65,6 +66,10 @@ class ChatSession(Base):
     Represents a chat session with associated metadata.
     """
     __tablename__ = "chat_sessions"
+    __table_args__ = (
+        Index("ix_chat_sessions_archived_favorite_created_at", "archived", "favorite", "created_at"),
+        Index("ix_chat_sessions_created_at", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     session_name: Mapped[str] = mapped_column(default="Unknown")
@@ -72,9 +77,17 @@ class ChatSession(Base):
     archived: Mapped[bool] = mapped_column(default=False)
     favorite: Mapped[bool] = mapped_column(default=False)
     created_at: Mapped[datetime] = mapped_column(default=datetime.now)
+    version: Mapped[int] = mapped_column(default=0, server_default="0")  # Bumped on every change, for ETags
+    topic: Mapped[Optional[str]]  # E.g. "code", to narrow searches
 
     # Relationship to ChatMessage
-    messages: Mapped[List["ChatMessage"]] = relationship("ChatMessage", back_populates="chat_session")
+    messages: Mapped[List["ChatMessage"]] = relationship(
+        "ChatMessage", back_populates="chat_session", cascade="all, delete-orphan", passive_deletes=True
+    )
+    # Relationship to Document, deleted with the session by the database
+    documents: Mapped[List["Document"]] = relationship(
+        "Document", back_populates="chat_session", cascade="all, delete-orphan", passive_deletes=True
+    )
 
     def __repr__(self):
         return f"ChatSession(id={self.id}, session_name={self.session_name}, session_id={self.session_id}, archived={self.archived}, favorite={self.favorite}, created_at={self.created_at})"
@@ -85,34 +98,95 @@ class ChatMessage(Base):
     Represents individual chat messages within a session.
     """
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("ix_chat_messages_session_id_created_at", "session_id", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    session_id: Mapped[int] = mapped_column(ForeignKey("chat_sessions.id"), nullable=False)
+    session_id: Mapped[str] = mapped_column(
+        ForeignKey("chat_sessions.session_id", ondelete="CASCADE"), nullable=False
+    )
     message_id: Mapped[str] = mapped_column(unique=True, nullable=False)
     role: Mapped[ERole] = mapped_column(nullable=ERole.ASSISTANT)
     model: Mapped[str] = mapped_column(nullable=True)
     variant: Mapped[str] = mapped_column(nullable=True)
-    content: Mapped[str] = mapped_column(nullable=False)
+    content: Mapped[str] = mapped_column(CompressedText, nullable=False)  # Large bodies are stored compressed
     created_at: Mapped[datetime] = mapped_column(default=datetime.now)
 
     # Back-reference to the ChatSession
     chat_session: Mapped["ChatSession"] = relationship("ChatSession", back_populates="messages")
 
 
+class CompressionDictionary(Base):
+    """
+    Shared zstd dictionary trained on stored messages, for compressing `ChatMessage.content`.
+    """
+    __tablename__ = "compression_dictionaries"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)  # zstd dictionary ID, kept in every frame
+    dictionary: Mapped[bytes] = mapped_column(nullable=False)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.now)
+
+
+class ChatSessionSummary(Base):
+    """
+    Rolling summary of the oldest messages of a chat session, extended as the conversation outgrows the context window.
+    """
+    __tablename__ = "chat_session_summaries"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    session_id: Mapped[str] = mapped_column(unique=True, nullable=False)
+    summary: Mapped[str] = mapped_column(nullable=False)
+    covered_messages: Mapped[int] = mapped_column(default=0)  # Number of leading messages in the summary
+    last_message_id: Mapped[Optional[str]]  # Last message in the summary, to detect edited history
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.now, onupdate=datetime.now)
+
+
 class Document(Base):
     """
     Represents a document uploaded and associated with a chat session.
     """
     __tablename__ = "documents"
+    __table_args__ = (
+        Index("ix_documents_session_id", "session_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    session_id: Mapped[int] = mapped_column(ForeignKey("chat_sessions.id"), nullable=False)
+    session_id: Mapped[int] = mapped_column(ForeignKey("chat_sessions.id", ondelete="CASCADE"), nullable=False)
     file_path: Mapped[str] = mapped_column(nullable=False)
     uploaded_at: Mapped[datetime] = mapped_column(default=datetime.now)
-    embedding: Mapped[bytes] = mapped_column()
+    embedding: Mapped[Optional[bytes]]  # Legacy, never written: embeddings are stored per chunk in `DocumentChunk`
 
     # Relationship to ChatSession
-    chat_session: Mapped["ChatSession"] = relationship("ChatSession")
+    chat_session: Mapped["ChatSession"] = relationship("ChatSession", back_populates="documents")
+
+    # Relationship to DocumentChunk, deleted with the document by the database
+    chunks: Mapped[List["DocumentChunk"]] = relationship(
+        "DocumentChunk", back_populates="document", cascade="all, delete-orphan", passive_deletes=True,
+        order_by="DocumentChunk.chunk_index"
+    )
+
+
+class DocumentChunk(Base):
+    """
+    Represents one chunk of a document and its embedding, a packed vector (see `app.database.vectors`).
+    """
+    __tablename__ = "document_chunks"
+    __table_args__ = (
+        Index("ix_document_chunks_document_id", "document_id", "model", "chunk_index", unique=True),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    document_id: Mapped[int] = mapped_column(ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
+    chunk_index: Mapped[int] = mapped_column(nullable=False)  # Position of the chunk in the document
+    content: Mapped[Optional[str]] = mapped_column(CompressedText)
+    model: Mapped[str] = mapped_column(nullable=False)  # Embedding model, vectors of different models don't compare
+    dimension: Mapped[int] = mapped_column(nullable=False)
+    dtype: Mapped[str] = mapped_column(default="float32")  # "float32" or "float16"
+    embedding: Mapped[bytes] = mapped_column(nullable=False)  # `dimension` little-endian `dtype` values
+
+    # Relationship to Document
+    document: Mapped["Document"] = relationship("Document", back_populates="chunks")
 
 
 class BackupConfiguration(Base):
@@ -126,6 +200,7 @@ class BackupConfiguration(Base):
     last_backup: Mapped[Optional[datetime]]
     next_backup: Mapped[Optional[datetime]]
     enabled_service: Mapped[str] = mapped_column(default="google_drive")
+    target_directory: Mapped[Optional[str]]  # Of the "local" service, `config.BACKUP_DIRECTORY` when unset
 
 
 class Backup(Base):
@@ -140,6 +215,15 @@ class Backup(Base):
     storage_service: Mapped[str] = mapped_column(nullable=False)  # E.g., "google_drive"
     file_path: Mapped[str] = mapped_column(nullable=False)
     status: Mapped[str] = mapped_column(nullable=False)  # E.g., "completed"
+    kind: Mapped[str] = mapped_column(default="full")  # "full" or "incremental"
+    parent_id: Mapped[Optional[int]] = mapped_column(ForeignKey("backups.id"))  # Backup an incremental one builds on
+    duration: Mapped[Optional[float]]  # Seconds
+    source_bytes: Mapped[Optional[int]]  # Size of the database files, or of the exported sessions
+    size_bytes: Mapped[Optional[int]]  # Size of the written, compressed files
+    throughput: Mapped[Optional[float]]  # Source bytes per second
+    sessions: Mapped[Optional[int]]  # Sessions written or deleted by an incremental backup
+    checksum: Mapped[Optional[str]]  # SHA-256 of the backup's manifest
+    error: Mapped[Optional[str]]
 
     # Relationship to BackupConfiguration
     configuration: Mapped["BackupConfiguration"] = relationship("BackupConfiguration")
@@ -0,0 +1,87 @@
+from dataclasses import dataclass
+from typing import Iterator, Sequence, Union
+
+import numpy as np
+
+from app.enums.ai import EVectorDType
+
+# Little-endian whatever the machine, so database files move between platforms
+NUMPY_DTYPES = {
+    EVectorDType.FLOAT32: np.dtype("<f4"),
+    EVectorDType.FLOAT16: np.dtype("<f2"),
+}
+
+Vectors = Union[Sequence[Sequence[float]], np.ndarray]
+
+
+def pack_vectors(vectors: Vectors, dtype: EVectorDType = EVectorDType.FLOAT32) -> np.ndarray:
+    """
+    Contiguous `(rows, dimension)` matrix of `vectors` in the stored element type.
+
+    Raises:
+        ValueError: If the vectors are not all of the same, non-zero dimension.
+    """
+    matrix = np.ascontiguousarray(vectors, dtype=NUMPY_DTYPES[EVectorDType(dtype)])
+    if matrix.ndim != 2 or not matrix.shape[1]:
+        raise ValueError("Embeddings must be a list of equally long, non-empty vectors.")
+    return matrix
+
+
+def unpack_vector(data: bytes, dtype: EVectorDType, dimension: int) -> np.ndarray:
+    """
+    Vector stored as `data`, as a read-only view of its bytes: nothing is copied.
+
+    Raises:
+        ValueError: If `data` does not hold `dimension` values of `dtype`.
+    """
+    dtype = NUMPY_DTYPES[EVectorDType(dtype)]
+    if len(data) != dimension * dtype.itemsize:
+        raise ValueError(f"Stored embedding has {len(data)} bytes, expected {dimension} {dtype.name} values.")
+    return np.frombuffer(data, dtype=dtype)
+
+
+def unpack_matrix(blobs: Sequence[bytes], dtype: EVectorDType, dimension: int) -> np.ndarray:
+    """
+    Read-only `(rows, dimension)` matrix of stored vectors. The blobs are joined into one buffer, the only copy.
+
+    Raises:
+        ValueError: If a blob does not hold `dimension` values of `dtype`.
+    """
+    dtype = NUMPY_DTYPES[EVectorDType(dtype)]
+    size = dimension * dtype.itemsize
+    if any(len(data) != size for data in blobs):
+        raise ValueError(f"Stored embeddings must have {size} bytes, {dimension} {dtype.name} values.")
+    return np.frombuffer(b"".join(blobs), dtype=dtype).reshape(len(blobs), dimension)
+
+
+@dataclass
+class PackedEmbeddings:
+    """
+    Embeddings of consecutive chunks as one contiguous matrix, with the model that made them.
+
+    A float32 vector takes 4 bytes per dimension, float16 2, where a list of Python floats takes about 32 (an
+    8-byte pointer and a 24-byte float object). Rows are stored as they are in memory, one BLOB per chunk, so
+    reading them back is a `numpy.frombuffer` over the stored bytes. Float16 matrices are converted with
+    `astype(numpy.float32)` before arithmetic that needs the precision.
+    """
+    model: str
+    dtype: EVectorDType
+    vectors: np.ndarray  # `(rows, dimension)`, C-contiguous, of `NUMPY_DTYPES[dtype]`
+
+    @classmethod
+    def from_vectors(cls, vectors: Vectors, model: str, dtype: EVectorDType = EVectorDType.FLOAT32) -> "PackedEmbeddings":
+        return cls(model=model, dtype=EVectorDType(dtype), vectors=pack_vectors(vectors, dtype))
+
+    @property
+    def dimension(self) -> int:
+        return self.vectors.shape[1]
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    def rows(self) -> Iterator[bytes]:
+        """
+        Stored form of each vector.
+        """
+        for vector in self.vectors:
+            yield vector.tobytes()
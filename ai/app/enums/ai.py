@@ -25,3 +25,21 @@ class EAIEmbedding(str, enum.Enum):
     # GEMINI
     GEMINI_TEXT_EMBEDDING_004 = "text-embedding-004"
 
+
+class EPriority(int, enum.Enum):
+    """Scheduling priority of an LLM call, lower values are served first."""
+    INTERACTIVE = 0  # Chat generation the user is waiting on
+    TITLE = 1  # Background chat title generation
+    SUMMARY = 2  # Background summarisation
+
+    def __str__(self):
+        return self.name.lower()
+
+
+class EVectorDType(str, enum.Enum):
+    """Element type of stored embedding vectors."""
+    FLOAT32 = "float32"  # Precision of the embedding models
+    FLOAT16 = "float16"  # Half the size, relative error around 1e-3, enough to rank by cosine similarity
+
+    def __str__(self):
+        return self.value
@@ -0,0 +1,46 @@
+import enum
+from datetime import timedelta
+
+
+class EBackupFrequency(str, enum.Enum):
+    HOURLY = "hourly"
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+
+    @property
+    def interval(self) -> timedelta:
+        return {
+            EBackupFrequency.HOURLY: timedelta(hours=1),
+            EBackupFrequency.DAILY: timedelta(days=1),
+            EBackupFrequency.WEEKLY: timedelta(weeks=1),
+            EBackupFrequency.MONTHLY: timedelta(days=30),
+        }[self]
+
+    def __str__(self):
+        return self.value
+
+
+class EBackupKind(str, enum.Enum):
+    FULL = "full"  # Copy of both database files
+    INCREMENTAL = "incremental"  # Sessions changed or deleted since the previous backup
+
+    def __str__(self):
+        return self.value
+
+
+class EBackupStatus(str, enum.Enum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    def __str__(self):
+        return self.value
+
+
+class EBackupService(str, enum.Enum):
+    LOCAL = "local"  # A directory on this machine
+    GOOGLE_DRIVE = "google_drive"
+
+    def __str__(self):
+        return self.value
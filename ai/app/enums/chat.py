@@ -5,6 +5,7 @@ import enum
 class ERole(str, enum.Enum):
     USER = "user"
     ASSISTANT = "assistant"
+    SYSTEM = "system"
 
     def __str__(self):
         return self.value
@@ -17,4 +18,35 @@ class EChatHistoryTime(str, enum.Enum):
     PAST_30_DAYS = "month",
 
     def __str__(self):
-        return self.value
\ No newline at end of file
+        return self.value
+
+
+class ESearchMode(str, enum.Enum):
+    GENERAL = "general"
+    BOOKMARK = "bookmark"  # Bookmarked chats are the favourite ones
+    ARCHIVED = "archived"
+    FAVOURITE = "favourite"
+
+    def __str__(self):
+        return self.value
+
+
+class ETitleJobStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __str__(self):
+        return self.value
+
+
+class EBulkSessionAction(str, enum.Enum):
+    DELETE = "delete"
+    ARCHIVE = "archive"
+    UNARCHIVE = "unarchive"
+    FAVORITE = "favorite"
+    UNFAVORITE = "unfavorite"
+
+    def __str__(self):
+        return self.value
@@ -0,0 +1,9 @@
+import enum
+
+
+class EDatabaseProfile(str, enum.Enum):
+    DEFAULT = "default"  # SQLite's own defaults: rollback journal, full fsync on every commit
+    PRODUCTION = "production"  # WAL, relaxed fsync, memory-mapped reads, larger page cache
+
+    def __str__(self):
+        return self.value
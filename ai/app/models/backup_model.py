@@ -0,0 +1,16 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.enums.backup import EBackupFrequency, EBackupKind, EBackupService
+
+
+class BackupConfigurationRequest(BaseModel):
+    schedule_frequency: EBackupFrequency = EBackupFrequency.DAILY
+    enabled_service: EBackupService = EBackupService.LOCAL
+    target_directory: Optional[str] = None  # Local backups, relative to `config.BACKUP_DIRECTORY`, itself when unset
+
+
+class RunBackupRequest(BaseModel):
+    configuration_id: int
+    kind: Optional[EBackupKind] = None  # By default the kind the schedule calls for
@@ -3,7 +3,7 @@ from typing import List, Optional
 
 from pydantic import BaseModel
 
-from app.enums.chat import ERole
+from app.enums.chat import EBulkSessionAction, ERole
 
 
 class ChatMessageResponse(BaseModel):
@@ -19,9 +19,18 @@ class ChatSessionResponse(BaseModel):
     favorite: bool
     created_at: datetime
     messages: List[ChatMessageResponse]
+    has_more: bool = False  # Older messages exist before the first one returned
 
 
 class UpdateChatSessionRequest(BaseModel):
     rename: Optional[str] = None
     archived: Optional[bool] = None
-    favorite: Optional[bool] = None
\ No newline at end of file
+    favorite: Optional[bool] = None
+
+
+class BulkChatSessionRequest(BaseModel):
+    action: EBulkSessionAction
+    # Sessions matching every given filter are affected, at least one filter is required
+    session_ids: Optional[List[str]] = None
+    before: Optional[datetime] = None  # Sessions created before this time
+    archived: Optional[bool] = None
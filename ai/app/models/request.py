@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import date
 
+from app.enums.chat import ESearchMode
 from app.models.chat_model import ChatMessageResponse
 
 
@@ -9,7 +10,15 @@ class ChatRequest(BaseModel):
     """
     Represents a request for a chat interaction.
     """
-    messages: List[ChatMessageResponse] = Field(..., description="List of messages exchanged in the chat.")
+    messages: List[ChatMessageResponse] = Field(
+        ..., description="List of messages exchanged in the chat, or only the new ones when `delta` is set."
+    )
+    session_id: Optional[str] = Field(
+        None, description="Chat session the request belongs to. Required when `delta` is set."
+    )
+    delta: bool = Field(
+        False, description="Send only the new messages; the server rebuilds the history of `session_id`."
+    )
     model: Optional[str] = Field(
         None, description="The AI model to be used, e.g., 'openai'."
     )
@@ -19,6 +28,12 @@ class ChatRequest(BaseModel):
     api_key: Optional[str] = Field(
         None, description="API key for accessing the model (not required for local models)."
     )
+    temperature: Optional[float] = Field(
+        None, description="Sampling temperature. Uses the model default when not provided."
+    )
+    use_cache: bool = Field(
+        True, description="Serve identical earlier prompts from the response cache. Set to false to force a fresh answer."
+    )
 
 class ChatRegister(BaseModel):
     session_id: str = Field(..., description="Unique identifier for the chat session.")
@@ -33,13 +48,22 @@ class ChatRegister(BaseModel):
     api_key: Optional[str] = Field(
         None, description="API key for accessing the model (not required for local models)."
     )
+    topic: Optional[str] = Field(
+        None, description="Topic of the chat, e.g., 'code', used to narrow searches."
+    )
+
+class ChatRegisterBulk(BaseModel):
+    """
+    Represents a batch of chats to store, e.g. when syncing history from the desktop app.
+    """
+    chats: List[ChatRegister] = Field(..., description="Chat sessions to store, each with its messages.")
 
 class ContextSearchRequest(BaseModel):
     """
     Represents a request to search for context in the stored chat data.
     """
     query: str = Field(..., description="Search query string.")
-    mode: Optional[str] = Field(
+    mode: Optional[ESearchMode] = Field(
         None,
         description=(
             "Search mode, e.g., 'bookmark', 'archived', 'favourite', or 'general'. "
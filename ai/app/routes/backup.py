@@ -0,0 +1,94 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.db import get_async_db
+from app.database.schema import Backup, BackupConfiguration
+from app.models.backup_model import BackupConfigurationRequest, RunBackupRequest
+from app.services.backup import backup_engine, resolve_target_directory
+from app.services.db_writer import db_writer
+
+# Initializing Router
+router = APIRouter()
+
+
+@router.post("/backup/configurations")
+async def create_backup_configuration(request: BackupConfigurationRequest):
+    """
+    Add a backup schedule. Its first backup is due right away.
+
+    Local backups are written inside `BACKUP_DIRECTORY`: `target_directory` is taken relative to it and may not
+    leave it.
+    """
+    try:
+        resolve_target_directory(request.target_directory)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def create(db: AsyncSession) -> BackupConfiguration:
+        configuration = BackupConfiguration(
+            schedule_frequency=request.schedule_frequency,
+            enabled_service=request.enabled_service,
+            target_directory=request.target_directory,
+            next_backup=datetime.now(),
+        )
+        db.add(configuration)
+        await db.flush()
+        return configuration
+
+    try:
+        configuration = await db_writer.submit(create)
+        return {"success": True, "data": configuration, "message": "Backup configuration saved successfully"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error saving backup configuration: {str(e)}")
+
+
+@router.get("/backup/configurations")
+async def get_backup_configurations(db: AsyncSession = Depends(get_async_db)):
+    """
+    List the backup schedules.
+    """
+    try:
+        configurations = (await db.scalars(select(BackupConfiguration).order_by(BackupConfiguration.id))).all()
+        return {"success": True, "data": configurations, "message": "Successfully fetched backup configurations"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching backup configurations: {str(e)}")
+
+
+@router.post("/backup/run")
+async def run_backup(request: RunBackupRequest):
+    """
+    Back up now with a configuration, full or incremental, and return the recorded backup once it is done.
+    """
+    try:
+        backup = await backup_engine.run(request.configuration_id, request.kind)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error running backup: {str(e)}")
+    if backup is None:
+        raise HTTPException(status_code=404, detail=f"Backup configuration with ID {request.configuration_id} not found.")
+    return {"success": True, "data": backup, "message": f"Backup {backup.status}"}
+
+
+@router.get("/backup/history")
+async def get_backup_history(
+    configuration_id: Optional[int] = Query(None, description="Only the backups of this configuration"),
+    limit: int = Query(20, description="Number of backups to return"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Recorded backups, newest first, with their timing, sizes and throughput.
+    """
+    if not 1 <= limit <= 100:
+        raise HTTPException(status_code=400, detail="Limit must be between 1 and 100.")
+
+    try:
+        query = select(Backup).order_by(Backup.id.desc()).limit(limit)
+        if configuration_id is not None:
+            query = query.where(Backup.configuration_id == configuration_id)
+        backups = (await db.scalars(query)).all()
+        return {"success": True, "data": backups, "message": "Successfully fetched backups"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching backups: {str(e)}")
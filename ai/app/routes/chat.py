@@ -1,28 +1,75 @@
-import re
 from datetime import datetime
-from typing import Optional, AsyncGenerator
+from typing import List, Optional, AsyncGenerator
 
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import func, literal, select, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.responses import JSONResponse
 
-from app.database.db import get_db
+from app.core.errors import LLMSchedulerError
+from app.database.cold_storage import COLD, HOT
+from app.database.db import cold_storage, get_async_db
 from app.database.schema import ChatSession, ChatMessage
 from app.enums.ai import EAIModel
-from app.models.chat_model import ChatSessionResponse, ChatMessageResponse, UpdateChatSessionRequest
-from app.models.request import ChatRequest, ChatRegister
-from app.services.ai import AIService
+from app.enums.chat import EBulkSessionAction
+from app.models.chat_model import (
+    BulkChatSessionRequest, ChatSessionResponse, ChatMessageResponse, UpdateChatSessionRequest
+)
+from app.models.request import ChatRequest, ChatRegister, ChatRegisterBulk
+from app.services.db_writer import db_writer
+from app.services.generation import stream_chat_response
+from app.services.history_cache import history_cache
+from app.services.history_transfer import history_transfer
+from app.services.ingestion import ingest_chats
+from app.services.read_cache import read_cache, SESSION_LIST
+from app.services.session_counts import session_counts
+from app.services.session_tiers import session_tiers
+from app.services.session_versions import session_versions, make_etag, etag_matches
+from app.services.space_reclaimer import space_reclaimer
+from app.services.title_worker import title_jobs
+from app.services.streaming import stream_until_disconnect
+from app.utils.pagination import encode_cursor, decode_cursor
 
 
 # Initializing Router
 router = APIRouter()
 
 
+def render_json(content) -> bytes:
+    """
+    JSON body of `content`, exactly as FastAPI would render it for a route returning it.
+    """
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def forget_deleted_sessions(session_ids: List[str]) -> None:
+    """
+    Drop every in-memory trace of deleted sessions, and release the pages their rows used.
+    """
+    for session_id in session_ids:
+        history_cache.invalidate(session_id)
+    invalidate_sessions(session_ids)
+    space_reclaimer.schedule()
+
+
+def invalidate_sessions(session_ids: List[str]) -> None:
+    """
+    Drop everything cached about sessions whose changes were just committed.
+    """
+    session_counts.invalidate()
+    session_versions.invalidate(session_ids)
+    read_cache.invalidate(session_ids)
+
+
 @router.post("/generate")
-async def generate(request: ChatRequest):
+async def generate(request: ChatRequest, raw_request: Request):
     """
     Generate an AI response for a chat session, save the full response, and stream it back to the client.
+
+    In delta mode the client sends only the new messages and the history is rebuilt from the stored session.
+    If the client disconnects mid-answer, the upstream LLM stream is cancelled.
     """
     try:
         messages = request.messages
@@ -34,20 +81,43 @@ async def generate(request: ChatRequest):
         if model != EAIModel.LOCAL and not api_key:
             raise HTTPException(status_code=403, detail="API Key is required for external models")
 
+        # Rebuild the conversation from the stored session history
+        if request.delta:
+            if not request.session_id:
+                raise HTTPException(status_code=400, detail="`session_id` is required in delta mode.")
+            messages = await history_cache.rebuild(request.session_id, messages)
+
         async def generate_response() -> AsyncGenerator[str, None]:
             """
             Async generator to yield response chunks for streaming.
             """
-            for chunk in AIService.generate_ai_response(
+            async for chunk in stream_chat_response(
                 model=model,
                 variant=variant,
                 messages=messages,
-                api_key=api_key
+                api_key=api_key,
+                temperature=request.temperature,
+                use_cache=request.use_cache,
+                session_id=request.session_id
             ):
                 yield chunk
 
+        # Wait for the first chunk before answering, so rejections and errors still get a proper status code
+        stream = stream_until_disconnect(raw_request, generate_response())
+        try:
+            first_chunk = await anext(stream, None)
+        except LLMSchedulerError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
+
+        async def relay_response() -> AsyncGenerator[str, None]:
+            if first_chunk is None:
+                return
+            yield first_chunk
+            async for chunk in stream:
+                yield chunk
+
         return StreamingResponse(
-            generate_response(),
+            relay_response(),
             media_type="application/json",
             headers={"Transfer-Encoding": "chunked"}
         )
@@ -63,11 +133,10 @@ async def generate(request: ChatRequest):
 
 
 @router.post("/register")
-async def register_chat(request: ChatRegister, db: Session = Depends(get_db)):
+async def register_chat(request: ChatRegister):
     try:
         # Extract request fields
         session_id = request.session_id
-        session_name = request.session_name
         messages = request.messages
         model = request.model
         variant = request.variant
@@ -77,93 +146,196 @@ async def register_chat(request: ChatRegister, db: Session = Depends(get_db)):
         if model != EAIModel.LOCAL and not api_key:
             raise HTTPException(status_code=403, detail="API Key is required for non-local models.")
 
-        # Retrieve or create a new ChatSession
-        chat_session = db.query(ChatSession).filter(ChatSession.session_id == session_id).first()
-        if not chat_session:
-            chat_session = ChatSession(
-                session_name=session_name or "Unknown",
-                session_id=session_id,
-                archived=False,
-                favorite=False,
-                created_at=datetime.now(),
-            )
-            db.add(chat_session)
-            db.commit()
-            db.refresh(chat_session)
-
-        # Title generation logic for messages < 3
-        if len(messages) < 3:
-            for idx, message in messages:  # Check only the first two messages
-                if message.role == "user":
-                    # Extract text within quotes as title
-                    match = re.search(r'"(.*?)"', message.content)
-                    if match:
-                        chat_session.session_name = match.group(1)
-                        db.commit()
-                        break
-
-        # Title generation logic for messages >= 3
+        # Store the session and its new messages in one transaction
+        await db_writer.submit(session_tiers.around([session_id], lambda db: ingest_chats(db, [request])))
+        history_cache.append(session_id, messages)
+        invalidate_sessions([session_id])
+
+        # Title generation for messages < 3 uses quoted text and is done during ingestion
+        title_job = None
+
+        # Title generation for messages >= 3 runs in the background once the messages are stored
         if len(messages) >= 3:
-            chat_title = await AIService.generate_title(
+            title_job = title_jobs.submit(
+                session_id=session_id,
                 model=model,
                 variant=variant,
-                messages=messages,
-                api_key=api_key
+                api_key=api_key,
+                messages=messages
             )
-            if chat_title:
-                chat_session.session_name = chat_title
-                db.commit()
-
-        # Add or update user messages in the database
-        for message in messages:
-            existing_message = db.query(ChatMessage).filter(
-                ChatMessage.session_id == session_id,
-                ChatMessage.message_id == message.message_id
-            ).first()
-
-            if not existing_message:
-                new_message = ChatMessage(
-                    session_id=session_id,
-                    message_id=message.message_id,
-                    content=message.content,
-                    role=message.role,
-                    variant=variant,
-                    model=model,
-                    created_at=datetime.now(),
-                )
-                db.add(new_message)
-        db.commit()
 
         # Return success response
-        return {"success": True, "message": "Chat successfully registered or updated.", "session_id": session_id}
+        return {
+            "success": True,
+            "message": "Chat successfully registered or updated.",
+            "session_id": session_id,
+            "title_job": title_job.as_dict() if title_job else None,
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
 
+@router.post("/register/bulk")
+async def register_chats_bulk(request: ChatRegisterBulk):
+    """
+    Store many chat sessions at once, e.g. when the desktop app syncs its local history.
+
+    Messages that are already stored are skipped, so an interrupted sync can simply be retried. No titles are
+    generated for these sessions beyond the quoted-text title of short chats.
+    """
+    try:
+        result = await db_writer.submit(session_tiers.around(
+            [chat.session_id for chat in request.chats], lambda db: ingest_chats(db, request.chats)
+        ))
+        invalidate_sessions([chat.session_id for chat in request.chats])
+        for chat in request.chats:
+            history_cache.append(chat.session_id, chat.messages)
+
+        return {
+            "success": True,
+            "message": "Chats successfully registered or updated.",
+            "data": result.as_dict(),
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+
+
+@router.get("/chat/export")
+async def export_chat_history(
+    archived: Optional[bool] = Query(None, description="Only archived, or only live, sessions; all when not set")
+):
+    """
+    Stream every chat session with its messages as JSON lines, a `session` record followed by its `message`
+    records, in constant memory whatever the size of the history.
+    """
+    schemas = {None: (HOT, COLD), True: (COLD,), False: (HOT,)}[archived]
+    return StreamingResponse(
+        history_transfer.export_history(schemas),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="chat-history.jsonl"'},
+    )
+
+
+@router.post("/chat/import")
+async def import_chat_history(raw_request: Request, content_encoding: Optional[str] = Header(None)):
+    """
+    Import a chat history of JSON lines, as streamed by `/chat/export`, from the request body as it arrives.
+
+    The body may be zstd-compressed (`Content-Encoding: zstd`), e.g. an incremental backup file. Messages that
+    are already stored are skipped, so an interrupted import can simply be retried.
+    """
+    def forget(changed: List[str], deleted: List[str]) -> None:
+        for session_id in changed:
+            history_cache.invalidate(session_id)
+        invalidate_sessions(changed)
+        if deleted:
+            forget_deleted_sessions(deleted)
+
+    try:
+        result = await history_transfer.import_history(
+            raw_request.stream(), compressed=content_encoding == "zstd", on_batch=forget
+        )
+        return {
+            "success": True,
+            "message": f"Imported {result.sessions} chat sessions and {result.messages} messages.",
+            "data": result.as_dict(),
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error importing chat history: {str(e)}")
+
+
+@router.get("/chat/{session_id}/title")
+def get_title_job(session_id: str):
+    """
+    Status of the background title generation for a chat session, polled by the UI for the final title.
+    """
+    title_job = title_jobs.status(session_id)
+    if not title_job:
+        raise HTTPException(status_code=404, detail=f"No title job for chat session with ID {session_id}.")
+    return {"success": True, "data": title_job.as_dict()}
+
+
 @router.get("/chat/{session_id}", response_model=ChatSessionResponse)
-def get_conversation(session_id: str, db: Session = Depends(get_db)):
+async def get_conversation(
+    session_id: str,
+    limit: Optional[int] = Query(None, description="Return only the latest `limit` messages, all when not set"),
+    before: Optional[str] = Query(None, description="Return messages older than this message ID"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
-    Fetch all chat messages for a given session.
+    Fetch the chat messages for a given session, oldest first.
+
+    With `limit`, only the latest messages are returned and `has_more` tells whether older ones exist; pass the
+    first returned message ID as `before` to load the previous window. Responses carry an ETag of the session
+    version, and a matching `If-None-Match` is answered with 304 from memory while the session is unchanged.
+    Rendered windows are kept in the read cache until the session changes. Archived sessions are read from the
+    cold file.
     """
     try:
+        if limit is not None and limit < 1:
+            raise HTTPException(status_code=400, detail="Limit must be 1 or greater.")
+
+        # Unchanged conversation, answered without touching the database
+        version = session_versions.get(session_id)
+        if version is not None and if_none_match:
+            etag = make_etag(session_id, version, limit, before)
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers={"ETag": etag})
+
+        cached = read_cache.get(session_id, (limit, before))
+        if cached:
+            body, headers = cached
+            if etag_matches(if_none_match, headers["ETag"]):
+                return Response(status_code=304, headers={"ETag": headers["ETag"]})
+            return Response(content=body, media_type="application/json", headers=headers)
+
         # Fetch the chat session
-        chat_session = db.query(ChatSession).filter(ChatSession.session_id == session_id).first()
+        generation = session_versions.generation
+        cache_generation = read_cache.generation
+        options = {}
+        chat_session = await db.scalar(select(ChatSession).where(ChatSession.session_id == session_id))
+        if not chat_session:
+            await cold_storage.attach(db)
+            options = cold_storage.options
+            chat_session = await db.scalar(
+                select(ChatSession).where(ChatSession.session_id == session_id), execution_options=options
+            )
 
         if not chat_session:
             return JSONResponse({
                 "success":False, "message": f"Chat session with ID {session_id} not found.", "data": chat_session
             })
 
-        # Fetch all messages for the session
-        messages = (
-            db.query(ChatMessage)
-            .filter(ChatMessage.session_id == session_id)
-            .order_by(ChatMessage.created_at)
-            .all()
+        session_versions.set(session_id, chat_session.version, generation)
+        etag = make_etag(session_id, chat_session.version, limit, before)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+        # Fetch the requested window of messages, newest first
+        query = (
+            select(ChatMessage.message_id, ChatMessage.role, ChatMessage.content)
+            .where(ChatMessage.session_id == session_id)
+            .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
         )
+        if before:
+            anchor = (await db.execute(
+                select(ChatMessage.created_at, ChatMessage.id)
+                .where(ChatMessage.session_id == session_id, ChatMessage.message_id == before),
+                execution_options=options
+            )).first()
+            if not anchor:
+                raise HTTPException(status_code=404, detail=f"Message with ID {before} not found in this session.")
+            query = query.where(tuple_(ChatMessage.created_at, ChatMessage.id) < tuple_(*anchor))
+        if limit is not None:
+            query = query.limit(limit + 1)
+
+        messages = (await db.execute(query, execution_options=options)).all()
+        has_more = limit is not None and len(messages) > limit
+        messages = messages[:limit] if limit is not None else messages
 
         # Construct the response
-        response = ChatSessionResponse(
+        conversation = ChatSessionResponse(
             session_id=chat_session.session_id,
             session_name=chat_session.session_name,
             archived=chat_session.archived,
@@ -175,27 +347,40 @@ def get_conversation(session_id: str, db: Session = Depends(get_db)):
                     role=message.role,
                     content=message.content,
                 )
-                for message in messages
-            ]
+                for message in reversed(messages)
+            ],
+            has_more=has_more
         )
-        return response
+        body = render_json(conversation)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        read_cache.set(session_id, (limit, before), body, headers, cache_generation)
+        return Response(content=body, media_type="application/json", headers=headers)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching conversation: {str(e)}")
 
 
 @router.get("/chat/all/")
-def get_chat_sessions(
+async def get_chat_sessions(
     archived: bool = False,
     favorite: bool = False,
     start_date: Optional[datetime] = Query(None, description="Filter by start date"),
     end_date: Optional[datetime] = Query(None, description="Filter by end date"),
     page: int = Query(1, description="Page number, starts from 1"),
     limit: int = Query(10, description="Number of records to return"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="`nextCursor` of the previous page, replaces `page`"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Fetch all chat sessions, optionally filtered by archived or favourite status, and within a date range.
+
+    Every page returns a `nextCursor`. Passing it back as `cursor` continues right after the last session of the
+    page through the (created_at, id) index, so deep pages cost the same as the first one. The total behind
+    `totalPage` is cached per filter combination, and rendered pages are kept in the read cache until a
+    session changes. Archived sessions are stored in the cold file: `archived` lists only them, otherwise both
+    files are read and their sessions merged by creation date.
     """
     try:
         if page < 1:
@@ -203,70 +388,109 @@ def get_chat_sessions(
         if limit < 1:
             raise HTTPException(status_code=400, detail="Limit must be 1 or greater.")
 
-        offset = (page - 1) * limit
-
-        # Base query
-        query = db.query(ChatSession)
-        if archived:
-            query = query.filter(ChatSession.archived == True)
-        if favorite:
-            query = query.filter(ChatSession.favorite == True)
-        if start_date:
-            query = query.filter(ChatSession.created_at >= start_date)
-        if end_date:
-            query = query.filter(ChatSession.created_at <= end_date)
+        position = None
+        if cursor:
+            try:
+                position = decode_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        cache_key = (archived, favorite, start_date, end_date, page, limit, cursor)
+        cached = read_cache.get(SESSION_LIST, cache_key)
+        if cached:
+            return Response(content=cached[0], media_type="application/json")
+        cache_generation = read_cache.generation
+
+        # One query per tier holding requested sessions, numbered in the order sessions of equal keys are listed
+        await cold_storage.attach(db)
+        tiers = [cold_storage.sessions] if archived else [ChatSession.__table__, cold_storage.sessions]
+        queries = []
+        for tier, table in enumerate(tiers):
+            query = select(*table.c, literal(tier).label("tier"))
+            if archived:
+                query = query.where(table.c.archived == True)
+            if favorite:
+                query = query.where(table.c.favorite == True)
+            if start_date:
+                query = query.where(table.c.created_at >= start_date)
+            if end_date:
+                query = query.where(table.c.created_at <= end_date)
+            queries.append(query)
+
+        async def count_sessions() -> int:
+            counts = [select(func.count()).select_from(query.subquery()).scalar_subquery() for query in queries]
+            return sum((await db.execute(select(*counts))).one())
 
         # Calculate total records for pagination
-        total_records = query.count()
-
-        # Fetch paginated results
-        sessions = query.order_by(ChatSession.created_at)\
-                        .offset(offset)\
-                        .limit(limit)\
-                        .all()
-
-        # Calculate total pages
+        total_records = await session_counts.get((archived, favorite, start_date, end_date), count_sessions)
         total_pages = (total_records + limit - 1) // limit  # Ceiling division for total pages
 
-        return {
+        # Each tier returns its first rows along the (created_at, id) index, the page is cut from all of them
+        offset = 0 if position else (page - 1) * limit
+        pages = []
+        for tier, (table, query) in enumerate(zip(tiers, queries)):
+            if position:
+                created_at, session_row_id, cursor_tier = position
+                key, last = tuple_(table.c.created_at, table.c.id), tuple_(created_at, session_row_id)
+                # Sessions of later tiers with the same key come after the last one of the previous page
+                query = query.where(key >= last if tier > cursor_tier else key > last)
+            query = query.order_by(table.c.created_at, table.c.id).limit(offset + limit + 1)
+            pages.append(select(query.subquery()))
+        merged = union_all(*pages).subquery()
+        # Fetch one extra row to know whether there is a next page
+        rows = (await db.execute(
+            select(merged).order_by(merged.c.created_at, merged.c.id, merged.c.tier).offset(offset).limit(limit + 1)
+        )).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        body = render_json({
             "success": True,
-            "data": sessions,
+            "data": [{column.name: row._mapping[column.name] for column in ChatSession.__table__.c} for row in rows],
             "message": "Successfully fetched chat sessions",
-            "nextPage": page + 1 if page < total_pages else None,
+            "nextPage": page + 1 if not cursor and page < total_pages else None,
+            "nextCursor": encode_cursor(rows[-1].created_at, rows[-1].id, rows[-1].tier) if has_more else None,
             "totalPage": total_pages,
-        }
+        })
+        read_cache.set(SESSION_LIST, cache_key, body, {}, cache_generation)
+        return Response(content=body, media_type="application/json")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching chat sessions: {str(e)}")
 
 
 @router.patch("/chat/{session_id}")
-def update_chat_session(
-    session_id: str,
-    request: UpdateChatSessionRequest,
-    db: Session = Depends(get_db)
-):
+async def update_chat_session(session_id: str, request: UpdateChatSessionRequest):
     """
     Update properties of a chat session (rename, archive, favorite).
+
+    Archiving moves the session to the cold file, unarchiving brings it back.
     """
+    async def apply_updates(db: AsyncSession) -> Optional[ChatSession]:
+        chat_session = await db.scalar(select(ChatSession).where(ChatSession.session_id == session_id))
+        if not chat_session:
+            return None
+
+        # Apply updates if provided
+        if request.rename is not None:
+            chat_session.session_name = request.rename
+        if request.archived is not None:
+            chat_session.archived = request.archived
+        if request.favorite is not None:
+            chat_session.favorite = request.favorite
+        chat_session.version += 1
+        return chat_session
+
     try:
-        chat_session = db.query(ChatSession).filter(ChatSession.session_id == session_id).first()
-        rename = request.rename
-        archived = request.archived
-        favorite = request.favorite
+        chat_session = await db_writer.submit(session_tiers.around([session_id], apply_updates))
 
         if not chat_session:
             raise HTTPException(status_code=404, detail=f"Chat session with ID {session_id} not found.")
 
-        # Apply updates if provided
-        if rename is not None:
-            chat_session.session_name = rename
-        if archived is not None:
-            chat_session.archived = archived
-        if favorite is not None:
-            chat_session.favorite = favorite
-
-        db.commit()
-        db.refresh(chat_session)
+        invalidate_sessions([session_id])
+        if request.archived:
+            space_reclaimer.schedule()  # The session left the main file
 
         return {
             "detail": "Chat session updated successfully.",
@@ -283,22 +507,54 @@ def update_chat_session(
 
 
 @router.delete("/chat/{session_id}")
-def delete_chat_session(
-    session_id: str,
-    db: Session = Depends(get_db)
-):
+async def delete_chat_session(session_id: str):
     """
     Delete a chat session by its ID.
     """
     try:
-        chat_session = db.query(ChatSession).filter(ChatSession.session_id == session_id).first()
-
-        if not chat_session:
+        deleted = await db_writer.submit(
+            lambda db: session_tiers.apply_bulk_action(db, EBulkSessionAction.DELETE, session_ids=[session_id])
+        )
+        if not deleted:
             raise HTTPException(status_code=404, detail=f"Chat session with ID {session_id} not found.")
 
-        db.delete(chat_session)
-        db.commit()
+        forget_deleted_sessions(deleted)
 
         return {"detail": "Chat session deleted successfully.", "session_id": session_id}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error deleting chat session: {str(e)}")
+
+
+@router.post("/chat/bulk")
+async def bulk_update_chat_sessions(request: BulkChatSessionRequest):
+    """
+    Delete, archive or favorite every chat session matching the request's filters at once.
+
+    Runs as a single statement per table and tier, messages and documents of deleted sessions go with them.
+    Archived sessions move to the cold file, unarchived ones back to the main file.
+    """
+    if request.session_ids is None and request.before is None and request.archived is None:
+        raise HTTPException(status_code=400, detail="At least one of `session_ids`, `before` or `archived` is required.")
+
+    try:
+        session_ids = await db_writer.submit(lambda db: session_tiers.apply_bulk_action(
+            db, request.action, session_ids=request.session_ids, before=request.before, archived=request.archived
+        ))
+
+        if request.action == EBulkSessionAction.DELETE:
+            forget_deleted_sessions(session_ids)
+        else:
+            invalidate_sessions(session_ids)
+            if request.action == EBulkSessionAction.ARCHIVE:
+                space_reclaimer.schedule()  # The sessions left the main file
+
+        return {
+            "detail": f"{len(session_ids)} chat sessions updated.",
+            "success": True,
+            "action": request.action,
+            "session_ids": session_ids,
+        }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error deleting chat session: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error updating chat sessions: {str(e)}")
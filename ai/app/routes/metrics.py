@@ -0,0 +1,53 @@
+from fastapi import APIRouter
+
+from app.services.backup import backup_engine
+from app.services.cache.response_cache import response_cache
+from app.services.cache.semantic_cache import semantic_cache
+from app.services.coalescer import generation_coalescer
+from app.services.context_window import context_window
+from app.services.history_cache import history_cache
+from app.services.history_transfer import history_transfer
+from app.services.llm_registry import llm_registry
+from app.services.message_compression import message_compressor
+from app.services.scheduler import llm_scheduler
+from app.services.db_writer import db_writer
+from app.services.read_cache import read_cache
+from app.services.session_counts import session_counts
+from app.services.session_tiers import session_tiers
+from app.services.session_versions import session_versions
+from app.services.space_reclaimer import space_reclaimer
+from app.services.title_worker import title_jobs
+from app.services.streaming import stream_stats
+
+# Initializing Router
+router = APIRouter()
+
+
+@router.get("/metrics")
+def get_metrics():
+    """
+    Runtime statistics of the AI server's pools and caches.
+    """
+    return {
+        "success": True,
+        "data": {
+            "llm_clients": llm_registry.stats(),
+            "streams": stream_stats.as_dict(),
+            "response_cache": response_cache.stats(),
+            "semantic_cache": semantic_cache.stats(),
+            "coalescer": generation_coalescer.stats(),
+            "scheduler": llm_scheduler.stats(),
+            "title_jobs": title_jobs.stats(),
+            "history_cache": history_cache.stats(),
+            "context_window": context_window.stats(),
+            "session_counts": session_counts.stats(),
+            "session_versions": session_versions.stats(),
+            "read_cache": read_cache.stats(),
+            "db_writer": db_writer.stats(),
+            "message_compression": message_compressor.stats(),
+            "space_reclaimer": space_reclaimer.stats(),
+            "session_tiers": session_tiers.stats(),
+            "backups": backup_engine.stats(),
+            "history_transfer": history_transfer.stats(),
+        },
+    }
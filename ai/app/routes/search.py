@@ -1,20 +1,47 @@
-from fastapi import APIRouter
-from langchain.embeddings import Embeddings
-from langchain.vectorstores import ObjectBoxVectorStore
-from app.routes.route import router
-from typing import List
-from app.database.schema import ChatMessage
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database.cold_storage import COLD, HOT
+from app.database.db import cold_storage, get_async_db
+from app.enums.chat import ESearchMode
+from app.models.request import ContextSearchRequest
+from app.services.search import search_messages
 
-@router.get("/chat/?search={search_string}")
-def search_chat(chat_session_id: int, query: str) -> List[ChatMessage]:
-    """
-    Search chat messages across all sessions for the user based on the query using similarity search.
+# Initializing Router
+router = APIRouter()
+
+
+@router.post("/search")
+async def search_chat(
+    request: ContextSearchRequest,
+    page: int = Query(1, description="Page number, starts from 1"),
+    limit: int = Query(20, description="Number of results to return"),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
-    # Embedding generation
-    query_embedding = Embeddings().embed_query(query)
+    Search chat messages across all sessions by keyword, best matches first, with highlighted snippets.
 
-    # Search in the vector store
-    results = ObjectBoxVectorStore().similarity_search(chat_session_id=chat_session_id, query_embedding=query_embedding)
+    Archived sessions are searched in the cold file, on their own in `archived` mode. Only the newest
+    `SEARCH_MAX_CANDIDATES` matches of each file are ranked: when a word is so common that older matches were
+    left out, `truncated` is true and a more specific query or a date range finds them.
+    """
+    if page < 1:
+        raise HTTPException(status_code=400, detail="Page number must be 1 or greater.")
+    if not 1 <= limit <= 100:
+        raise HTTPException(status_code=400, detail="Limit must be between 1 and 100.")
 
-    return results
+    try:
+        await cold_storage.attach(db)
+        schemas = (COLD,) if request.mode == ESearchMode.ARCHIVED else (HOT, COLD)
+        results, truncated = await search_messages(
+            db, request, limit=limit, offset=(page - 1) * limit, schemas=schemas
+        )
+        return {
+            "success": True,
+            "data": results,
+            "message": "Successfully searched chat messages",
+            "nextPage": page + 1 if len(results) == limit else None,
+            "truncated": truncated,
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching chat messages: {str(e)}")
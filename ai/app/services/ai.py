@@ -1,13 +1,19 @@
-from typing import List, Dict, Optional, Generator, AsyncGenerator
+import re
+from typing import List, Dict, Optional, Generator, AsyncGenerator, Any, Tuple
 
-from langchain_community.llms import OpenAI, Anthropic, Ollama
+from langchain_community.llms import OpenAI, Anthropic
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.language_models import BaseChatModel
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
+from langchain_ollama import OllamaLLM
 
 from app.enums.ai import EAIModel
+from app.enums.chat import ERole
 from app.enums.topic import ETopic
 from app.models.chat_model import ChatMessageResponse
+from app.services.llm_registry import llm_registry
 from app.utils.helpers import build_prompt_from_messages
 
 
@@ -20,15 +26,20 @@ class AIService:
     def select_llm(
         model: Optional[str],
         variant: Optional[str],
-        api_key: Optional[str]
+        api_key: Optional[str],
+        **options: Any
     ) -> BaseChatModel:
         """
         Select and configure the appropriate LLM based on the provided model and variant.
 
+        Clients are pooled in `llm_registry`, so repeated calls with the same configuration reuse the
+        same LLM object and its keep-alive HTTP connections.
+
         Args:
             model (Optional[str]): Model name or identifier.
             variant (Optional[str]): Specific variant of the model (e.g., version).
             api_key (Optional[str]): API key for external models like OpenAI or Anthropic.
+            **options: Extra constructor options for the LLM, e.g. `temperature`.
 
         Returns:
             object: Configured LLM instance.
@@ -36,21 +47,65 @@ class AIService:
         Raises:
             ValueError: If a required parameter is missing or an unsupported model is specified.
         """
+        key = llm_registry.make_key("llm", model, variant, api_key, options)
+        return llm_registry.get_or_create(
+            key, lambda: AIService._create_llm(model, variant, api_key, **options)
+        )
+
+    @staticmethod
+    def _create_llm(
+        model: Optional[str],
+        variant: Optional[str],
+        api_key: Optional[str],
+        **options: Any
+    ) -> BaseChatModel:
+        """
+        Build a new LLM instance. Use `select_llm` instead, which reuses pooled clients.
+        """
         if model and model.lower() in {EAIModel.OLLAMA, EAIModel.LOCAL}:
-            return Ollama(model=variant)
+            return OllamaLLM(model=variant, **options)
         elif model and model.lower().startswith(str(EAIModel.OPENAI)):
             if not api_key:
                 raise ValueError("API key must be provided for OpenAI.")
-            return OpenAI(model=model, openai_api_key=api_key)  # TODO: Pending Testing
+            return OpenAI(model=model, openai_api_key=api_key, **options)  # TODO: Pending Testing
         elif model and model.lower().startswith(str(EAIModel.ANTHROPIC)):
             if not api_key:
                 raise ValueError("API key must be provided for Anthropic.")
-            return Anthropic(model=model, api_key=api_key)  # TODO: Pending Testing
+            return Anthropic(model=model, api_key=api_key, **options)  # TODO: Pending Testing
         elif model and model.lower().startswith(str(EAIModel.GEMINI)):
             if not api_key:
                 raise ValueError("API key must be provided for Gemini")
-            return ChatGoogleGenerativeAI(model=variant, api_key=api_key)
-        return Ollama(model=variant)
+            return ChatGoogleGenerativeAI(model=variant, api_key=api_key, **options)
+        return OllamaLLM(model=variant, **options)
+
+    @staticmethod
+    def select_chain(
+        model: Optional[str],
+        variant: Optional[str],
+        api_key: Optional[str],
+        **options: Any
+    ) -> Runnable:
+        """
+        Return the reusable `llm | output_parser` part of a chain for the given configuration.
+
+        Args:
+            model (Optional[str]): Model name or identifier.
+            variant (Optional[str]): Specific variant of the model.
+            api_key (Optional[str]): API key for external models.
+            **options: Extra constructor options for the LLM.
+
+        Returns:
+            Runnable: A pooled runnable to be composed with a prompt, e.g. `prompt | chain`.
+        """
+        key = llm_registry.make_key("chain", model, variant, api_key, options)
+
+        def build_chain() -> Runnable:
+            llm = AIService.select_llm(model, variant, api_key, **options)
+            if not llm:
+                raise ValueError(f"Invalid model configuration: {model}, {variant}")
+            return llm | StrOutputParser()
+
+        return llm_registry.get_or_create(key, build_chain)
 
     @staticmethod
     def generate_ai_response(
@@ -76,27 +131,10 @@ class AIService:
         Raises:
             ValueError: For invalid configurations or response structure issues.
         """
-        if not messages or not isinstance(messages, list):
-            raise ValueError("`messages` must be a non-empty list of ChatMessageResponse objects.")
-
         try:
-            formatted_messages = messages
-            if model and model.startswith(EAIModel.GEMINI):  # Adjust if `EAIModel.GEMINI` is used
-                formatted_messages = [
-                    {"role": msg.role, "parts": msg.content} for msg in messages
-                ]
-
-            prompt = build_prompt_from_messages(messages, topic)
-            output_parser = StrOutputParser()
-            llm = AIService.select_llm(model, variant, api_key)
-
-            if not llm:
-                raise ValueError(f"Invalid model configuration: {model}, {variant}")
-
-            # Chain the prompt, LLM, and output parser
-            chain = prompt | llm | output_parser
+            chain, inputs = AIService._prepare_chain(model, variant, api_key, messages, topic)
 
-            response = chain.stream({"messages": formatted_messages, "topic": topic})
+            response = chain.stream(inputs)
 
             if not response:
                 raise ValueError("Empty response received from the LLM chain.")
@@ -113,6 +151,80 @@ class AIService:
             print(f"Unexpected Error: {e}")
             raise RuntimeError("An unexpected error occurred while generating the response.") from e
 
+    @staticmethod
+    async def agenerate_ai_response(
+        model: Optional[str],
+        variant: Optional[str],
+        api_key: Optional[str],
+        messages: List[ChatMessageResponse],
+        topic: Optional[ETopic] = ETopic.GENERAL,
+        **options: Any
+    ) -> AsyncGenerator[str, None]:
+        """
+        Async counterpart of `generate_ai_response`, built on the chain's `astream`.
+
+        Reading from the LLM never blocks the event loop, so one slow stream does not stall the other
+        requests served by the same worker.
+
+        Args:
+            model (Optional[str]): LLM model name or identifier.
+            variant (Optional[str]): Specific variant of the model (e.g., version).
+            api_key (Optional[str]): API key for external models.
+            messages (List[ChatMessageResponse]): The conversation so far.
+            topic (Optional[ETopic]): Contextual topic for prompt enhancement.
+            **options: Sampling options passed to the LLM, e.g. `temperature`.
+
+        Yields:
+            str: Generated response chunks.
+
+        Raises:
+            ValueError: For invalid configurations or response structure issues.
+        """
+        try:
+            chain, inputs = AIService._prepare_chain(model, variant, api_key, messages, topic, **options)
+
+            async for chunk in chain.astream(inputs):
+                yield chunk
+        except ValueError as ve:
+            print(f"Configuration Error: {ve}")
+            raise ve
+        except TypeError as te:
+            print(f"TypeError while streaming response: {te}")
+            raise ValueError("Invalid response structure from the LLM chain.") from te
+        except Exception as e:
+            print(f"Unexpected Error: {e}")
+            raise RuntimeError("An unexpected error occurred while generating the response.") from e
+
+    @staticmethod
+    def _prepare_chain(
+        model: Optional[str],
+        variant: Optional[str],
+        api_key: Optional[str],
+        messages: List[ChatMessageResponse],
+        topic: Optional[ETopic],
+        **options: Any
+    ) -> Tuple[Runnable, Dict[str, Any]]:
+        """
+        Build the prompt chain and its inputs for a generation request.
+
+        Raises:
+            ValueError: If `messages` is empty or the model configuration is invalid.
+        """
+        if not messages or not isinstance(messages, list):
+            raise ValueError("`messages` must be a non-empty list of ChatMessageResponse objects.")
+
+        formatted_messages = messages
+        if model and model.startswith(EAIModel.GEMINI):  # Adjust if `EAIModel.GEMINI` is used
+            formatted_messages = [
+                {"role": msg.role, "parts": msg.content} for msg in messages
+            ]
+
+        prompt = build_prompt_from_messages(messages, topic)
+
+        # Chain the prompt with the pooled LLM and output parser
+        chain = prompt | AIService.select_chain(model, variant, api_key, **options)
+        return chain, {"messages": formatted_messages, "topic": topic}
+
     @staticmethod
     async def generate_title(
             model: str,
@@ -133,26 +245,64 @@ class AIService:
             str: A generated title for the conversation.
         """
         prompt = build_prompt_from_messages(messages, ETopic.TITLE)
-        output_parser = StrOutputParser()
-        llm = AIService.select_llm(model, variant, api_key)
-        if not llm:
-            raise ValueError(f"Invalid model configuration: {model}, {variant}")
 
-        # Chain the prompt, LLM, and output parser
-        chain = prompt | llm | output_parser
+        # Chain the prompt with the pooled LLM and output parser
+        chain = prompt | AIService.select_chain(model, variant, api_key)
 
-        response = chain.invoke({"messages": messages, "topic": ETopic.TITLE})
+        response = await chain.ainvoke({"messages": messages, "topic": ETopic.TITLE})
 
         if not response:
             raise ValueError("Empty response received from the LLM chain.")
         return response.strip()
 
+    @staticmethod
+    async def generate_titles(
+            model: str,
+            variant: Optional[str],
+            api_key: Optional[str],
+            conversations: List[List[ChatMessageResponse]]
+    ) -> List[Optional[str]]:
+        """
+        Generate titles for several conversations with a single LLM call.
+
+        Args:
+            model (str): Model name or identifier.
+            variant (Optional[str]): Specific variant of the model.
+            api_key (Optional[str]): API key for external models.
+            conversations (List[List[ChatMessageResponse]]): The conversations to title.
+
+        Returns:
+            List[Optional[str]]: One title per conversation, None where the answer could not be parsed.
+        """
+        numbered = "\n\n".join(
+            f"Conversation {index}:\n" + "\n".join(f"{msg.role}: {msg.content}" for msg in messages)
+            for index, messages in enumerate(conversations, start=1)
+        )
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", "Create a concise, 3-4 word title that accurately summarizes each of the following "
+                       "conversations. Answer with exactly one line per conversation, formatted as "
+                       "`<number>. <title>`, and nothing else."),
+            ("user", "{conversations}"),
+        ])
+
+        chain = prompt | AIService.select_chain(model, variant, api_key)
+
+        response = await chain.ainvoke({"conversations": numbered})
+
+        titles: List[Optional[str]] = [None] * len(conversations)
+        for match in re.finditer(r"^\s*(\d+)[.):]\s*(.+?)\s*$", response or "", re.MULTILINE):
+            index = int(match.group(1)) - 1
+            if 0 <= index < len(titles):
+                titles[index] = match.group(2).strip().strip('"')
+        return titles
+
     @staticmethod
     def summarise_messages(
             model: str,
             variant: Optional[str],
             api_key: Optional[str],
-            messages: List[ChatMessageResponse]
+            messages: List[ChatMessageResponse],
+            previous_summary: Optional[str] = None
     ) -> str:
         """
         Summarise a list of messages into one concise response.
@@ -162,21 +312,56 @@ class AIService:
             variant (Optional[str]): Specific variant of the model.
             api_key (Optional[str]): API key for external models.
             messages (List[ChatMessageResponse]): List of chat messages.
+            previous_summary (Optional[str]): Summary of the messages before these, extended incrementally.
 
         Returns:
             str: A summarised version of the messages.
         """
+        messages = AIService._with_previous_summary(messages, previous_summary)
         prompt = build_prompt_from_messages(messages, ETopic.SUMMARIZE)
-        output_parser = StrOutputParser()
-        llm = AIService.select_llm(model, variant, api_key)
-        if not llm:
-            raise ValueError(f"Invalid model configuration: {model}, {variant}")
 
-        # Chain the prompt, LLM, and output parser
-        chain = prompt | llm | output_parser
+        # Chain the prompt with the pooled LLM and output parser
+        chain = prompt | AIService.select_chain(model, variant, api_key)
 
         response = chain.invoke({"messages": messages, "topic": ETopic.SUMMARIZE})
 
         if not response:
             raise ValueError("Empty response received from the LLM chain.")
-        return response.strip()
\ No newline at end of file
+        return response.strip()
+
+    @staticmethod
+    async def asummarise_messages(
+            model: str,
+            variant: Optional[str],
+            api_key: Optional[str],
+            messages: List[ChatMessageResponse],
+            previous_summary: Optional[str] = None
+    ) -> str:
+        """
+        Async counterpart of `summarise_messages`.
+        """
+        messages = AIService._with_previous_summary(messages, previous_summary)
+        prompt = build_prompt_from_messages(messages, ETopic.SUMMARIZE)
+
+        # Chain the prompt with the pooled LLM and output parser
+        chain = prompt | AIService.select_chain(model, variant, api_key)
+
+        response = await chain.ainvoke({"messages": messages, "topic": ETopic.SUMMARIZE})
+
+        if not response:
+            raise ValueError("Empty response received from the LLM chain.")
+        return response.strip()
+
+    @staticmethod
+    def _with_previous_summary(
+            messages: List[ChatMessageResponse],
+            previous_summary: Optional[str]
+    ) -> List[ChatMessageResponse]:
+        if not previous_summary:
+            return messages
+        summary = ChatMessageResponse(
+            message_id="summary",
+            role=ERole.SYSTEM,
+            content=f"Summary of the earlier conversation: {previous_summary}"
+        )
+        return [summary, *messages]
@@ -0,0 +1,506 @@
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+from itertools import chain
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import zstandard
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import config
+from app.database.cold_storage import COLD, HOT
+from app.database.compression import SQL_DECOMPRESS, register_sql_functions
+from app.database.db import AsyncSessionLocal, DATABASE_PATH, cold_storage
+from app.database.schema import Backup, BackupConfiguration
+from app.enums.backup import EBackupFrequency, EBackupKind, EBackupService, EBackupStatus
+from app.services.db_writer import db_writer
+from app.services.history_transfer import deleted_record, encode_record, message_record, session_record
+
+# Written last into every backup directory, lists its files with their checksums
+MANIFEST = "manifest.json"
+MANIFEST_FORMAT = 1
+
+# File of an incremental backup: one JSON record per line, zstd-compressed
+SESSIONS_FILE = "sessions.jsonl.zst"
+EXPORT_BATCH = 500  # Sessions read by one query of an incremental backup
+
+
+class _ChecksumFile:
+    """
+    File opened for writing, keeping the SHA-256 and size of everything written to it.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "wb")
+        self._sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data) -> int:
+        self._file.write(data)
+        self._sha256.update(data)
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+    @property
+    def checksum(self) -> str:
+        return self._sha256.hexdigest()
+
+
+def _open_source(database_path: str, cold_path: Optional[str]) -> Tuple[sqlite3.Connection, List[str]]:
+    """
+    Connection of its own to the database files being backed up, with the schemas it reads.
+    """
+    source = sqlite3.connect(database_path, isolation_level=None, check_same_thread=False)
+    register_sql_functions(source)
+    schemas = [HOT]
+    if cold_path and os.path.exists(cold_path):
+        source.execute(f"ATTACH DATABASE ? AS {COLD}", (cold_path,))
+        schemas.append(COLD)
+    return source, schemas
+
+
+def _begin_snapshot(source: sqlite3.Connection, schemas: Sequence[str]) -> bool:
+    """
+    Open a read transaction on `source` when every file is in WAL mode, so that all later reads, and the
+    page-stepped copies, see one snapshot of the files while the app keeps writing. Under a rollback journal a
+    reader blocks the writers, so there reads go without one.
+    """
+    if all(source.execute(f"PRAGMA {schema}.journal_mode").fetchone()[0] == "wal" for schema in schemas):
+        source.execute("BEGIN")
+        return True
+    return False
+
+
+def _session_versions(source: sqlite3.Connection, schemas: Sequence[str]) -> Dict[str, int]:
+    return {
+        session_id: version
+        for schema in schemas
+        for session_id, version in source.execute(f"SELECT session_id, version FROM {schema}.chat_sessions")
+    }
+
+
+def _session_records(source: sqlite3.Connection, schemas: Sequence[str], session_ids: List[str]) -> Iterator[Dict[str, Any]]:
+    """
+    A `session` record for each of the sessions, followed by a `message` record for each of their messages.
+    """
+    for start in range(0, len(session_ids), EXPORT_BATCH):
+        selected = json.dumps(session_ids[start:start + EXPORT_BATCH])
+        for schema in schemas:
+            for row in source.execute(
+                f"SELECT session_id, session_name, archived, favorite, created_at, version, topic "
+                f"FROM {schema}.chat_sessions WHERE session_id IN (SELECT value FROM json_each(?))", (selected,)
+            ):
+                yield session_record(*row)
+            for row in source.execute(
+                f"SELECT session_id, message_id, role, model, variant, {SQL_DECOMPRESS}(content), created_at "
+                f"FROM {schema}.chat_messages WHERE session_id IN (SELECT value FROM json_each(?)) "
+                f"ORDER BY session_id, created_at, id", (selected,)
+            ):
+                yield message_record(*row)
+
+
+def _compress_file(path: str, target_path: str, level: int) -> Dict[str, Any]:
+    target = _ChecksumFile(target_path)
+    try:
+        with open(path, "rb") as source:
+            zstandard.ZstdCompressor(level=level).copy_stream(source, target)
+    finally:
+        target.close()
+    return {"sha256": target.checksum, "bytes": target.size, "source_bytes": os.path.getsize(path)}
+
+
+def _write_manifest(directory: str, manifest: Dict[str, Any]) -> str:
+    data = json.dumps(manifest, sort_keys=True).encode("utf-8")
+    target = _ChecksumFile(os.path.join(directory, MANIFEST))
+    target.write(data)
+    target.close()
+    return target.checksum
+
+
+def read_manifest(directory: str, checksum: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Manifest of the backup in `directory`, or None when it is missing or does not match `checksum`.
+    """
+    try:
+        with open(os.path.join(directory, MANIFEST), "rb") as file:
+            data = file.read()
+    except OSError:
+        return None
+    if checksum is not None and hashlib.sha256(data).hexdigest() != checksum:
+        return None
+    return json.loads(data)
+
+
+def verify_backup(directory: str, checksum: Optional[str] = None) -> bool:
+    """
+    Whether every file listed by the manifest of the backup in `directory` is intact.
+    """
+    manifest = read_manifest(directory, checksum)
+    if manifest is None:
+        return False
+    for name, details in manifest["files"].items():
+        sha256 = hashlib.sha256()
+        try:
+            with open(os.path.join(directory, name), "rb") as file:
+                for block in iter(lambda: file.read(1 << 20), b""):
+                    sha256.update(block)
+        except OSError:
+            return False
+        if sha256.hexdigest() != details["sha256"]:
+            return False
+    return True
+
+
+def write_full_backup(
+    database_path: str,
+    cold_path: Optional[str],
+    directory: str,
+    pages_per_step: int = config.BACKUP_PAGES_PER_STEP,
+    step_sleep: float = config.BACKUP_STEP_SLEEP,
+    level: int = config.BACKUP_COMPRESSION_LEVEL,
+) -> Tuple[Dict[str, Any], str]:
+    """
+    Copy the main and cold database files into `directory`, zstd-compressed, then write their manifest.
+
+    Files are copied with SQLite's online backup API, `pages_per_step` pages at a time: the app's connections
+    can read and write between two steps. In WAL mode the copy reads one snapshot; otherwise SQLite restarts it
+    whenever another connection writes between two steps.
+
+    Returns:
+        Tuple[Dict[str, Any], str]: The manifest and its SHA-256.
+    """
+    os.makedirs(directory)
+    source, schemas = _open_source(database_path, cold_path)
+    try:
+        _begin_snapshot(source, schemas)
+        # Read before copying: a session changed in between is exported again by the next incremental backup
+        versions = _session_versions(source, schemas)
+        files = {}
+        for schema in schemas:
+            copy_path = os.path.join(directory, f"{schema}.db")
+            target = sqlite3.connect(copy_path)
+            try:
+                # `sleep` only applies to steps that found the file locked, pauses between all steps go here
+                source.backup(
+                    target, pages=pages_per_step, progress=lambda *_: time.sleep(step_sleep), name=schema
+                )
+            finally:
+                target.close()
+            files[f"{schema}.db.zst"] = _compress_file(copy_path, os.path.join(directory, f"{schema}.db.zst"), level)
+            os.remove(copy_path)
+        schema_version = source.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        source.close()
+
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "kind": str(EBackupKind.FULL),
+        "created_at": datetime.now().isoformat(),
+        "schema_version": schema_version,
+        "files": files,
+        "sessions": versions,
+    }
+    return manifest, _write_manifest(directory, manifest)
+
+
+def write_incremental_backup(
+    database_path: str,
+    cold_path: Optional[str],
+    directory: str,
+    parent: Dict[str, Any],
+    level: int = config.BACKUP_COMPRESSION_LEVEL,
+) -> Tuple[Dict[str, Any], str]:
+    """
+    Write the sessions changed since the backup of manifest `parent` into `directory`, then its manifest.
+
+    A session changed when its version differs from the one in `parent`; it is written whole, as a `session`
+    record followed by its `message` records, with a `deleted` record for each session gone since. Records are
+    the JSON lines of `HistoryTransfer`, zstd-compressed, so the file can be imported as it is. Documents are
+    only part of full backups.
+
+    Returns:
+        Tuple[Dict[str, Any], str]: The manifest and its SHA-256.
+    """
+    os.makedirs(directory)
+    source, schemas = _open_source(database_path, cold_path)
+    try:
+        _begin_snapshot(source, schemas)
+        versions = _session_versions(source, schemas)
+        changed = [session_id for session_id, version in versions.items() if parent["sessions"].get(session_id) != version]
+        deleted = [session_id for session_id in parent["sessions"] if session_id not in versions]
+
+        target = _ChecksumFile(os.path.join(directory, SESSIONS_FILE))
+        source_bytes = 0
+        try:
+            with zstandard.ZstdCompressor(level=level).stream_writer(target, closefd=False) as writer:
+                records = chain(_session_records(source, schemas, changed), map(deleted_record, deleted))
+                for record in records:
+                    line = encode_record(record)
+                    source_bytes += len(line)
+                    writer.write(line)
+        finally:
+            target.close()
+        schema_version = source.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        source.close()
+
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "kind": str(EBackupKind.INCREMENTAL),
+        "created_at": datetime.now().isoformat(),
+        "schema_version": schema_version,
+        "files": {SESSIONS_FILE: {"sha256": target.checksum, "bytes": target.size, "source_bytes": source_bytes}},
+        "sessions": versions,
+        "changed_sessions": len(changed),
+        "deleted_sessions": len(deleted),
+    }
+    return manifest, _write_manifest(directory, manifest)
+
+
+def resolve_target_directory(target_directory: Optional[str], root: str = config.BACKUP_DIRECTORY) -> str:
+    """
+    Directory local backups of a configuration are written to: `target_directory` taken relative to `root`,
+    `root` itself when unset.
+
+    Raises:
+        ValueError: If the directory, once links and `..` are resolved, is outside of `root`.
+    """
+    root = os.path.realpath(root)
+    directory = os.path.realpath(os.path.join(root, target_directory or ""))
+    if os.path.commonpath([root, directory]) != root:
+        raise ValueError(f"Backup target directory must be inside {root}.")
+    return directory
+
+
+def _interval(schedule_frequency: str) -> timedelta:
+    try:
+        return EBackupFrequency(schedule_frequency).interval
+    except ValueError:
+        print(f"Unknown backup frequency {schedule_frequency!r}, backing up daily")
+        return EBackupFrequency.DAILY.interval
+
+
+class BackupEngine:
+    """
+    Backs up the database files on the schedule of each `BackupConfiguration`, and records every run as a
+    `Backup` with its timing, sizes and throughput.
+
+    Every `full_every`-th scheduled backup is full: both database files, copied page by page through SQLite's
+    online backup API so the app keeps serving. The others are incremental, holding only the sessions changed
+    since the previous backup, found through their version counter. Each backup is a directory of
+    zstd-compressed files and a manifest with their SHA-256, the checksum of the manifest is kept on the
+    `Backup`; an incremental backup whose parent is missing or altered is made full instead.
+
+    Backups run one at a time, off the event loop, on connections of their own; only the `Backup` records go
+    through `db_writer`. Only the local service is supported, other services record a failed backup.
+    """
+
+    def __init__(
+        self,
+        database_path: str = DATABASE_PATH,
+        cold_path: Optional[str] = cold_storage.path,
+        pages_per_step: int = config.BACKUP_PAGES_PER_STEP,
+        step_sleep: float = config.BACKUP_STEP_SLEEP,
+        full_every: int = config.BACKUP_FULL_EVERY,
+        level: int = config.BACKUP_COMPRESSION_LEVEL,
+        check_interval: float = config.BACKUP_CHECK_INTERVAL,
+    ):
+        self.database_path = database_path
+        self.cold_path = cold_path
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.full_every = full_every
+        self.level = level
+        self.check_interval = check_interval
+        self._lock = asyncio.Lock()
+        self._worker: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.failures = 0
+        self.bytes_written = 0
+        self.last_duration: Optional[float] = None
+        self.last_throughput: Optional[float] = None
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Running scheduled backups failed: {e}")
+            await asyncio.sleep(self.check_interval)
+
+    async def run_due(self) -> List[Backup]:
+        """
+        Back up every configuration whose next backup is due.
+
+        Returns:
+            List[Backup]: The backups made.
+        """
+        async with AsyncSessionLocal() as db:
+            configuration_ids = list(await db.scalars(
+                select(BackupConfiguration.id).where(
+                    (BackupConfiguration.next_backup == None) | (BackupConfiguration.next_backup <= datetime.now())
+                )
+            ))
+        return [backup for configuration_id in configuration_ids if (backup := await self.run(configuration_id))]
+
+    async def _plan(
+        self, db: AsyncSession, configuration_id: int, kind: Optional[EBackupKind]
+    ) -> Tuple[EBackupKind, Optional[Backup], Optional[Dict[str, Any]]]:
+        """
+        Kind of the next backup of a configuration, with the backup it builds on and that backup's manifest.
+        """
+        completed = (Backup.configuration_id == configuration_id) & (Backup.status == EBackupStatus.COMPLETED)
+        parent = await db.scalar(select(Backup).where(completed).order_by(Backup.id.desc()).limit(1))
+        if kind == EBackupKind.FULL or parent is None:
+            return EBackupKind.FULL, None, None
+        manifest = read_manifest(parent.file_path, parent.checksum)
+        if manifest is None:
+            print(f"Backup {parent.id} is missing or altered, making a full backup")
+            return EBackupKind.FULL, None, None
+        if kind is None:
+            last_full = await db.scalar(
+                select(func.max(Backup.id)).where(completed & (Backup.kind == EBackupKind.FULL))
+            )
+            since_full = await db.scalar(
+                select(func.count()).select_from(Backup).where(completed & (Backup.id > (last_full or 0)))
+            )
+            if last_full is None or since_full + 1 >= self.full_every:
+                return EBackupKind.FULL, None, None
+        return EBackupKind.INCREMENTAL, parent, manifest
+
+    async def run(self, configuration_id: int, kind: Optional[EBackupKind] = None) -> Optional[Backup]:
+        """
+        Back up now with a configuration, and schedule its next backup.
+
+        Args:
+            configuration_id (int): ID of the `BackupConfiguration`.
+            kind (Optional[EBackupKind]): Kind of backup, by default the one the schedule calls for.
+
+        Returns:
+            Optional[Backup]: The recorded backup, or None when the configuration does not exist.
+        """
+        async with self._lock:
+            async with AsyncSessionLocal() as db:
+                configuration = await db.get(BackupConfiguration, configuration_id)
+                if configuration is None:
+                    return None
+                kind, parent, manifest = await self._plan(db, configuration_id, kind)
+
+            directory, error = "", None
+            if configuration.enabled_service == EBackupService.LOCAL:
+                try:
+                    target = resolve_target_directory(configuration.target_directory)
+                    directory = os.path.join(target, f"{datetime.now():%Y%m%d-%H%M%S-%f}-{kind.value}")
+                except ValueError as e:
+                    error = str(e)
+            else:
+                error = f"Backups to {configuration.enabled_service} are not supported yet."
+
+            async def record(db: AsyncSession) -> int:
+                backup = Backup(
+                    configuration_id=configuration_id, storage_service=configuration.enabled_service,
+                    file_path=directory, status=EBackupStatus.FAILED if error else EBackupStatus.RUNNING,
+                    kind=kind, parent_id=parent.id if parent else None, error=error,
+                )
+                db.add(backup)
+                await db.flush()
+                return backup.id
+
+            backup_id = await db_writer.submit(record)
+            results: Dict[str, Any] = {}
+            if error is None:
+                started = time.perf_counter()
+                try:
+                    if kind == EBackupKind.FULL:
+                        written, checksum = await asyncio.to_thread(
+                            write_full_backup, self.database_path, self.cold_path, directory,
+                            self.pages_per_step, self.step_sleep, self.level
+                        )
+                    else:
+                        written, checksum = await asyncio.to_thread(
+                            write_incremental_backup, self.database_path, self.cold_path, directory, manifest,
+                            self.level
+                        )
+                    duration = time.perf_counter() - started
+                    source_bytes = sum(file["source_bytes"] for file in written["files"].values())
+                    results = {
+                        "status": EBackupStatus.COMPLETED,
+                        "duration": duration,
+                        "source_bytes": source_bytes,
+                        "size_bytes": sum(file["bytes"] for file in written["files"].values()),
+                        "throughput": source_bytes / duration if duration > 0 else None,
+                        "checksum": checksum,
+                        "sessions": written.get("changed_sessions", 0) + written.get("deleted_sessions", 0)
+                        if kind == EBackupKind.INCREMENTAL else len(written["sessions"]),
+                    }
+                except Exception as e:
+                    shutil.rmtree(directory, ignore_errors=True)
+                    error = str(e)
+                    results = {"status": EBackupStatus.FAILED, "duration": time.perf_counter() - started, "error": error}
+
+            async def finish(db: AsyncSession) -> Backup:
+                if results:
+                    await db.execute(update(Backup).where(Backup.id == backup_id).values(**results))
+                now = datetime.now()
+                values: Dict[str, Any] = {"next_backup": now + _interval(configuration.schedule_frequency)}
+                if error is None:
+                    values["last_backup"] = now
+                await db.execute(
+                    update(BackupConfiguration).where(BackupConfiguration.id == configuration_id).values(**values)
+                )
+                return await db.get(Backup, backup_id, populate_existing=True)
+
+            backup = await db_writer.submit(finish)
+
+        self.runs += 1
+        if error is None:
+            self.bytes_written += backup.size_bytes
+            self.last_duration = backup.duration
+            self.last_throughput = backup.throughput
+        else:
+            self.failures += 1
+            print(f"Backup {backup_id} failed: {error}")
+        return backup
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._lock.locked(),
+            "runs": self.runs,
+            "failures": self.failures,
+            "bytes_written": self.bytes_written,
+            "last_duration": self.last_duration,
+            "last_throughput": self.last_throughput,
+        }
+
+
+# Shared backup engine, started with the app
+backup_engine = BackupEngine()
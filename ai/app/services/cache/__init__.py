@@ -0,0 +1,3 @@
+"""
+Response caches for the AI service
+"""
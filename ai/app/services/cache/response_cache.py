@@ -0,0 +1,219 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, AsyncGenerator, Dict, List, Optional, Sequence, Tuple, Union
+
+from app.core.config import config
+from app.enums.topic import ETopic
+from app.models.chat_model import ChatMessageResponse
+
+
+@dataclass
+class ResponseCacheStats:
+    """
+    Hit/miss counters for the response cache.
+    """
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {**asdict(self), "hit_ratio": round(hits / total, 4) if total else 0.0}
+
+
+def make_cache_key(
+    model: Optional[str],
+    variant: Optional[str],
+    topic: Optional[ETopic],
+    messages: Sequence[Union[ChatMessageResponse, Dict[str, str]]],
+    params: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Build a normalized hash for a generation request.
+
+    Message ids are ignored and contents are stripped, so a regenerated or retried prompt maps to the same key.
+
+    Args:
+        model (Optional[str]): LLM model name or identifier.
+        variant (Optional[str]): Specific variant of the model.
+        topic (Optional[ETopic]): Contextual topic of the prompt.
+        messages (Sequence[Union[ChatMessageResponse, Dict[str, str]]]): The rendered message list.
+        params (Optional[Dict[str, Any]]): Sampling parameters, e.g. `temperature`.
+
+    Returns:
+        str: A hex sha256 digest.
+    """
+    rendered = []
+    for msg in messages:
+        role, content = (msg.role, msg.content) if isinstance(msg, ChatMessageResponse) else (msg["role"], msg["content"])
+        rendered.append([str(role).lower(), content.strip()])
+
+    payload = {
+        "model": (model or "").lower(),
+        "variant": (variant or "").lower(),
+        "topic": str(topic) if topic else None,
+        "messages": rendered,
+        "params": {name: value for name, value in sorted((params or {}).items()) if value is not None},
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+async def replay_chunks(chunks: List[str]) -> AsyncGenerator[str, None]:
+    """
+    Replay cached chunks with the same boundaries the original stream had.
+    """
+    for chunk in chunks:
+        yield chunk
+        await asyncio.sleep(0)
+
+
+class ResponseCache:
+    """
+    Two-tier cache of complete LLM responses, stored as the list of streamed chunks.
+
+    The memory tier is a small LRU in front of a persistent SQLite tier. Entries in the SQLite tier expire
+    after `ttl` seconds and the least recently used ones are pruned once the tier grows past `max_bytes`.
+    The tier's size is summed once on connect and kept up to date on each write, so a store never scans the
+    table unless it has to prune. SQLite work runs in a thread so it never blocks the event loop.
+    """
+
+    def __init__(
+        self,
+        db_path: str = config.RESPONSE_CACHE_DB_PATH,
+        memory_entries: int = config.RESPONSE_CACHE_MEMORY_ENTRIES,
+        ttl: float = config.RESPONSE_CACHE_TTL,
+        max_bytes: int = config.RESPONSE_CACHE_MAX_BYTES,
+    ):
+        self.db_path = db_path
+        self.memory_entries = memory_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[str, Tuple[float, List[str]]]" = OrderedDict()  # Key to (created_at, chunks)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._size = 0  # Bytes held by the SQLite tier, read from it on connect
+        self._lock = threading.Lock()
+        self._stats = ResponseCacheStats()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                " key TEXT PRIMARY KEY,"
+                " chunks TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_response_cache_accessed_at ON response_cache (accessed_at)"
+            )
+            self._connection.commit()
+            self._size = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM response_cache").fetchone()[0]
+        return self._connection
+
+    def _remember(self, key: str, chunks: List[str], created_at: float) -> None:
+        self._memory[key] = (created_at, chunks)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_sync(self, key: str) -> Optional[List[str]]:
+        with self._lock:
+            now = time.time()
+            remembered = self._memory.get(key)
+            if remembered is not None and now - remembered[0] <= self.ttl:
+                self._memory.move_to_end(key)
+                self._stats.memory_hits += 1
+                return remembered[1]
+            # An expired entry is dropped from both tiers below, as the disk row is just as old
+            self._memory.pop(key, None)
+
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT chunks, created_at, size FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats.misses += 1
+                return None
+            if now - row[1] > self.ttl:
+                connection.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                connection.commit()
+                self._size -= row[2]
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return None
+
+            connection.execute("UPDATE response_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            connection.commit()
+            chunks = json.loads(row[0])
+            self._remember(key, chunks, row[1])
+            self._stats.disk_hits += 1
+            return chunks
+
+    def put_sync(self, key: str, chunks: List[str]) -> None:
+        encoded = json.dumps(chunks, ensure_ascii=False)
+        with self._lock:
+            now = time.time()
+            self._remember(key, chunks, now)
+
+            connection = self._connect()
+            size = len(encoded.encode("utf-8"))
+            replaced = connection.execute("SELECT size FROM response_cache WHERE key = ?", (key,)).fetchone()
+            connection.execute(
+                "INSERT OR REPLACE INTO response_cache (key, chunks, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, size, now, now)
+            )
+            self._size += size - (replaced[0] if replaced else 0)
+            self._stats.stores += 1
+            if self._size > self.max_bytes:
+                self._prune(connection, now)
+            connection.commit()
+
+    def _prune(self, connection: sqlite3.Connection, now: float) -> None:
+        # Expired rows go first, then the least recently used ones until the tier fits again
+        for key, size, created_at in connection.execute(
+            "SELECT key, size, created_at FROM response_cache ORDER BY created_at >= ?, accessed_at",
+            (now - self.ttl,)
+        ).fetchall():
+            if self._size <= self.max_bytes:
+                break
+            connection.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            self._size -= size
+            if created_at < now - self.ttl:
+                self._stats.expirations += 1
+            else:
+                self._stats.evictions += 1
+
+    async def get(self, key: str) -> Optional[List[str]]:
+        return await asyncio.to_thread(self.get_sync, key)
+
+    async def put(self, key: str, chunks: List[str]) -> None:
+        await asyncio.to_thread(self.put_sync, key, chunks)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._connect().execute("DELETE FROM response_cache")
+            self._connection.commit()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats.as_dict(), "memory_entries": len(self._memory), "disk_bytes": self._size}
+
+
+# Shared response cache used by the generation pipeline
+response_cache = ResponseCache()
@@ -0,0 +1,193 @@
+import asyncio
+import hashlib
+import itertools
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import config
+from app.enums.ai import EAIEmbedding
+from app.enums.topic import ETopic
+from app.models.chat_model import ChatMessageResponse
+from app.services.document_processing.embeddings import get_embeddings_client
+
+
+@dataclass
+class SemanticCacheStats:
+    """
+    Counters for the semantic response cache.
+    """
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    embedding_errors: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {**asdict(self), "hit_ratio": round(self.hits / total, 4) if total else 0.0}
+
+
+@dataclass
+class _Entry:
+    scope: Tuple[str, ...]
+    prompt: str
+    chunks: List[str]
+
+
+class _ScopeIndex:
+    """
+    Dense matrix of unit-length prompt embeddings for one scope, searched with a single matrix-vector product.
+    """
+
+    def __init__(self, dim: int):
+        self.vectors = np.empty((16, dim), dtype=np.float32)
+        self.ids: List[int] = []
+        self.rows: Dict[int, int] = {}
+
+    def add(self, entry_id: int, vector: np.ndarray) -> None:
+        if len(self.ids) == self.vectors.shape[0]:
+            self.vectors = np.concatenate([self.vectors, np.empty_like(self.vectors)])
+        self.vectors[len(self.ids)] = vector
+        self.rows[entry_id] = len(self.ids)
+        self.ids.append(entry_id)
+
+    def remove(self, entry_id: int) -> None:
+        # Swap the last row into the removed slot to keep the matrix dense
+        row = self.rows.pop(entry_id)
+        last_id = self.ids.pop()
+        if last_id != entry_id:
+            self.vectors[row] = self.vectors[len(self.ids)]
+            self.ids[row] = last_id
+            self.rows[last_id] = row
+
+    def nearest(self, vector: np.ndarray) -> Tuple[Optional[int], float]:
+        if not self.ids:
+            return None, 0.0
+        scores = self.vectors[:len(self.ids)] @ vector
+        row = int(np.argmax(scores))
+        return self.ids[row], float(scores[row])
+
+
+def _embed_with_default_model(text: str) -> Sequence[float]:
+    return get_embeddings_client(EAIEmbedding(config.SEMANTIC_CACHE_EMBEDDING_MODEL)).embed_query(text)
+
+
+class SemanticCache:
+    """
+    Response cache that matches paraphrased prompts by embedding similarity.
+
+    Only the final user turn is embedded. Entries are scoped per model, variant, topic, generation parameters and
+    the conversation before that turn, so a standalone question can be answered from any earlier paraphrase while a
+    follow-up only matches within the same history. Memory is bounded by `max_entries`, evicting the least recently
+    used.
+    """
+
+    def __init__(
+        self,
+        threshold: float = config.SEMANTIC_CACHE_THRESHOLD,
+        max_entries: int = config.SEMANTIC_CACHE_MAX_ENTRIES,
+        embed: Callable[[str], Sequence[float]] = _embed_with_default_model,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._embed = embed
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._scopes: Dict[Tuple[str, ...], _ScopeIndex] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._stats = SemanticCacheStats()
+
+    @staticmethod
+    def split_messages(messages: Sequence[ChatMessageResponse]) -> Tuple[Optional[str], List[ChatMessageResponse]]:
+        """
+        Split a conversation into its final user turn and the history before it.
+        """
+        if not messages or str(messages[-1].role).lower() != "user":
+            return None, list(messages)
+        return messages[-1].content.strip(), list(messages[:-1])
+
+    @staticmethod
+    def make_scope(
+        model: Optional[str],
+        variant: Optional[str],
+        topic: Optional[ETopic],
+        history: Sequence[ChatMessageResponse],
+        params: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, ...]:
+        """
+        Scope of a prompt: only prompts sent with the same model, generation parameters and history can share
+        an answer, as with `make_cache_key`.
+        """
+        digest = hashlib.sha256()
+        for msg in history:
+            digest.update(f"{str(msg.role).lower()}\x00{msg.content.strip()}\x00".encode("utf-8"))
+        frozen_params = json.dumps(
+            {name: value for name, value in (params or {}).items() if value is not None},
+            sort_keys=True, separators=(",", ":")
+        )
+        return (model or "").lower(), (variant or "").lower(), str(topic or ""), frozen_params, digest.hexdigest()
+
+    def embed(self, text: str) -> Optional[np.ndarray]:
+        """
+        Embed `text` as a unit-length float32 vector, or return None if the embedding backend fails.
+        """
+        try:
+            vector = np.asarray(self._embed(text), dtype=np.float32)
+        except Exception as e:
+            print(f"Semantic cache embedding failed: {e}")
+            self._stats.embedding_errors += 1
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def lookup(self, scope: Tuple[str, ...], vector: np.ndarray) -> Optional[List[str]]:
+        with self._lock:
+            index = self._scopes.get(scope)
+            entry_id, score = index.nearest(vector) if index and index.vectors.shape[1] == vector.shape[0] else (None, 0.0)
+            if entry_id is None or score < self.threshold:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(entry_id)
+            self._stats.hits += 1
+            return self._entries[entry_id].chunks
+
+    def store(self, scope: Tuple[str, ...], prompt: str, vector: np.ndarray, chunks: List[str]) -> None:
+        with self._lock:
+            index = self._scopes.get(scope)
+            if index is None:
+                index = self._scopes[scope] = _ScopeIndex(vector.shape[0])
+            elif index.vectors.shape[1] != vector.shape[0]:
+                return
+
+            entry_id = next(self._ids)
+            index.add(entry_id, vector)
+            self._entries[entry_id] = _Entry(scope=scope, prompt=prompt, chunks=chunks)
+            self._stats.stores += 1
+
+            while len(self._entries) > self.max_entries:
+                evicted_id, evicted = self._entries.popitem(last=False)
+                evicted_index = self._scopes[evicted.scope]
+                evicted_index.remove(evicted_id)
+                if not evicted_index.ids:
+                    del self._scopes[evicted.scope]
+                self._stats.evictions += 1
+
+    async def aembed(self, text: str) -> Optional[np.ndarray]:
+        return await asyncio.to_thread(self.embed, text)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._scopes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats.as_dict(), "entries": len(self._entries), "scopes": len(self._scopes)}
+
+
+# Shared semantic cache used by the generation pipeline
+semantic_cache = SemanticCache()
@@ -0,0 +1,113 @@
+import asyncio
+from dataclasses import dataclass, field, asdict
+from typing import AsyncGenerator, AsyncIterator, Callable, Dict, Hashable, List, Optional
+
+
+@dataclass
+class CoalescerStats:
+    """
+    Counters for in-flight request coalescing.
+    """
+    upstreams: int = 0  # Upstream generations started
+    coalesced: int = 0  # Subscribers that attached to an already running generation
+    cancelled_upstreams: int = 0  # Generations cancelled because every subscriber left
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+@dataclass
+class _Flight:
+    chunks: List[str] = field(default_factory=list)
+    done: bool = False
+    error: Optional[BaseException] = None
+    subscribers: int = 0
+    changed: asyncio.Condition = field(default_factory=asyncio.Condition)
+    task: Optional[asyncio.Task] = None
+
+
+class StreamCoalescer:
+    """
+    Single-flight coalescing of identical streamed generations.
+
+    The first request for a key starts the upstream stream in its own task; identical requests that arrive
+    while it is running subscribe to it instead of starting another one. Every subscriber receives the full
+    chunk sequence from the start, however late it joins. The upstream is cancelled only once its last
+    subscriber has left.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._stats = CoalescerStats()
+
+    async def subscribe(
+        self,
+        key: Hashable,
+        upstream: Callable[[], AsyncIterator[str]]
+    ) -> AsyncGenerator[str, None]:
+        """
+        Stream the chunks of the generation identified by `key`, starting it with `upstream` if none is running.
+
+        Args:
+            key (Hashable): Identity of the generation, e.g. the response cache key.
+            upstream (Callable[[], AsyncIterator[str]]): Starts the upstream stream when no flight is running.
+
+        Yields:
+            str: Response chunks, from the first one.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = _Flight()
+            flight.task = asyncio.create_task(self._pump(key, flight, upstream))
+            self._stats.upstreams += 1
+        else:
+            self._stats.coalesced += 1
+
+        flight.subscribers += 1
+        index = 0
+        try:
+            while True:
+                if index < len(flight.chunks):
+                    yield flight.chunks[index]
+                    index += 1
+                    continue
+                if flight.done:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+                async with flight.changed:
+                    await flight.changed.wait_for(lambda: index < len(flight.chunks) or flight.done)
+        finally:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.done:
+                self._stats.cancelled_upstreams += 1
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    async def _pump(self, key: Hashable, flight: _Flight, upstream: Callable[[], AsyncIterator[str]]) -> None:
+        try:
+            async for chunk in upstream():
+                async with flight.changed:
+                    flight.chunks.append(chunk)
+                    flight.changed.notify_all()
+        except asyncio.CancelledError:
+            flight.error = RuntimeError("The generation was cancelled.")
+        except Exception as e:
+            flight.error = e
+        finally:
+            # A finished flight is never joined again; later requests start fresh or hit the response cache
+            self._forget(key, flight)
+            async with flight.changed:
+                flight.done = True
+                flight.changed.notify_all()
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats.as_dict(), "in_flight": len(self._flights)}
+
+
+# Shared coalescer used by the generation pipeline
+generation_coalescer = StreamCoalescer()
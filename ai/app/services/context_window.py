@@ -0,0 +1,189 @@
+import asyncio
+import time
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import config
+from app.database.db import Session
+from app.database.schema import AIModel, ChatSessionSummary
+from app.enums.ai import EPriority
+from app.enums.chat import ERole
+from app.models.chat_model import ChatMessageResponse
+from app.services.ai import AIService
+from app.services.db_writer import db_writer
+from app.services.scheduler import llm_scheduler, backend_for
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough, provider-independent token estimate of about four characters per token.
+    """
+    return len(text) // 4 + 1
+
+
+def message_tokens(message: ChatMessageResponse) -> int:
+    return estimate_tokens(message.content) + 4  # Role and separators
+
+
+def _load_max_tokens(model: Optional[str], variant: Optional[str]) -> Optional[int]:
+    db = Session()
+    try:
+        row = db.query(AIModel.max_tokens).filter(AIModel.model == model, AIModel.variant == variant).first()
+    finally:
+        db.close()
+    try:
+        return int(row.max_tokens) if row else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _load_summary(session_id: str) -> Optional[Tuple[str, int, Optional[str]]]:
+    db = Session()
+    try:
+        row = db.query(ChatSessionSummary).filter(ChatSessionSummary.session_id == session_id).first()
+        return (row.summary, row.covered_messages, row.last_message_id) if row else None
+    finally:
+        db.close()
+
+
+async def _save_summary(session_id: str, summary: str, covered_messages: int, last_message_id: str) -> None:
+    async def save(db: AsyncSession) -> None:
+        row = await db.scalar(select(ChatSessionSummary).where(ChatSessionSummary.session_id == session_id))
+        if not row:
+            row = ChatSessionSummary(session_id=session_id)
+            db.add(row)
+        row.summary = summary
+        row.covered_messages = covered_messages
+        row.last_message_id = last_message_id
+
+    await db_writer.submit(save)
+
+
+class ContextWindowManager:
+    """
+    Fits a conversation into the model's token budget before it is sent to the LLM.
+
+    The most recent turns are kept verbatim. For a stored session, everything older is replaced by a rolling
+    summary that is persisted per session and only ever extended with the newly evicted messages, so it is
+    never recomputed from scratch. Without a session, or if summarising fails, the oldest turns are dropped.
+    """
+
+    def __init__(self, limit_ttl: float = 60.0):
+        self.limit_ttl = limit_ttl
+        self._limits: Dict[Tuple[Optional[str], Optional[str]], Tuple[int, float]] = {}
+        self._session_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self.trimmed = 0
+        self.summaries = 0
+        self.summary_failures = 0
+
+    async def token_limit(self, model: Optional[str], variant: Optional[str]) -> int:
+        """
+        Context size of a model: its configured `AIModel.max_tokens`, else `CONTEXT_DEFAULT_MAX_TOKENS`.
+        """
+        cached = self._limits.get((model, variant))
+        if cached and time.monotonic() - cached[1] < self.limit_ttl:
+            return cached[0]
+        limit = await asyncio.to_thread(_load_max_tokens, model, variant) or config.CONTEXT_DEFAULT_MAX_TOKENS
+        self._limits[(model, variant)] = (limit, time.monotonic())
+        return limit
+
+    async def fit(
+        self,
+        messages: List[ChatMessageResponse],
+        model: Optional[str],
+        variant: Optional[str],
+        api_key: Optional[str],
+        session_id: Optional[str] = None
+    ) -> List[ChatMessageResponse]:
+        """
+        Return the messages to send, within the model's prompt budget.
+
+        Args:
+            messages (List[ChatMessageResponse]): The full conversation, oldest first.
+            model (Optional[str]): LLM model name or identifier.
+            variant (Optional[str]): Specific variant of the model.
+            api_key (Optional[str]): API key for external models.
+            session_id (Optional[str]): Stored session the conversation belongs to, enables the rolling summary.
+
+        Returns:
+            List[ChatMessageResponse]: The fitted conversation, possibly starting with a summary system message.
+        """
+        budget = int(await self.token_limit(model, variant) * (1 - config.CONTEXT_RESPONSE_RESERVE))
+        if sum(message_tokens(message) for message in messages) <= budget:
+            return messages
+
+        self.trimmed += 1
+        verbatim_budget = budget - int(budget * config.CONTEXT_SUMMARY_SHARE)
+        split, used = len(messages), 0
+        while split > 1 and used + message_tokens(messages[split - 1]) <= verbatim_budget:
+            split -= 1
+            used += message_tokens(messages[split])
+        split = min(split, len(messages) - 1)  # The latest message is always kept
+
+        if not session_id:
+            return messages[split:]
+
+        lock = self._session_locks.get(session_id)
+        if lock is None:
+            lock = self._session_locks[session_id] = asyncio.Lock()
+        async with lock:
+            summary, covered = await self._summarise(session_id, messages, split, model, variant, api_key)
+        if summary is None:
+            return messages[split:]
+
+        summary_message = ChatMessageResponse(
+            message_id=f"summary-{session_id}",
+            role=ERole.SYSTEM,
+            content=f"Summary of the earlier conversation: {summary}"
+        )
+        return [summary_message, *messages[covered:]]
+
+    async def _summarise(
+        self,
+        session_id: str,
+        messages: List[ChatMessageResponse],
+        split: int,
+        model: Optional[str],
+        variant: Optional[str],
+        api_key: Optional[str]
+    ) -> Tuple[Optional[str], int]:
+        """
+        Make sure the stored summary covers at least `messages[:split]`, extending it if needed.
+
+        Returns:
+            Tuple[Optional[str], int]: The summary and how many leading messages it covers.
+        """
+        previous, covered = None, 0
+        stored = await asyncio.to_thread(_load_summary, session_id)
+        if stored:
+            summary, count, last_message_id = stored
+            # Only reuse the summary if the history it was built from is unchanged
+            if 0 < count < len(messages) and messages[count - 1].message_id == last_message_id:
+                previous, covered = summary, count
+        if covered >= split:
+            return previous, covered
+
+        try:
+            # The user's generation waits on this summary, so it must not queue behind background title jobs
+            async with llm_scheduler.slot(backend_for(model), EPriority.INTERACTIVE):
+                summary = await AIService.asummarise_messages(
+                    model, variant, api_key, messages[covered:split], previous_summary=previous
+                )
+            await _save_summary(session_id, summary, split, messages[split - 1].message_id)
+        except Exception as e:
+            print(f"Summarising session {session_id} failed: {e}")
+            self.summary_failures += 1
+            return None, split
+
+        self.summaries += 1
+        return summary, split
+
+    def stats(self) -> Dict[str, Any]:
+        return {"trimmed": self.trimmed, "summaries": self.summaries, "summary_failures": self.summary_failures}
+
+
+# Shared context window manager used by the generation pipeline
+context_window = ContextWindowManager()
@@ -0,0 +1,152 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import config
+from app.database.db import AsyncWriteSessionLocal
+
+T = TypeVar("T")
+
+# A write stages its changes on the session it is given and returns a result; the writer commits
+WriteOperation = Callable[[AsyncSession], Awaitable[T]]
+
+
+class DatabaseWriter:
+    """
+    Single writer task that applies every write to the chat database, in submission order.
+
+    SQLite allows one writer at a time, so concurrent requests committing on their own connections mostly wait on
+    the database lock and each pay for their own fsync. Here writes are queued instead: the writer takes the
+    writes that arrive within `window` seconds of the first one, up to `max_batch`, runs them on one session and
+    commits them together. If any write of a batch fails, the batch is rolled back and its writes are retried one
+    transaction each, so a bad write only fails its own caller.
+    """
+
+    def __init__(
+        self,
+        window: float = config.WRITE_BATCH_WINDOW,
+        max_batch: int = config.WRITE_BATCH_MAX,
+        session_factory: async_sessionmaker = AsyncWriteSessionLocal
+    ):
+        self.window = window
+        self.max_batch = max_batch
+        self.session_factory = session_factory
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._latencies: "deque[float]" = deque(maxlen=1024)
+        self.writes = 0
+        self.batches = 0
+        self.failed_batches = 0
+
+    async def submit(self, operation: WriteOperation[T]) -> T:
+        """
+        Queue a write and wait until it is committed.
+
+        When the writer is not running, e.g. outside the app's lifespan, the write is committed right away.
+
+        Args:
+            operation (WriteOperation): Coroutine function staging the write on the session it is given.
+                It must not commit, and may run more than once if its batch is retried.
+
+        Returns:
+            T: The result of `operation`, once committed.
+        """
+        if self._worker is None:
+            return await self._run_alone(operation)
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((operation, future, time.perf_counter()))
+        return await future
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            # Let queued writes finish before shutting down
+            await self._queue.join()
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._run_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _next_batch(self) -> List[Tuple[WriteOperation, asyncio.Future, float]]:
+        batch = [await self._queue.get()]
+        if self.window > 0 and self._queue.qsize() < self.max_batch - 1:
+            await asyncio.sleep(self.window)
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run_batch(self, batch: List[Tuple[WriteOperation, asyncio.Future, float]]) -> None:
+        self.batches += 1
+        try:
+            async with self.session_factory() as db:
+                results = []
+                for operation, _, _ in batch:
+                    results.append(await operation(db))
+                    # Keep ORM changes in submission order with the Core statements of later writes
+                    await db.flush()
+                await db.commit()
+        except Exception as e:
+            self.failed_batches += 1
+            print(f"Write batch of {len(batch)} failed, retrying its writes one by one: {e}")
+            for operation, future, queued_at in batch:
+                try:
+                    result = await self._run_alone(operation)
+                except Exception as error:
+                    self._finish(future, queued_at, error=error)
+                else:
+                    self._finish(future, queued_at, result=result)
+            return
+
+        for (_, future, queued_at), result in zip(batch, results):
+            self._finish(future, queued_at, result=result)
+
+    async def _run_alone(self, operation: WriteOperation[T]) -> T:
+        async with self.session_factory() as db:
+            result = await operation(db)
+            await db.commit()
+        return result
+
+    def _finish(self, future: asyncio.Future, queued_at: float, result: Any = None, error: Exception = None) -> None:
+        self.writes += 1
+        self._latencies.append(time.perf_counter() - queued_at)
+        # The caller may have been cancelled while waiting
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = sorted(self._latencies)
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "writes": self.writes,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "average_batch": round(self.writes / self.batches, 2) if self.batches else 0.0,
+            "p99_latency_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2) if latencies else 0.0,
+        }
+
+
+# Shared writer, started with the app
+db_writer = DatabaseWriter()
@@ -0,0 +1,95 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.schema import DocumentChunk
+from app.database.vectors import PackedEmbeddings, unpack_matrix
+from app.enums.ai import EVectorDType
+
+
+async def store_document_chunks(
+    db: AsyncSession,
+    document_id: int,
+    embeddings: PackedEmbeddings,
+    contents: Optional[Sequence[str]] = None
+) -> int:
+    """
+    Store the chunks of a document with their embeddings, one packed vector per row, as one statement. The
+    changes are staged on `db`, the caller commits.
+
+    Args:
+        db (AsyncSession): Session the statement runs on, usually the writer's.
+        document_id (int): Row ID of the document in `documents`.
+        embeddings (PackedEmbeddings): One row per chunk, in the order of the document.
+        contents (Optional[Sequence[str]]): Text of each chunk, not stored when omitted.
+
+    Returns:
+        int: Number of chunks stored.
+
+    Raises:
+        ValueError: If `contents` and `embeddings` have a different number of chunks.
+    """
+    if contents is not None and len(contents) != len(embeddings):
+        raise ValueError(f"Got {len(contents)} chunks for {len(embeddings)} embeddings.")
+    if not len(embeddings):
+        return 0
+
+    await db.execute(insert(DocumentChunk), [
+        {
+            "document_id": document_id,
+            "chunk_index": index,
+            "content": contents[index] if contents is not None else None,
+            "model": embeddings.model,
+            "dimension": embeddings.dimension,
+            "dtype": str(embeddings.dtype),
+            "embedding": row,
+        }
+        for index, row in enumerate(embeddings.rows())
+    ])
+    return len(embeddings)
+
+
+async def load_document_embeddings(
+    db: AsyncSession,
+    document_ids: Sequence[int],
+    model: str
+) -> Tuple[List[int], Optional[PackedEmbeddings]]:
+    """
+    Load the chunk embeddings of documents made by `model` as one matrix, ready for a similarity search.
+
+    Only the stored bytes are read, joined into a single buffer that the matrix is a view of. Chunks stored with
+    another element type or dimension than the first one, after a change of `config.EMBEDDING_DTYPE`, are
+    converted to float32 with it.
+
+    Args:
+        db (AsyncSession): Session the query runs on.
+        document_ids (Sequence[int]): Row IDs of the documents.
+        model (str): Embedding model, vectors of other models are skipped as they don't compare.
+
+    Returns:
+        Tuple[List[int], Optional[PackedEmbeddings]]: Row IDs of the chunks, by document and position, and their
+        embeddings in the same order, or None if there is none.
+    """
+    rows = (await db.execute(
+        select(DocumentChunk.id, DocumentChunk.dtype, DocumentChunk.dimension, DocumentChunk.embedding)
+        .where(DocumentChunk.document_id.in_(document_ids), DocumentChunk.model == model)
+        .order_by(DocumentChunk.document_id, DocumentChunk.chunk_index)  # Along the unique index
+    )).all()
+    if not rows:
+        return [], None
+
+    chunk_ids = [row.id for row in rows]
+    layouts = {(row.dtype, row.dimension) for row in rows}
+    if len(layouts) == 1:
+        dtype, dimension = layouts.pop()
+        vectors = unpack_matrix([row.embedding for row in rows], EVectorDType(dtype), dimension)
+        return chunk_ids, PackedEmbeddings(model=model, dtype=EVectorDType(dtype), vectors=vectors)
+
+    if len({dimension for _, dimension in layouts}) > 1:
+        raise ValueError(f"Chunks embedded by {model} have different dimensions.")
+    vectors = np.vstack([
+        unpack_matrix([row.embedding], EVectorDType(row.dtype), row.dimension).astype(np.float32) for row in rows
+    ])
+    return chunk_ids, PackedEmbeddings(model=model, dtype=EVectorDType.FLOAT32, vectors=vectors)
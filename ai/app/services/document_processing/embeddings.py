@@ -2,10 +2,68 @@ from typing import List, Optional
 
 from langchain_community.embeddings import VertexAIEmbeddings
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_ollama import OllamaEmbeddings
 from langchain_openai import OpenAIEmbeddings
 
-from app.enums.ai import EAIModel, EAIEmbedding
+from app.core.config import config
+from app.database.vectors import PackedEmbeddings
+from app.enums.ai import EAIModel, EAIEmbedding, EVectorDType
+from app.services.llm_registry import llm_registry
+
+
+def get_embeddings_client(
+    model: EAIEmbedding = EAIEmbedding.OLLAMA_NOMIC,
+    openai_api_key: Optional[str] = None,
+    gemini_api_key: Optional[str] = None,
+) -> Embeddings:
+    """
+    Returns the embeddings client for the given model.
+
+    Clients are pooled in `llm_registry` like the chat models, so embedding calls reuse the same client and its
+    keep-alive HTTP connections instead of building new ones each time.
+
+    Args:
+        model (EAIEmbedding): The embedding model to use. Defaults to OLLAMA_NOMIC.
+        openai_api_key (Optional[str]): OpenAI API key for OpenAIEmbeddings (required if using an OpenAI model).
+        gemini_api_key (Optional[str]): Google Gemini API key for VertexAIEmbeddings (required if using a Gemini model).
+
+    Returns:
+        Embeddings: Configured embeddings client.
+
+    Raises:
+        RuntimeError: If a required key is missing, the model is unsupported or the client cannot be built.
+    """
+    try:
+        model = EAIEmbedding(model)
+        key = llm_registry.make_key("embeddings", model.value, None, openai_api_key or gemini_api_key)
+        return llm_registry.get_or_create(
+            key, lambda: _create_embeddings_client(model, openai_api_key, gemini_api_key)
+        )
+    except Exception as e:
+        raise RuntimeError(f"Failed to initialize the embedding model: {e}")
+
+
+def _create_embeddings_client(
+    model: EAIEmbedding,
+    openai_api_key: Optional[str],
+    gemini_api_key: Optional[str],
+) -> Embeddings:
+    if model in {EAIEmbedding.OLLAMA_NOMIC, EAIEmbedding.OLLAMA_MXBAI}:
+        return OllamaEmbeddings(model=model)
+    if model in {
+        EAIEmbedding.OPENAI_TEXT_EMBEDDING_3_LARGE,
+        EAIEmbedding.OPENAI_TEXT_EMBEDDING_3_SMALL,
+        EAIEmbedding.OPENAI_TEXT_EMBEDDING_ADA_002,
+    }:
+        if not openai_api_key:
+            raise ValueError("OpenAI API key is required for OpenAIEmbeddings.")
+        return OpenAIEmbeddings(openai_api_key=openai_api_key)
+    if model == EAIEmbedding.GEMINI_TEXT_EMBEDDING_004:
+        if not gemini_api_key:
+            raise ValueError("Google Gemini API key is required for VertexAIEmbeddings.")
+        return VertexAIEmbeddings(api_key=gemini_api_key)
+    raise ValueError(f"Unsupported model: {model}. Supported models are: OLLAMA, OPENAI, GEMINI.")
 
 
 def generate_embeddings(
@@ -33,29 +91,7 @@ def generate_embeddings(
     if not splits:
         raise ValueError("The 'splits' parameter must contain at least one Document.")
 
-
-    # Determine the appropriate embedding model
-    try:
-        if model in {EAIEmbedding.OLLAMA_NOMIC, EAIEmbedding.OLLAMA_MXBAI}:
-            embeddings = OllamaEmbeddings(model=model)
-        elif model in {
-            EAIEmbedding.OPENAI_TEXT_EMBEDDING_3_LARGE,
-            EAIEmbedding.OPENAI_TEXT_EMBEDDING_3_SMALL,
-            EAIEmbedding.OPENAI_TEXT_EMBEDDING_ADA_002,
-        }:
-            if not openai_api_key:
-                raise ValueError("OpenAI API key is required for OpenAIEmbeddings.")
-            embeddings = OpenAIEmbeddings(openai_api_key=openai_api_key)
-        elif model == EAIEmbedding.GEMINI_TEXT_EMBEDDING_004:
-            if not gemini_api_key:
-                raise ValueError("Google Gemini API key is required for VertexAIEmbeddings.")
-            embeddings = VertexAIEmbeddings(api_key=gemini_api_key)
-        else:
-            raise ValueError(
-                f"Unsupported model: {model}. Supported models are: OLLAMA, OPENAI, GEMINI."
-            )
-    except Exception as e:
-        raise RuntimeError(f"Failed to initialize the embedding model: {e}")
+    embeddings = get_embeddings_client(model, openai_api_key=openai_api_key, gemini_api_key=gemini_api_key)
 
     # Generate embeddings for the document splits
     try:
@@ -65,3 +101,31 @@ def generate_embeddings(
         raise RuntimeError(f"Failed to generate embeddings: {e}")
 
     return document_embeddings
+
+
+def generate_packed_embeddings(
+    splits: List[Document],
+    model: EAIEmbedding = EAIEmbedding.OLLAMA_NOMIC,
+    openai_api_key: Optional[str] = None,
+    gemini_api_key: Optional[str] = None,
+    dtype: EVectorDType = config.EMBEDDING_DTYPE,
+) -> PackedEmbeddings:
+    """
+    Generates embeddings for the given document splits as one contiguous matrix, the form they are stored in.
+
+    Args:
+        splits (List[Document]): The document splits to embed.
+        model (EAIEmbedding): The embedding model to use. Defaults to OLLAMA_NOMIC.
+        openai_api_key (Optional[str]): OpenAI API key for OpenAIEmbeddings (required if using an OpenAI model).
+        gemini_api_key (Optional[str]): Google Gemini API key for VertexAIEmbeddings (required if using a Gemini model).
+        dtype (EVectorDType): Element type of the matrix. Defaults to `config.EMBEDDING_DTYPE`.
+
+    Returns:
+        PackedEmbeddings: One row per split, in order.
+
+    Raises:
+        ValueError: If required parameters are missing or an unsupported model is provided.
+        RuntimeError: If embedding model initialization or generation fails.
+    """
+    vectors = generate_embeddings(splits, model=model, openai_api_key=openai_api_key, gemini_api_key=gemini_api_key)
+    return PackedEmbeddings.from_vectors(vectors, model=EAIEmbedding(model).value, dtype=dtype)
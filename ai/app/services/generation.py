@@ -0,0 +1,95 @@
+from typing import AsyncGenerator, List, Optional
+
+from app.core.config import config
+from app.enums.ai import EPriority
+from app.enums.topic import ETopic
+from app.models.chat_model import ChatMessageResponse
+from app.services.ai import AIService
+from app.services.cache.response_cache import response_cache, make_cache_key, replay_chunks
+from app.services.cache.semantic_cache import semantic_cache
+from app.services.coalescer import generation_coalescer
+from app.services.context_window import context_window
+from app.services.scheduler import llm_scheduler, backend_for
+
+
+async def stream_chat_response(
+    model: Optional[str],
+    variant: Optional[str],
+    api_key: Optional[str],
+    messages: List[ChatMessageResponse],
+    topic: Optional[ETopic] = ETopic.GENERAL,
+    temperature: Optional[float] = None,
+    use_cache: bool = True,
+    session_id: Optional[str] = None
+) -> AsyncGenerator[str, None]:
+    """
+    Stream a chat response, serving it from the response cache when an identical prompt was answered before.
+
+    Exact matches are looked up first. When the semantic cache is enabled, a paraphrase of an earlier final user
+    turn is served next. A cache hit is replayed with the same chunk boundaries as the original stream. A miss
+    streams from the LLM and only stores the answer once the stream has completed, so cancelled or failed
+    generations are never cached. Identical requests that arrive while a miss is streaming share its upstream
+    generation instead of starting their own. Upstream generations run under an interactive-priority slot of
+    `llm_scheduler`. Conversations that outgrow the model's context window are fitted by `context_window` first.
+
+    Args:
+        model (Optional[str]): LLM model name or identifier.
+        variant (Optional[str]): Specific variant of the model.
+        api_key (Optional[str]): API key for external models.
+        messages (List[ChatMessageResponse]): The conversation so far.
+        topic (Optional[ETopic]): Contextual topic for prompt enhancement.
+        temperature (Optional[float]): Sampling temperature, the model default when not provided.
+        use_cache (bool): Set to False to bypass the cache for this request.
+        session_id (Optional[str]): Stored session of the conversation, lets old turns be summarised.
+
+    Yields:
+        str: Response chunks.
+
+    Raises:
+        LLMSchedulerError: If the backend is saturated and the call was rejected.
+    """
+    options = {"temperature": temperature} if temperature is not None else {}
+    messages = await context_window.fit(messages, model, variant, api_key, session_id)
+
+    async def generate() -> AsyncGenerator[str, None]:
+        async with llm_scheduler.slot(backend_for(model), EPriority.INTERACTIVE):
+            async for chunk in AIService.agenerate_ai_response(model, variant, api_key, messages, topic, **options):
+                yield chunk
+
+    if not (use_cache and config.RESPONSE_CACHE_ENABLED):
+        async for chunk in generate():
+            yield chunk
+        return
+
+    key = make_cache_key(model, variant, topic, messages, options)
+    cached = await response_cache.get(key)
+    if cached is not None:
+        async for chunk in replay_chunks(cached):
+            yield chunk
+        return
+
+    semantic_entry = None
+    if config.SEMANTIC_CACHE_ENABLED:
+        prompt, history = semantic_cache.split_messages(messages)
+        vector = await semantic_cache.aembed(prompt) if prompt else None
+        if vector is not None:
+            scope = semantic_cache.make_scope(model, variant, topic, history, options)
+            cached = semantic_cache.lookup(scope, vector)
+            if cached is not None:
+                async for chunk in replay_chunks(cached):
+                    yield chunk
+                return
+            semantic_entry = (scope, prompt, vector)
+
+    async def generate_and_cache() -> AsyncGenerator[str, None]:
+        chunks: List[str] = []
+        async for chunk in generate():
+            chunks.append(chunk)
+            yield chunk
+        if chunks:
+            await response_cache.put(key, chunks)
+            if semantic_entry:
+                semantic_cache.store(*semantic_entry, chunks)
+
+    async for chunk in generation_coalescer.subscribe(key, generate_and_cache):
+        yield chunk
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import select
+
+from app.core.config import config
+from app.database.db import Session, cold_storage
+from app.database.schema import ChatMessage
+from app.models.chat_model import ChatMessageResponse
+
+
+def _load_history(session_id: str) -> List[ChatMessageResponse]:
+    db = Session()
+    try:
+        query = (
+            select(ChatMessage.message_id, ChatMessage.role, ChatMessage.content)
+            .where(ChatMessage.session_id == session_id)
+            .order_by(ChatMessage.created_at, ChatMessage.id)
+        )
+        rows = db.execute(query).all()
+        if not rows:
+            # Archived sessions are in the cold file
+            cold_storage.attach_connection(db.connection())
+            rows = db.execute(query, execution_options=cold_storage.options).all()
+        return [ChatMessageResponse(message_id=row.message_id, role=row.role, content=row.content) for row in rows]
+    finally:
+        db.close()
+
+
+class SessionHistoryCache:
+    """
+    Hot, in-memory copy of recent sessions' message history.
+
+    Lets delta requests send only their new turn: the rest of the conversation is rebuilt from here, falling
+    back to the `chat_messages` table on a miss. `/register` appends to cached sessions as messages are stored.
+    """
+
+    def __init__(self, max_sessions: int = config.HISTORY_CACHE_SESSIONS):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, List[ChatMessageResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, session_id: str) -> List[ChatMessageResponse]:
+        """
+        Stored history of a session, oldest message first.
+        """
+        with self._lock:
+            history = self._sessions.get(session_id)
+            if history is not None:
+                self._sessions.move_to_end(session_id)
+                self.hits += 1
+                return list(history)
+            self.misses += 1
+
+        history = await asyncio.to_thread(_load_history, session_id)
+        with self._lock:
+            # A concurrent register may have cached a newer copy in the meantime
+            if session_id not in self._sessions:
+                self._store(session_id, history)
+            return list(self._sessions[session_id])
+
+    async def rebuild(self, session_id: str, new_messages: Sequence[ChatMessageResponse]) -> List[ChatMessageResponse]:
+        """
+        Full conversation for a delta request: the stored history followed by the new messages it does not hold yet.
+        """
+        history = await self.get(session_id)
+        known = {message.message_id for message in history}
+        return history + [message for message in new_messages if message.message_id not in known]
+
+    def append(self, session_id: str, messages: Sequence[ChatMessageResponse]) -> None:
+        """
+        Record newly stored messages of a session. Sessions that are not cached are left to load on demand.
+        """
+        with self._lock:
+            history = self._sessions.get(session_id)
+            if history is None:
+                return
+            known = {message.message_id for message in history}
+            history.extend(message for message in messages if message.message_id not in known)
+
+    def invalidate(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _store(self, session_id: str, history: List[ChatMessageResponse]) -> None:
+        self._sessions[session_id] = history
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "sessions": len(self._sessions)}
+
+
+# Shared history cache used by delta requests
+history_cache = SessionHistoryCache()
@@ -0,0 +1,436 @@
+import json
+import time
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Set, Union
+
+import zstandard
+from sqlalchemy import Row, or_, select, text, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession, async_sessionmaker
+
+from app.core.config import config
+from app.database.cold_storage import COLD, HOT, ColdStorage
+from app.database.db import AsyncSessionLocal, cold_storage
+from app.database.schema import ChatMessage, ChatSession
+from app.enums.chat import EBulkSessionAction, ERole
+from app.services.db_writer import DatabaseWriter, db_writer
+from app.services.session_tiers import session_tiers
+
+# Record types of a chat history in JSON lines: a session followed by its messages, or a deleted session
+SESSION = "session"
+MESSAGE = "message"
+DELETED = "deleted"
+
+# Columns of the records, in the order `session_record` and `message_record` take them
+SESSION_COLUMNS = [
+    ChatSession.session_id, ChatSession.session_name, ChatSession.archived, ChatSession.favorite,
+    ChatSession.created_at, ChatSession.version, ChatSession.topic,
+]
+MESSAGE_COLUMNS = [
+    ChatMessage.session_id, ChatMessage.message_id, ChatMessage.role, ChatMessage.model, ChatMessage.variant,
+    ChatMessage.content, ChatMessage.created_at,
+]
+
+# Called after each imported batch with the IDs of the changed and of the deleted sessions
+BatchCallback = Callable[[List[str], List[str]], None]
+
+
+def _timestamp(value: Union[datetime, str, None]) -> Optional[str]:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.isoformat() if value else None
+
+
+def _role(value: Union[ERole, str]) -> str:
+    if isinstance(value, ERole):
+        return value.value
+    # Read without the ORM, roles are stored by enum name
+    return ERole[value].value if value in ERole.__members__ else value
+
+
+def session_record(session_id, session_name, archived, favorite, created_at, version, topic) -> Dict[str, Any]:
+    return {
+        "type": SESSION, "session_id": session_id, "session_name": session_name, "archived": bool(archived),
+        "favorite": bool(favorite), "created_at": _timestamp(created_at), "version": version, "topic": topic,
+    }
+
+
+def message_record(session_id, message_id, role, model, variant, content, created_at) -> Dict[str, Any]:
+    return {
+        "type": MESSAGE, "session_id": session_id, "message_id": message_id, "role": _role(role), "model": model,
+        "variant": variant, "content": content, "created_at": _timestamp(created_at),
+    }
+
+
+def deleted_record(session_id: str) -> Dict[str, Any]:
+    return {"type": DELETED, "session_id": session_id}
+
+
+_encoder = json.JSONEncoder(ensure_ascii=False)
+
+
+def encode_record(record: Dict[str, Any]) -> bytes:
+    return (_encoder.encode(record) + "\n").encode("utf-8")
+
+
+@dataclass
+class ImportResult:
+    """
+    Outcome of importing a chat history.
+    """
+    sessions: int = 0  # Sessions added or changed
+    messages: int = 0  # Messages added
+    deleted_sessions: int = 0
+    duplicate_messages: int = 0  # Messages already stored
+    orphan_messages: int = 0  # Messages of a session neither stored nor imported before them
+    invalid_lines: int = 0
+    first_error: Optional[str] = None
+    bytes: int = 0
+    duration: float = 0.0
+    throughput: float = 0.0  # Bytes per second
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class _ImportBatch:
+    """
+    Rows parsed from consecutive records, written together.
+    """
+    sessions: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+    deleted: Set[str] = field(default_factory=set)
+
+    def __len__(self) -> int:
+        return len(self.sessions) + len(self.messages) + len(self.deleted)
+
+    def session_ids(self) -> List[str]:
+        return list(self.sessions.keys() | {message["session_id"] for message in self.messages} | self.deleted)
+
+    def conflicts(self, record: Dict[str, Any]) -> bool:
+        """
+        Whether `record` must wait for the next batch: deletes of a batch are applied before its other rows.
+        """
+        if record.get("type") == DELETED:
+            return record.get("session_id") in self.session_ids()
+        return record.get("session_id") in self.deleted
+
+    def add(self, record: Dict[str, Any]) -> None:
+        kind, session_id = record["type"], str(record["session_id"])
+        created_at = datetime.fromisoformat(record["created_at"]) if record.get("created_at") else datetime.now()
+        if kind == SESSION:
+            self.sessions[session_id] = {
+                "session_id": session_id,
+                "session_name": record.get("session_name") or "Unknown",
+                "archived": bool(record.get("archived", False)),
+                "favorite": bool(record.get("favorite", False)),
+                "created_at": created_at,
+                "version": int(record.get("version") or 0),
+                "topic": record.get("topic"),
+            }
+        elif kind == MESSAGE:
+            if not isinstance(record["content"], str):
+                raise ValueError("message content must be a string")
+            self.messages.append({
+                "session_id": session_id,
+                "message_id": str(record["message_id"]),
+                "role": ERole(record["role"]),
+                "model": record.get("model"),
+                "variant": record.get("variant"),
+                "content": record["content"],
+                "created_at": created_at,
+            })
+        elif kind == DELETED:
+            self.deleted.add(session_id)
+        else:
+            raise ValueError(f"unknown record type {kind!r}")
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    pending = b""
+    async for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+
+async def _rows(result: AsyncResult, size: int) -> AsyncIterator[Row]:
+    # Rows are awaited a partition at a time: every await of a streamed result is a round trip to the driver
+    async for partition in result.partitions(size):
+        for row in partition:
+            yield row
+
+
+async def _decompressed(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    decompressor = zstandard.ZstdDecompressor().decompressobj()
+    async for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+
+
+class HistoryTransfer:
+    """
+    Streams the whole chat history out as JSON lines, and imports such streams back.
+
+    An export reads sessions and messages through two server-side cursors, both in session ID order through
+    their indexes, and merges them: a `session` record is followed by the `message` records of the session.
+    Rows are fetched `batch_size` at a time and sent as soon as a batch is encoded, so memory stays constant
+    whatever the history size. The cursors share one read transaction, which in WAL mode does not hold back
+    the app's writes.
+
+    An import parses the request body as it arrives, zstd-compressed or not, and writes every `import_batch`
+    records through `db_writer` before reading on. Sessions are upserted by session ID, messages already stored
+    (by message ID) are skipped, so an interrupted import can be retried, and `deleted` records remove
+    sessions: the incremental backups of `BackupEngine` import as they are.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = config.EXPORT_BATCH_SIZE,
+        import_batch: int = config.IMPORT_BATCH_SIZE,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        writer: DatabaseWriter = db_writer,
+        cold: ColdStorage = cold_storage,
+    ):
+        self.batch_size = batch_size
+        self.import_batch = import_batch
+        self.session_factory = session_factory
+        self.writer = writer
+        self.cold = cold
+        self.exports = 0
+        self.exported_bytes = 0
+        self.last_export_throughput: Optional[float] = None
+        self.imports = 0
+        self.imported_bytes = 0
+        self.last_import_throughput: Optional[float] = None
+
+    async def _export_schema(self, db: AsyncSession, schema: str, counts: Dict[str, int]) -> AsyncIterator[bytes]:
+        options = {"yield_per": self.batch_size, **(self.cold.options if schema == COLD else {})}
+        sessions = await db.stream(
+            select(*SESSION_COLUMNS).order_by(ChatSession.session_id), execution_options=options
+        )
+        messages = await db.stream(
+            select(*MESSAGE_COLUMNS).order_by(ChatMessage.session_id, ChatMessage.created_at, ChatMessage.id),
+            execution_options=options
+        )
+        try:
+            message_rows = _rows(messages, self.batch_size)
+            message = await anext(message_rows, None)
+            lines = []
+            async for session in _rows(sessions, self.batch_size):
+                lines.append(encode_record(session_record(*session)))
+                counts["sessions"] += 1
+                # Messages whose session is gone are skipped
+                while message is not None and message.session_id <= session.session_id:
+                    if message.session_id == session.session_id:
+                        lines.append(encode_record(message_record(*message)))
+                        counts["messages"] += 1
+                    message = await anext(message_rows, None)
+                if len(lines) >= self.batch_size:
+                    yield b"".join(lines)
+                    lines = []
+            if lines:
+                yield b"".join(lines)
+        finally:
+            await messages.close()
+            await sessions.close()
+
+    async def export_history(self, schemas: Sequence[str] = (HOT, COLD)) -> AsyncIterator[bytes]:
+        """
+        Every session of the given tiers with its messages, as chunks of JSON lines.
+        """
+        started = time.perf_counter()
+        counts = {"sessions": 0, "messages": 0, "bytes": 0}
+        async with self.session_factory() as db:
+            if COLD in schemas:
+                await self.cold.attach(db)
+            for schema in schemas:
+                async for chunk in self._export_schema(db, schema, counts):
+                    counts["bytes"] += len(chunk)
+                    yield chunk
+
+        elapsed = time.perf_counter() - started
+        self.exports += 1
+        self.exported_bytes += counts["bytes"]
+        self.last_export_throughput = counts["bytes"] / elapsed if elapsed > 0 else None
+        print(f"Exported {counts['sessions']} chat sessions and {counts['messages']} messages, "
+              f"{counts['bytes'] / 2**20:.1f} MiB in {elapsed:.1f} s")
+
+    async def _write_tier(
+        self,
+        db: AsyncSession,
+        sessions: List[Dict[str, Any]],
+        messages: List[Dict[str, Any]],
+        options: Dict[str, Any],
+        counts: Dict[str, int],
+    ) -> Set[str]:
+        changed = set()
+        table = ChatSession.__table__
+        if sessions:
+            statement = insert(table)
+            upserted = await db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["session_id"],
+                    set_={
+                        "session_name": statement.excluded.session_name,
+                        "archived": statement.excluded.archived,
+                        "favorite": statement.excluded.favorite,
+                        "topic": statement.excluded.topic,
+                        "version": table.c.version + 1,
+                    },
+                    # Sessions imported again unchanged are left alone
+                    where=or_(
+                        table.c.session_name != statement.excluded.session_name,
+                        table.c.archived != statement.excluded.archived,
+                        table.c.favorite != statement.excluded.favorite,
+                        table.c.topic.is_distinct_from(statement.excluded.topic),
+                    ),
+                ).returning(table.c.session_id),
+                sessions,
+                execution_options=options
+            )
+            changed.update(upserted.scalars())
+
+        if messages:
+            inserted = list((await db.execute(
+                insert(ChatMessage.__table__).on_conflict_do_nothing(index_elements=["message_id"])
+                .returning(ChatMessage.__table__.c.session_id),
+                messages,
+                execution_options=options
+            )).scalars())
+            counts["messages"] += len(inserted)
+            counts["duplicate_messages"] += len(messages) - len(inserted)
+            grown = set(inserted) - changed
+            if grown:
+                await db.execute(
+                    update(table).where(table.c.session_id.in_(grown)).values(version=table.c.version + 1),
+                    execution_options=options
+                )
+            changed.update(grown)
+        return changed
+
+    async def _write(self, db: AsyncSession, batch: _ImportBatch) -> Dict[str, Any]:
+        # Counted per attempt, the writer runs the batch again when its group commit fails
+        counts = {"messages": 0, "duplicate_messages": 0}
+        deleted = []
+        if batch.deleted:
+            deleted = await session_tiers.apply_bulk_action(
+                db, EBulkSessionAction.DELETE, session_ids=list(batch.deleted)
+            )
+
+        # Rows go to the tier their session is stored in, new sessions to the one their archived flag calls for
+        session_ids = batch.session_ids()
+        located = select(ChatSession.session_id).where(ChatSession.session_id.in_(session_ids))
+        tiers = {session_id: HOT for session_id in await db.scalars(located)}
+        tiers.update({session_id: COLD for session_id in await db.scalars(located, execution_options=self.cold.options)})
+        added_cold = 0
+        for session_id, session in batch.sessions.items():
+            if session_id not in tiers:
+                tiers[session_id] = COLD if session["archived"] else HOT
+                added_cold += tiers[session_id] == COLD
+
+        changed = set()
+        for tier, options in ((HOT, {}), (COLD, self.cold.options)):
+            sessions = [session for session_id, session in batch.sessions.items() if tiers[session_id] == tier]
+            messages = [message for message in batch.messages if tiers.get(message["session_id"]) == tier]
+            changed |= await self._write_tier(db, sessions, messages, options, counts)
+        counts["orphan_messages"] = sum(1 for message in batch.messages if message["session_id"] not in tiers)
+        # Stored sessions whose archived flag changed
+        await session_tiers.rebalance(db)
+
+        counts["sessions"] = len(changed & batch.sessions.keys())
+        counts["deleted_sessions"] = len(deleted)
+        return {"changed": list(changed), "deleted": deleted, "added_cold": added_cold, "counts": counts}
+
+    async def import_history(
+        self, chunks: AsyncIterator[bytes], compressed: bool = False, on_batch: Optional[BatchCallback] = None
+    ) -> ImportResult:
+        """
+        Import a chat history of JSON lines, as written by `export_history`.
+
+        Args:
+            chunks (AsyncIterator[bytes]): The history, e.g. a request body as it arrives.
+            compressed (bool): Whether the history is zstd-compressed.
+            on_batch (Optional[BatchCallback]): Called after each committed batch, to drop cached sessions.
+
+        Returns:
+            ImportResult: What was imported, with its throughput.
+        """
+        started = time.perf_counter()
+        result = ImportResult()
+        batch = _ImportBatch()
+        added_cold = 0
+
+        async def flush() -> None:
+            nonlocal batch, added_cold
+            written = await self.writer.submit(lambda db, batch=batch: self._write(db, batch))
+            # Only once the batch is committed
+            for name, count in written["counts"].items():
+                setattr(result, name, getattr(result, name) + count)
+            added_cold += written["added_cold"]
+            batch = _ImportBatch()
+            if on_batch is not None:
+                on_batch(written["changed"], written["deleted"])
+
+        async def counted(source: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+            async for chunk in source:
+                result.bytes += len(chunk)
+                yield chunk
+
+        def invalid(error: Exception) -> None:
+            result.invalid_lines += 1
+            result.first_error = result.first_error or f"{type(error).__name__}: {error}"
+
+        source = counted(chunks)
+        async for line in _lines(_decompressed(source) if compressed else source):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                invalid(e)
+                continue
+            if not isinstance(record, dict):
+                invalid(ValueError("a record must be a JSON object"))
+                continue
+            if batch.conflicts(record):
+                await flush()
+            try:
+                batch.add(record)  # Leaves the batch unchanged when the record is invalid
+            except (ValueError, KeyError, TypeError) as e:
+                invalid(e)
+                continue
+            if len(batch) >= self.import_batch:
+                await flush()
+        if len(batch):
+            await flush()
+        if added_cold:
+            # Statistics let the planner list archived sessions by their creation date index
+            await self.writer.submit(lambda db: db.execute(text(f"ANALYZE {COLD}.chat_sessions")))
+
+        result.duration = time.perf_counter() - started
+        result.throughput = result.bytes / result.duration if result.duration > 0 else 0.0
+        self.imports += 1
+        self.imported_bytes += result.bytes
+        self.last_import_throughput = result.throughput
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "exports": self.exports,
+            "exported_bytes": self.exported_bytes,
+            "last_export_throughput": self.last_export_throughput,
+            "imports": self.imports,
+            "imported_bytes": self.imported_bytes,
+            "last_import_throughput": self.last_import_throughput,
+        }
+
+
+# Shared export and import of chat histories
+history_transfer = HistoryTransfer()
@@ -0,0 +1,121 @@
+import re
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import bindparam, func, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.schema import ChatSession, ChatMessage
+from app.enums.chat import ERole
+from app.models.chat_model import ChatMessageResponse
+from app.models.request import ChatRegister
+
+
+@dataclass
+class IngestResult:
+    """
+    Outcome of storing a batch of chats.
+    """
+    sessions: int = 0  # Sessions in the request
+    messages: int = 0  # Messages in the request
+    inserted_messages: int = 0  # Messages that were not stored yet
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+def quoted_title(messages: Sequence[ChatMessageResponse]) -> Optional[str]:
+    """
+    Title of a short chat: the first quoted text in one of its user messages.
+    """
+    for message in messages:
+        if message.role == ERole.USER:
+            match = re.search(r'"(.*?)"', message.content)
+            if match:
+                return match.group(1)
+    return None
+
+
+async def ingest_chats(db: AsyncSession, chats: Sequence[ChatRegister]) -> IngestResult:
+    """
+    Stage chat sessions and their messages idempotently, as a write for `db_writer`.
+
+    Sessions and messages that already exist are skipped by `ON CONFLICT DO NOTHING`, so retrying or re-uploading
+    a chat is safe. Chats with fewer than 3 messages take their title from quoted text in a user message. The
+    version of every session in the batch is bumped; once committed, the caller invalidates the caches of these
+    sessions.
+
+    Args:
+        db (AsyncSession): The database session, committed by the caller.
+        chats (Sequence[ChatRegister]): The chats to store.
+
+    Returns:
+        IngestResult: How many sessions and messages were received and how many messages were new.
+    """
+    result = IngestResult(sessions=len(chats), messages=sum(len(chat.messages) for chat in chats))
+    if not chats:
+        return result
+
+    now = datetime.now()
+    sessions = insert(ChatSession.__table__)
+    await db.execute(
+        # Existing sessions only pick up a topic they did not have yet
+        sessions.on_conflict_do_update(
+            index_elements=["session_id"],
+            set_={"topic": func.coalesce(ChatSession.__table__.c.topic, sessions.excluded.topic)}
+        ),
+        [
+            {
+                "session_id": chat.session_id,
+                "session_name": chat.session_name or "Unknown",
+                "archived": False,
+                "favorite": False,
+                "created_at": now,
+                "topic": chat.topic,
+            }
+            for chat in chats
+        ]
+    )
+
+    titles: List[Dict[str, str]] = []
+    for chat in chats:
+        title = quoted_title(chat.messages) if len(chat.messages) < 3 else None
+        if title:
+            titles.append({"target_session_id": chat.session_id, "title": title})
+    if titles:
+        await db.execute(
+            update(ChatSession.__table__)
+            .where(ChatSession.__table__.c.session_id == bindparam("target_session_id"))
+            .values(session_name=bindparam("title")),
+            titles
+        )
+
+    rows = [
+        {
+            "session_id": chat.session_id,
+            "message_id": message.message_id,
+            "content": message.content,
+            "role": message.role,
+            "model": chat.model,
+            "variant": chat.variant,
+            "created_at": now,
+        }
+        for chat in chats
+        for message in chat.messages
+    ]
+    if rows:
+        inserted = await db.execute(
+            insert(ChatMessage.__table__).on_conflict_do_nothing(index_elements=["message_id"]),
+            rows
+        )
+        result.inserted_messages = max(inserted.rowcount, 0)
+
+    session_ids = list({chat.session_id for chat in chats})
+    await db.execute(
+        update(ChatSession.__table__)
+        .where(ChatSession.__table__.c.session_id.in_(session_ids))
+        .values(version=ChatSession.__table__.c.version + 1)
+    )
+    return result
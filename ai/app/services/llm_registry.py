@@ -0,0 +1,169 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from app.core.config import config
+
+
+@dataclass
+class RegistryStats:
+    """
+    Counters describing how well the LLM client registry is being reused.
+    """
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+def _close(client: Any) -> None:
+    """
+    Release the connections of a client that will not be used, if it can be closed synchronously.
+    """
+    close = getattr(client, "close", None)
+    if callable(close):
+        try:
+            close()
+        except Exception as e:
+            print(f"Failed to close a duplicate LLM client: {e}")
+
+
+@dataclass
+class _Entry:
+    value: Any
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class LLMClientRegistry:
+    """
+    Process-wide registry of configured LLM clients.
+
+    Building an LLM object also builds its HTTP client, so constructing one per request costs a fresh
+    TCP/TLS handshake. The registry keeps clients keyed by (provider, variant, hashed api key, options),
+    evicts the least recently used one when full and drops clients that have been idle for too long.
+
+    Clients are built outside the lock, so a slow constructor never holds up lookups of other keys. When two
+    threads build the same key at once, the first one stored is shared and the other is closed.
+    """
+
+    def __init__(
+        self,
+        max_size: int = config.LLM_CLIENT_POOL_SIZE,
+        idle_ttl: float = config.LLM_CLIENT_IDLE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_size < 1:
+            raise ValueError("`max_size` must be 1 or greater.")
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = RegistryStats()
+
+    @staticmethod
+    def make_key(
+        kind: str,
+        provider: Optional[str],
+        variant: Optional[str],
+        api_key: Optional[str],
+        options: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Hashable, ...]:
+        """
+        Build a registry key. The api key is hashed so that secrets never sit in the key itself.
+
+        Args:
+            kind (str): What is being cached, e.g. "llm" or "chain".
+            provider (Optional[str]): Provider name, e.g. "ollama".
+            variant (Optional[str]): Specific variant of the model.
+            api_key (Optional[str]): API key for external models.
+            options (Optional[Dict[str, Any]]): Extra constructor options such as `temperature`.
+
+        Returns:
+            Tuple[Hashable, ...]: A hashable key.
+        """
+        key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest() if api_key else None
+        frozen_options = tuple(sorted((name, repr(value)) for name, value in (options or {}).items()))
+        return kind, (provider or "").lower(), variant, key_hash, frozen_options
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for `key`, building it with `factory` on a miss.
+
+        `factory` runs without the registry lock held. If another thread stores the same key first, its value is
+        returned and the one just built is closed.
+
+        Args:
+            key (Hashable): Registry key, usually built with `make_key`.
+            factory (Callable[[], Any]): Builds a new client when none is cached.
+
+        Returns:
+            Any: The cached or newly built client.
+        """
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.last_used = now
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return entry.value
+
+            self._stats.misses += 1
+
+        # Factories may be slow or resolve other entries, e.g. chain -> llm, so they run without the lock
+        value = factory()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = _Entry(value=value, last_used=self._clock())
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self._stats.evictions += 1
+                return value
+            entry.last_used = self._clock()
+            self._entries.move_to_end(key)
+        # Another thread stored the same client while this one was being built
+        _close(value)
+        return entry.value
+
+    def _expire(self, now: float) -> None:
+        if self.idle_ttl <= 0:
+            return
+        # Entries are kept in LRU order, so the idle ones are always at the front
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if now - entry.last_used < self.idle_ttl:
+                break
+            del self._entries[key]
+            self._stats.expirations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats.as_dict(), "size": len(self._entries), "max_size": self.max_size}
+
+
+# Shared registry used by AIService
+llm_registry = LLMClientRegistry()
@@ -0,0 +1,138 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+import zstandard
+from sqlalchemy import insert, text
+
+from app.core.config import config
+from app.database.compression import message_codec
+from app.database.db import AsyncSessionLocal
+from app.database.schema import CompressionDictionary
+from app.services.db_writer import db_writer
+
+
+def _train_dictionary(samples: List[bytes], size: int) -> bytes:
+    return zstandard.train_dictionary(size, samples, level=message_codec.level).as_bytes()
+
+
+def _compress_rows(rows: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
+    compressed = []
+    for row_id, content in rows:
+        frame = message_codec.compress(content)
+        if isinstance(frame, bytes):
+            compressed.append({"row_id": row_id, "frame": frame, "size": len(content.encode("utf-8"))})
+    return compressed
+
+
+class MessageCompressor:
+    """
+    Background job compressing the message bodies stored before compression existed.
+
+    New messages are compressed as they are written, by the `CompressedText` column type. On startup, this job
+    trains the shared dictionary once enough large messages are stored, then walks `chat_messages` in id order
+    and rewrites large plain-text bodies as zstd frames, `batch_size` rows per write through `db_writer`.
+    The text does not change, so the full-text index is left alone.
+    """
+
+    def __init__(self, batch_size: int = config.COMPRESSION_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._worker: Optional[asyncio.Task] = None
+        self.compressed_rows = 0
+        self.bytes_before = 0
+        self.bytes_after = 0
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self) -> None:
+        try:
+            if not message_codec.dictionary_id:
+                await self.train_dictionary()
+            await self.compress_stored()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Compressing stored messages failed: {e}")
+
+    async def train_dictionary(self) -> Optional[int]:
+        """
+        Train and store the shared dictionary from the newest large messages, if there are enough of them.
+
+        Returns:
+            Optional[int]: The new dictionary ID, None when there are too few samples.
+        """
+        async with AsyncSessionLocal() as db:
+            samples = list(await db.scalars(
+                text(
+                    "SELECT content FROM chat_messages WHERE typeof(content) = 'text' AND length(content) >= :min_size "
+                    "ORDER BY id DESC LIMIT :samples"
+                ),
+                {"min_size": message_codec.min_bytes, "samples": config.COMPRESSION_DICT_SAMPLES}
+            ))
+        if len(samples) < config.COMPRESSION_DICT_MIN_SAMPLES:
+            return None
+
+        dictionary = await asyncio.to_thread(
+            _train_dictionary, [sample.encode("utf-8") for sample in samples], config.COMPRESSION_DICT_SIZE
+        )
+        dictionary_id = zstandard.ZstdCompressionDict(dictionary).dict_id()
+        await db_writer.submit(lambda db: db.execute(
+            insert(CompressionDictionary).values(id=dictionary_id, dictionary=dictionary)
+        ))
+        message_codec.add_dictionary(dictionary)
+        print(f"Trained message compression dictionary {dictionary_id} on {len(samples)} messages")
+        return dictionary_id
+
+    async def compress_stored(self) -> None:
+        """
+        Compress every large plain-text message body, oldest first.
+        """
+        after = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                rows = (await db.execute(
+                    text(
+                        "SELECT id, content FROM chat_messages "
+                        "WHERE id > :after AND typeof(content) = 'text' AND length(content) >= :min_size "
+                        "ORDER BY id LIMIT :batch"
+                    ),
+                    {"after": after, "min_size": message_codec.min_bytes, "batch": self.batch_size}
+                )).all()
+            if not rows:
+                return
+            after = rows[-1].id
+
+            compressed = await asyncio.to_thread(_compress_rows, [(row.id, row.content) for row in rows])
+            if compressed:
+                # Frames are bound as they are; only rows still holding plain text are rewritten
+                await db_writer.submit(lambda db: db.execute(
+                    text("UPDATE chat_messages SET content = :frame WHERE id = :row_id AND typeof(content) = 'text'"),
+                    [{"row_id": row["row_id"], "frame": row["frame"]} for row in compressed]
+                ))
+                self.compressed_rows += len(compressed)
+                self.bytes_before += sum(row["size"] for row in compressed)
+                self.bytes_after += sum(len(row["frame"]) for row in compressed)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._worker is not None and not self._worker.done(),
+            "dictionary_id": message_codec.dictionary_id,
+            "compressed_rows": self.compressed_rows,
+            "bytes_before": self.bytes_before,
+            "bytes_after": self.bytes_after,
+            "bytes_saved": self.bytes_before - self.bytes_after,
+        }
+
+
+# Shared background compressor, started with the app
+message_compressor = MessageCompressor()
@@ -0,0 +1,88 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+from app.core.config import config
+
+SESSION_LIST = "sessions"
+
+
+class ReadCache:
+    """
+    Read-through cache of rendered JSON bodies for the session list and conversations.
+
+    Entries hold the response bytes, so a hit skips both the database and serialization. The cache is bounded in
+    bytes and evicts the least recently used entries. Conversations are cached per session and dropped when that
+    session changes; any session change drops every session list page, as one session can move across pages.
+    A body read from the database is only stored if nothing was invalidated while it was being built.
+    """
+
+    def __init__(self, max_bytes: int = config.READ_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[bytes, Dict[str, str]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def generation(self) -> int:
+        """
+        Take this before reading from the database and pass it to `set`.
+        """
+        return self._generation
+
+    def get(self, owner: str, key: Hashable) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        """
+        Cached body and headers of `key`, cached for `owner`: a session ID, or `SESSION_LIST`.
+        """
+        with self._lock:
+            entry = self._entries.get((owner, key))
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((owner, key))
+            self.hits += 1
+            return entry
+
+    def set(self, owner: str, key: Hashable, body: bytes, headers: Dict[str, str], generation: int) -> None:
+        with self._lock:
+            if generation != self._generation or len(body) > self.max_bytes:
+                return
+            previous = self._entries.pop((owner, key), None)
+            if previous is not None:
+                self._bytes -= len(previous[0])
+            self._entries[(owner, key)] = (body, headers)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def invalidate(self, session_ids: Iterable[str]) -> None:
+        """
+        Drop the conversations of `session_ids` and every session list page.
+        """
+        owners = set(session_ids) | {SESSION_LIST}
+        with self._lock:
+            self._generation += 1
+            for entry_key in [entry_key for entry_key in self._entries if entry_key[0] in owners]:
+                self._bytes -= len(self._entries.pop(entry_key)[0])
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+# Shared read cache used by the session list and conversation routes
+read_cache = ReadCache()
@@ -0,0 +1,178 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.config import config
+from app.core.errors import QueueFullError, QueueTimeoutError
+from app.enums.ai import EAIModel, EPriority
+
+
+def backend_for(model: Optional[str]) -> str:
+    """
+    Name of the backend serving `model`. Every local model shares the single Ollama instance.
+    """
+    name = (model or "").lower()
+    if not name or name in {EAIModel.OLLAMA, EAIModel.LOCAL}:
+        return str(EAIModel.OLLAMA)
+    for provider in (EAIModel.OPENAI, EAIModel.ANTHROPIC, EAIModel.GEMINI):
+        if name.startswith(str(provider)):
+            return str(provider)
+    return name
+
+
+@dataclass
+class _WaitStats:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+
+@dataclass
+class _Backend:
+    limit: int
+    active: int = 0
+    waiters: List[Tuple[int, int, asyncio.Future]] = field(default_factory=list)
+
+
+class LLMScheduler:
+    """
+    Admission control for LLM calls, per backend.
+
+    Each backend runs at most `limit` calls at once. Further calls wait in a priority queue, so interactive
+    generation is served ahead of title and summary jobs, and FIFO within a priority. A call is rejected right
+    away with `QueueFullError` when the queue is at `max_queue_depth`, and with `QueueTimeoutError` when it
+    waited longer than `queue_timeout` for a slot.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, int]] = None,
+        default_limit: int = config.SCHEDULER_REMOTE_CONCURRENCY,
+        max_queue_depth: int = config.SCHEDULER_MAX_QUEUE_DEPTH,
+        queue_timeout: float = config.SCHEDULER_QUEUE_TIMEOUT,
+    ):
+        self.limits = limits if limits is not None else {str(EAIModel.OLLAMA): config.SCHEDULER_OLLAMA_CONCURRENCY}
+        self.default_limit = default_limit
+        self.max_queue_depth = max_queue_depth
+        self.queue_timeout = queue_timeout
+        self._backends: Dict[str, _Backend] = {}
+        self._sequence = itertools.count()
+        self._wait_stats: Dict[EPriority, _WaitStats] = {priority: _WaitStats() for priority in EPriority}
+        self._rejected_queue_full = 0
+        self._rejected_timeout = 0
+
+    def _backend(self, name: str) -> _Backend:
+        backend = self._backends.get(name)
+        if backend is None:
+            backend = self._backends[name] = _Backend(limit=self.limits.get(name, self.default_limit))
+        return backend
+
+    def is_idle(self, name: str) -> bool:
+        """
+        Whether `name` has a free slot and nothing queued.
+        """
+        backend = self._backend(name)
+        return backend.active < backend.limit and not backend.waiters
+
+    async def acquire(self, name: str, priority: EPriority = EPriority.INTERACTIVE) -> None:
+        """
+        Wait for a free slot on backend `name`.
+
+        Raises:
+            QueueFullError: If the backend's wait queue is full.
+            QueueTimeoutError: If no slot became free within `queue_timeout` seconds.
+        """
+        backend = self._backend(name)
+        started = time.perf_counter()
+        if backend.active < backend.limit and not backend.waiters:
+            backend.active += 1
+            self._wait_stats[priority].record(0.0)
+            return
+
+        if len(backend.waiters) >= self.max_queue_depth:
+            self._rejected_queue_full += 1
+            raise QueueFullError(f"Too many queued requests for {name}, please retry shortly.")
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (int(priority), next(self._sequence), waiter)
+        heapq.heappush(backend.waiters, entry)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not self._withdraw(backend, entry):
+                # The slot was handed over just as the timeout fired
+                self._wait_stats[priority].record(time.perf_counter() - started)
+                return
+            self._rejected_timeout += 1
+            raise QueueTimeoutError(f"Timed out waiting for a free {name} slot, please retry shortly.")
+        except asyncio.CancelledError:
+            if not self._withdraw(backend, entry):
+                self.release(name)
+            raise
+        self._wait_stats[priority].record(time.perf_counter() - started)
+
+    @staticmethod
+    def _withdraw(backend: _Backend, entry: Tuple[int, int, asyncio.Future]) -> bool:
+        """
+        Remove a waiter that gave up. Returns False if it had already been granted a slot.
+        """
+        if entry[2].done():
+            return False
+        entry[2].cancel()
+        backend.waiters.remove(entry)
+        heapq.heapify(backend.waiters)
+        return True
+
+    def release(self, name: str) -> None:
+        """
+        Free a slot on backend `name`, handing it straight to the highest-priority waiter if there is one.
+        """
+        backend = self._backend(name)
+        while backend.waiters:
+            _, _, waiter = heapq.heappop(backend.waiters)
+            if not waiter.done():
+                waiter.set_result(None)  # The slot passes to the waiter, `active` is unchanged
+                return
+        backend.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, name: str, priority: EPriority = EPriority.INTERACTIVE) -> AsyncIterator[None]:
+        """
+        Hold a slot on backend `name` for the duration of the block.
+        """
+        await self.acquire(name, priority)
+        try:
+            yield
+        finally:
+            self.release(name)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backends": {
+                name: {"active": backend.active, "queued": len(backend.waiters), "limit": backend.limit}
+                for name, backend in self._backends.items()
+            },
+            "queue_wait": {str(priority): stats.as_dict() for priority, stats in self._wait_stats.items()},
+            "rejected_queue_full": self._rejected_queue_full,
+            "rejected_timeout": self._rejected_timeout,
+        }
+
+
+# Shared scheduler for every LLM call made by the API
+llm_scheduler = LLMScheduler()
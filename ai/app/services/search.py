@@ -0,0 +1,161 @@
+import html
+import re
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import DateTime, bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import config
+from app.database.cold_storage import HOT
+from app.database.schema import ChatMessage
+from app.enums.chat import ESearchMode
+from app.models.request import ContextSearchRequest
+
+SNIPPET_TOKENS = 12
+# Private use characters marking matches in raw snippets, replaced by markup once the text is escaped
+MATCH_START, MATCH_END = "\ue000", "\ue001"
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    FTS5 query matching every word of `query`. A word ending in `*` matches as a prefix.
+
+    Words are quoted, so user input can never be read as FTS5 query syntax.
+
+    Returns:
+        Optional[str]: The MATCH expression, None if `query` holds no searchable word.
+    """
+    terms = [f'"{word}"{star}' for word, star in re.findall(r"(\w+)(\*?)", query)]
+    return " ".join(terms) if terms else None
+
+
+def highlight(snippet: Optional[str]) -> Optional[str]:
+    """
+    HTML of a raw snippet: the stored text escaped, with its matches wrapped in `<mark>`.
+    """
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(MATCH_START, "<mark>").replace(MATCH_END, "</mark>")
+
+
+def _filters(request: ContextSearchRequest) -> Tuple[str, Dict[str, Any]]:
+    clauses, params = [], {}
+    if request.mode == ESearchMode.ARCHIVED:
+        clauses.append("s.archived = 1")
+    elif request.mode in (ESearchMode.FAVOURITE, ESearchMode.BOOKMARK):
+        clauses.append("s.favorite = 1")
+    if request.topic:
+        clauses.append("s.topic = :topic")
+        params["topic"] = request.topic
+    if request.start_date:
+        clauses.append("m.created_at >= :start_date")
+        params["start_date"] = datetime.combine(request.start_date, time.min)
+    if request.end_date:
+        clauses.append("m.created_at < :end_date")
+        params["end_date"] = datetime.combine(request.end_date + timedelta(days=1), time.min)
+    return "".join(f" AND {clause}" for clause in clauses), params
+
+
+async def search_messages(
+    db: AsyncSession,
+    request: ContextSearchRequest,
+    limit: int = 20,
+    offset: int = 0,
+    max_candidates: int = config.SEARCH_MAX_CANDIDATES,
+    schemas: Sequence[str] = (HOT,)
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Full-text search over chat messages, best matches first by BM25.
+
+    Scoring every match of a word that appears in most messages would take time linear in the history, so only
+    the newest `max_candidates` matches are ranked; less common words have fewer matches and are ranked in full.
+    Whether older matches were left out is returned with the results, so the user can be told to narrow the
+    search. Messages and sessions are only joined when a filter needs them, and snippets and message details are
+    loaded for the returned page only. With several `schemas` (storage tiers attached to the connection), each
+    tier's index is ranked on its own and the best matches of all of them are returned.
+
+    Args:
+        db (AsyncSession): The database session.
+        request (ContextSearchRequest): Search text and filters.
+        limit (int): Maximum number of results.
+        offset (int): Number of results to skip, for paging.
+        max_candidates (int): How many of the newest matches are ranked, per tier.
+        schemas (Sequence[str]): Schemas of the tiers to search, the main file only by default.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], bool]: Matching messages with their session and a highlighted `snippet`, and
+        whether a tier had more than `max_candidates` matches, the older of which were not ranked.
+    """
+    match = build_match_query(request.query)
+    if match is None:
+        return [], False
+
+    filters, params = _filters(request)
+    # Each tier returns the first `offset + limit` matches of its own, the page is cut from all of them
+    skip = offset if len(schemas) > 1 else 0
+    params.update({
+        "match": match, "limit": limit + skip, "offset": offset - skip, "candidates": max_candidates - 1,
+        "max_candidates": max_candidates,
+    })
+    dates = [bindparam(name, type_=DateTime()) for name in ("start_date", "end_date") if name in params]
+
+    ranks: Dict[Tuple[str, int], float] = {}
+    truncated = False
+    for schema in schemas:
+        join = (
+            f"JOIN {schema}.chat_messages m ON m.id = chat_messages_fts.rowid "
+            f"JOIN {schema}.chat_sessions s ON s.session_id = m.session_id "
+        ) if filters else ""
+        # A match older than every candidate, found by the same walk of the doclist
+        truncated = truncated or await db.scalar(text(
+            f"SELECT count(*) FROM (SELECT 1 FROM {schema}.chat_messages_fts {join}"
+            f"WHERE chat_messages_fts MATCH :match{filters} "
+            "ORDER BY chat_messages_fts.rowid DESC LIMIT 1 OFFSET :max_candidates)"
+        ).bindparams(*dates), params) > 0
+        # The oldest candidate is found by walking the doclist newest first; FTS5 then only scores rows from it on.
+        # Sorting by `bm25()` rather than the `rank` column avoids computing every score twice.
+        ranked = await db.execute(text(
+            f"SELECT chat_messages_fts.rowid, bm25(chat_messages_fts) AS score FROM {schema}.chat_messages_fts {join}"
+            f"WHERE chat_messages_fts MATCH :match{filters} AND chat_messages_fts.rowid >= COALESCE(("
+            f"SELECT chat_messages_fts.rowid FROM {schema}.chat_messages_fts {join}"
+            f"WHERE chat_messages_fts MATCH :match{filters} "
+            "ORDER BY chat_messages_fts.rowid DESC LIMIT 1 OFFSET :candidates"
+            "), 0) ORDER BY score LIMIT :limit OFFSET :offset"
+        ).bindparams(*dates), params)
+        ranks.update({(schema, row.rowid): row.score for row in ranked})
+    ranks = dict(sorted(ranks.items(), key=lambda item: item[1])[skip:skip + limit])
+    if not ranks:
+        return [], truncated
+
+    rows = []
+    for schema in schemas:
+        row_ids = [row_id for tier, row_id in ranks if tier == schema]
+        if not row_ids:
+            continue
+        details = text(
+            "SELECT chat_messages_fts.rowid, m.message_id, m.session_id, m.role, m.created_at, s.session_name, "
+            f"s.topic, snippet(chat_messages_fts, 0, '{MATCH_START}', '{MATCH_END}', '…', {SNIPPET_TOKENS}) "
+            f"AS snippet, '{schema}' AS tier FROM {schema}.chat_messages_fts "
+            f"JOIN {schema}.chat_messages m ON m.id = chat_messages_fts.rowid "
+            f"JOIN {schema}.chat_sessions s ON s.session_id = m.session_id "
+            "WHERE chat_messages_fts MATCH :match AND chat_messages_fts.rowid IN :row_ids"
+        ).bindparams(bindparam("row_ids", expanding=True)).columns(
+            role=ChatMessage.__table__.c.role.type, created_at=ChatMessage.__table__.c.created_at.type
+        )
+        rows += (await db.execute(details, {"match": match, "row_ids": row_ids})).all()
+
+    results = [
+        {
+            "message_id": row.message_id,
+            "session_id": row.session_id,
+            "session_name": row.session_name,
+            "topic": row.topic,
+            "role": row.role,
+            "created_at": row.created_at,
+            "snippet": highlight(row.snippet),
+            "score": -ranks[(row.tier, row.rowid)],  # BM25 scores are negative, lower is better
+        }
+        for row in rows
+    ]
+    return sorted(results, key=lambda result: result["score"], reverse=True), truncated
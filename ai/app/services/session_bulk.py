@@ -0,0 +1,71 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import Table, delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.schema import ChatSession, ChatSessionSummary
+from app.enums.chat import EBulkSessionAction
+
+# Column and value set by each flag action
+FLAG_UPDATES = {
+    EBulkSessionAction.ARCHIVE: {"archived": True},
+    EBulkSessionAction.UNARCHIVE: {"archived": False},
+    EBulkSessionAction.FAVORITE: {"favorite": True},
+    EBulkSessionAction.UNFAVORITE: {"favorite": False},
+}
+
+
+async def apply_bulk_action(
+    db: AsyncSession,
+    action: EBulkSessionAction,
+    session_ids: Optional[List[str]] = None,
+    before: Optional[datetime] = None,
+    archived: Optional[bool] = None,
+    sessions: Table = ChatSession.__table__
+) -> List[str]:
+    """
+    Apply `action` to every chat session matching all the given filters, as one statement per table.
+
+    Deletes leave the messages and documents of the sessions to the `ON DELETE CASCADE` foreign keys, so no row
+    is loaded, and remove the rolling summaries, which are not linked by a foreign key. Flag changes bump the
+    session versions, so cached ETags stop matching. The changes are staged on `db`, the caller commits.
+
+    Args:
+        db (AsyncSession): Session the statements run on, usually the writer's.
+        action (EBulkSessionAction): What to do with the matching sessions.
+        session_ids (Optional[List[str]]): Only these sessions.
+        before (Optional[datetime]): Only sessions created before this time.
+        archived (Optional[bool]): Only archived, or only not archived sessions.
+        sessions (Table): Session table of the tier to act on, the main file's by default.
+
+    Returns:
+        List[str]: IDs of the sessions that were changed.
+    """
+    conditions = []
+    if session_ids is not None:
+        conditions.append(sessions.c.session_id.in_(session_ids))
+    if before is not None:
+        conditions.append(sessions.c.created_at < before)
+    if archived is not None:
+        conditions.append(sessions.c.archived == archived)
+    if not conditions:
+        raise ValueError("At least one filter is required for a bulk action.")
+
+    if action == EBulkSessionAction.DELETE:
+        await db.execute(
+            delete(ChatSessionSummary).where(
+                ChatSessionSummary.session_id.in_(select(sessions.c.session_id).where(*conditions))
+            )
+        )
+        statement = delete(sessions).where(*conditions).returning(sessions.c.session_id)
+    else:
+        values = FLAG_UPDATES[action]
+        # Sessions already in the requested state are left alone
+        statement = (
+            update(sessions)
+            .where(*conditions, *(sessions.c[column] != value for column, value in values.items()))
+            .values(**values, version=sessions.c.version + 1)
+            .returning(sessions.c.session_id)
+        )
+    return list(await db.scalars(statement))
@@ -0,0 +1,55 @@
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from app.core.config import config
+
+
+class SessionCountCache:
+    """
+    Cached totals of the chat session list, per filter combination.
+
+    Counting matching sessions means walking the whole index range on every page request. Totals are kept for
+    `ttl` seconds and dropped whenever a route adds, updates or deletes sessions, so they stay exact for changes
+    made through the API.
+    """
+
+    def __init__(self, ttl: float = config.SESSION_COUNT_TTL, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._counts: "OrderedDict[Hashable, Tuple[int, float]]" = OrderedDict()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: Hashable, count: Callable[[], Awaitable[int]]) -> int:
+        """
+        Total for the filters identified by `key`, running `count` on a miss.
+        """
+        cached = self._counts.get(key)
+        if cached and time.monotonic() - cached[1] < self.ttl:
+            self._counts.move_to_end(key)
+            self.hits += 1
+            return cached[0]
+
+        self.misses += 1
+        generation = self._generation
+        total = await count()
+        # Sessions changed while counting, the total may already be stale
+        if generation == self._generation:
+            self._counts[key] = (total, time.monotonic())
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+        return total
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._counts.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._counts)}
+
+
+# Shared session count cache used by the session list
+session_counts = SessionCountCache()
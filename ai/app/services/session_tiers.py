@@ -0,0 +1,186 @@
+import asyncio
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.cold_storage import COLD, HOT
+from app.database.db import cold_storage
+from app.database.schema import ChatMessage, ChatSession, Document, DocumentChunk
+from app.enums.chat import EBulkSessionAction
+from app.services.db_writer import db_writer, WriteOperation
+from app.services.session_bulk import apply_bulk_action
+from app.services.space_reclaimer import space_reclaimer
+
+# Columns copied between the tiers; row IDs are not, each file numbers its own rows
+SESSION_COLUMNS = ", ".join(column.name for column in ChatSession.__table__.columns if column.name != "id")
+MESSAGE_COLUMNS = ", ".join(column.name for column in ChatMessage.__table__.columns if column.name != "id")
+DOCUMENT_COLUMNS = [column.name for column in Document.__table__.columns if column.name not in ("id", "session_id")]
+CHUNK_COLUMNS = [column.name for column in DocumentChunk.__table__.columns if column.name not in ("id", "document_id")]
+
+# Session IDs are bound as one JSON array, whatever their number
+SELECTED = "session_id IN (SELECT value FROM json_each(:session_ids))"
+
+
+class SessionTiering:
+    """
+    Keeps archived chat sessions in the cold file and every other session in the main one.
+
+    Sessions move with their messages, documents and document chunks, as set-based copies followed by a delete
+    that cascades in the source file; the full-text index of each file follows through its triggers. Moves run
+    inside writes of `db_writer`, whose connection always has the cold file attached. Rolling summaries are
+    dropped when a session goes cold and rebuilt on demand.
+
+    In WAL mode a transaction is atomic per file, not across both, so a crash may leave a copied session in both
+    files; copies skip rows that already exist and the next move of the session removes the duplicate.
+    """
+
+    def __init__(self):
+        self._worker: Optional[asyncio.Task] = None
+        self.demoted_sessions = 0
+        self.promoted_sessions = 0
+        self.moved_messages = 0
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self) -> None:
+        # Sessions archived before tiering existed, or left behind by an interrupted move
+        try:
+            if await db_writer.submit(self.rebalance):
+                space_reclaimer.schedule()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Moving archived chat sessions failed: {e}")
+
+    async def _move(self, db: AsyncSession, source: str, target: str, where: str, params: Dict[str, Any]) -> int:
+        session_ids = list(await db.scalars(text(f"SELECT session_id FROM {source}.chat_sessions WHERE {where}"), params))
+        if not session_ids:
+            return 0
+        selected = {"session_ids": json.dumps(session_ids)}
+
+        await db.execute(text(
+            f"INSERT INTO {target}.chat_sessions ({SESSION_COLUMNS}) SELECT {SESSION_COLUMNS} "
+            f"FROM {source}.chat_sessions WHERE {SELECTED} ON CONFLICT (session_id) DO NOTHING"
+        ), selected)
+        # Stored bodies are copied as they are, compressed or not
+        messages = await db.execute(text(
+            f"INSERT INTO {target}.chat_messages ({MESSAGE_COLUMNS}) SELECT {MESSAGE_COLUMNS} "
+            f"FROM {source}.chat_messages WHERE {SELECTED} ORDER BY id ON CONFLICT (message_id) DO NOTHING"
+        ), selected)
+        # Documents point at the session's row ID, which differs between the files. They have no unique key, a
+        # document is the same one when its file and upload time are, as for the chunks below
+        await db.execute(text(
+            f"INSERT INTO {target}.documents (session_id, {', '.join(DOCUMENT_COLUMNS)}) "
+            f"SELECT t.id, {', '.join(f'd.{column}' for column in DOCUMENT_COLUMNS)} FROM {source}.documents d "
+            f"JOIN {source}.chat_sessions s ON s.id = d.session_id "
+            f"JOIN {target}.chat_sessions t ON t.session_id = s.session_id WHERE s.{SELECTED} "
+            f"AND NOT EXISTS (SELECT 1 FROM {target}.documents td WHERE td.session_id = t.id "
+            f"AND td.file_path = d.file_path AND td.uploaded_at = d.uploaded_at)"
+        ), selected)
+        # And chunks at the document's, matched by the file and upload time of the document
+        await db.execute(text(
+            f"INSERT INTO {target}.document_chunks (document_id, {', '.join(CHUNK_COLUMNS)}) "
+            f"SELECT td.id, {', '.join(f'c.{column}' for column in CHUNK_COLUMNS)} FROM {source}.document_chunks c "
+            f"JOIN {source}.documents d ON d.id = c.document_id "
+            f"JOIN {source}.chat_sessions s ON s.id = d.session_id "
+            f"JOIN {target}.chat_sessions t ON t.session_id = s.session_id "
+            f"JOIN {target}.documents td ON td.session_id = t.id AND td.file_path = d.file_path "
+            f"AND td.uploaded_at = d.uploaded_at WHERE s.{SELECTED} "
+            f"ON CONFLICT (document_id, model, chunk_index) DO NOTHING"
+        ), selected)
+        await db.execute(text(f"DELETE FROM {source}.chat_sessions WHERE {SELECTED}"), selected)
+        if source == HOT:
+            await db.execute(text(f"DELETE FROM {HOT}.chat_session_summaries WHERE {SELECTED}"), selected)
+
+        self.moved_messages += max(messages.rowcount, 0)
+        return len(session_ids)
+
+    async def demote_archived(self, db: AsyncSession) -> int:
+        """
+        Move every archived session of the main file to the cold one.
+
+        Returns:
+            int: Number of sessions moved.
+        """
+        moved = await self._move(db, HOT, COLD, "archived = 1", {})
+        if moved:
+            # Every cold session is archived: with statistics the planner lists them by the creation date index
+            # instead of sorting all of them
+            await db.execute(text(f"ANALYZE {COLD}.chat_sessions"))
+        self.demoted_sessions += moved
+        return moved
+
+    async def promote(self, db: AsyncSession, session_ids: Optional[Sequence[str]] = None) -> int:
+        """
+        Move sessions of the cold file back to the main one: the given ones, or else every unarchived one.
+
+        Returns:
+            int: Number of sessions moved.
+        """
+        if session_ids is None:
+            moved = await self._move(db, COLD, HOT, "archived = 0", {})
+        else:
+            moved = await self._move(db, COLD, HOT, SELECTED, {"session_ids": json.dumps(list(session_ids))})
+        self.promoted_sessions += moved
+        return moved
+
+    async def rebalance(self, db: AsyncSession) -> int:
+        """
+        Move every session to the tier its archived flag calls for.
+
+        Returns:
+            int: Number of sessions moved.
+        """
+        return await self.demote_archived(db) + await self.promote(db)
+
+    def around(self, session_ids: Sequence[str], operation: WriteOperation) -> WriteOperation:
+        """
+        Write running `operation` on sessions that may be cold: they are promoted first, and moved back to the
+        tier their archived flag calls for afterwards.
+        """
+        async def run(db: AsyncSession):
+            await self.promote(db, session_ids)
+            result = await operation(db)
+            await db.flush()  # ORM changes, such as a new archived flag, are seen by the moves
+            await self.rebalance(db)
+            return result
+
+        return run
+
+    async def apply_bulk_action(self, db: AsyncSession, action: EBulkSessionAction, **filters) -> List[str]:
+        """
+        `apply_bulk_action` on the sessions of both tiers, then (un)archived sessions move to their tier.
+
+        Returns:
+            List[str]: IDs of the sessions that were changed.
+        """
+        changed = await apply_bulk_action(db, action, **filters)
+        changed += await apply_bulk_action(db, action, sessions=cold_storage.sessions, **filters)
+        await self.rebalance(db)
+        return changed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "demoted_sessions": self.demoted_sessions,
+            "promoted_sessions": self.promoted_sessions,
+            "moved_messages": self.moved_messages,
+            "cold_bytes": os.path.getsize(cold_storage.path) if os.path.exists(cold_storage.path) else 0,
+        }
+
+
+# Shared tiering of chat sessions, started with the app
+session_tiers = SessionTiering()
@@ -0,0 +1,81 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from app.core.config import config
+
+
+def make_etag(session_id: str, version: int, limit: Optional[int], before: Optional[str]) -> str:
+    """
+    ETag of one window of a conversation at a given session version.
+    """
+    digest = hashlib.sha256(f"{session_id}\0{version}\0{limit}\0{before}".encode("utf-8")).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an `If-None-Match` header value names `etag`.
+    """
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+class SessionVersionCache:
+    """
+    In-memory copy of `ChatSession.version`, so conditional conversation requests are answered without the DB.
+
+    Every write to a session bumps its version in the database and then drops it here. A version read from the
+    database is only cached if no session was invalidated while it was being read, so a slow reader cannot put
+    back a version that is already outdated.
+    """
+
+    def __init__(self, max_sessions: int = config.SESSION_VERSION_CACHE_SIZE):
+        self.max_sessions = max_sessions
+        self._versions: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def generation(self) -> int:
+        """
+        Take this before reading a version from the database and pass it to `set`.
+        """
+        return self._generation
+
+    def get(self, session_id: str) -> Optional[int]:
+        with self._lock:
+            version = self._versions.get(session_id)
+            if version is None:
+                self.misses += 1
+                return None
+            self._versions.move_to_end(session_id)
+            self.hits += 1
+            return version
+
+    def set(self, session_id: str, version: int, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._versions[session_id] = version
+            self._versions.move_to_end(session_id)
+            while len(self._versions) > self.max_sessions:
+                self._versions.popitem(last=False)
+
+    def invalidate(self, session_ids: Iterable[str]) -> None:
+        with self._lock:
+            self._generation += 1
+            for session_id in session_ids:
+                self._versions.pop(session_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "sessions": len(self._versions)}
+
+
+# Shared session version cache used by conditional conversation requests
+session_versions = SessionVersionCache()
@@ -0,0 +1,132 @@
+import asyncio
+from typing import Any, Dict, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import config
+from app.database.cold_storage import COLD, HOT
+from app.services.db_writer import db_writer
+
+
+class SpaceReclaimer:
+    """
+    Background job compacting the database files after deletes, and returning the freed pages to the file system.
+
+    Deleting messages only adds delete markers to the full-text index, which every search then has to skip, until
+    FTS5 merges its segments; here they are merged `merge_pages` index pages at a time. The files run in
+    incremental auto-vacuum mode: deleted rows leave free pages until `PRAGMA incremental_vacuum` moves them to
+    the end of the file and truncates it, which is done `pages_per_step` pages at a time. A full VACUUM or index
+    optimize would block every writer for seconds on a large history, whereas each step here is a short write
+    through `db_writer` between the app's own writes. Both tiers, attached to the writer, are compacted.
+    `schedule()` is called after bulk deletes and moves between the tiers.
+    """
+
+    def __init__(
+        self,
+        pages_per_step: int = config.VACUUM_PAGES_PER_STEP,
+        merge_pages: int = config.FTS_MERGE_PAGES,
+        schemas: Sequence[str] = (HOT, COLD)
+    ):
+        self.pages_per_step = pages_per_step
+        self.merge_pages = merge_pages
+        self.schemas = schemas
+        self._worker: Optional[asyncio.Task] = None
+        self._pending: Optional[asyncio.Event] = None
+        self.runs = 0
+        self.index_merges = 0
+        self.pages_released = 0
+        self.free_pages = 0
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._pending = asyncio.Event()
+            self._pending.set()  # Pages freed before the last shutdown
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+            self._pending = None
+
+    def schedule(self) -> None:
+        """
+        Ask for a run, once the current one (if any) is done.
+        """
+        if self._pending is not None:
+            self._pending.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._pending.wait()
+            self._pending.clear()
+            try:
+                await self.reclaim()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Reclaiming free database pages failed: {e}")
+
+    async def _merge_step(self, db: AsyncSession, schema: str) -> bool:
+        # A negative page count merges every segment, delete markers included; FTS5 reports no work done as
+        # fewer than two changes
+        changes = await db.scalar(text("SELECT total_changes()"))
+        await db.execute(
+            text(f"INSERT INTO {schema}.chat_messages_fts (chat_messages_fts, rank) VALUES ('merge', :pages)"),
+            {"pages": -self.merge_pages}
+        )
+        return await db.scalar(text("SELECT total_changes()")) - changes >= 2
+
+    async def _vacuum_step(self, db: AsyncSession, schema: str) -> int:
+        # The pragma frees one page per row it returns, but its rows have no columns, so SQLAlchemy never reads
+        # them; they are read on the driver's cursor instead
+        connection = await (await db.connection()).get_raw_connection()
+        cursor = await connection.driver_connection.execute(
+            f"PRAGMA {schema}.incremental_vacuum({self.pages_per_step})"
+        )
+        await cursor.fetchall()
+        await cursor.close()
+        return await db.scalar(text(f"PRAGMA {schema}.freelist_count"))
+
+    async def reclaim(self) -> int:
+        """
+        Merge the full-text index, then release every free page, of each database file.
+
+        Returns:
+            int: Number of pages released.
+        """
+        released = left = 0
+        for schema in self.schemas:
+            while await db_writer.submit(lambda db: self._merge_step(db, schema)):
+                self.index_merges += 1
+
+            free_pages = await db_writer.submit(lambda db: db.scalar(text(f"PRAGMA {schema}.freelist_count")))
+            while free_pages:
+                remaining = await db_writer.submit(lambda db: self._vacuum_step(db, schema))
+                if remaining >= free_pages:  # Not in incremental auto-vacuum mode
+                    break
+                released += free_pages - remaining
+                free_pages = remaining
+            left += free_pages
+        self.runs += 1
+        self.free_pages = left
+        self.pages_released += released
+        return released
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._worker is not None and not self._worker.done(),
+            "runs": self.runs,
+            "index_merges": self.index_merges,
+            "pages_released": self.pages_released,
+            "free_pages": self.free_pages,
+        }
+
+
+# Shared background reclaimer, started with the app
+space_reclaimer = SpaceReclaimer()
@@ -0,0 +1,77 @@
+import asyncio
+from dataclasses import dataclass, asdict
+from typing import AsyncGenerator, AsyncIterator, Dict
+
+from starlette.requests import Request
+
+
+@dataclass
+class StreamStats:
+    """
+    Counters for streamed generations served by the API.
+    """
+    active: int = 0
+    completed: int = 0
+    cancelled: int = 0
+    failed: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+stream_stats = StreamStats()
+
+
+async def stream_until_disconnect(
+    request: Request,
+    chunks: AsyncIterator[str],
+    poll_interval: float = 0.25
+) -> AsyncGenerator[str, None]:
+    """
+    Relay `chunks` to the client and abort the upstream generation as soon as the client goes away.
+
+    The client is polled for a disconnect while waiting on the next chunk, so even a long prefill with
+    no output yet is cancelled promptly. On disconnect the pending read is cancelled and the upstream
+    generator is closed, which closes the provider connection and releases whatever it holds.
+
+    Args:
+        request (Request): The incoming HTTP request, used to detect the disconnect.
+        chunks (AsyncIterator[str]): Upstream response chunks, e.g. from `AIService.agenerate_ai_response`.
+        poll_interval (float): Seconds between disconnect checks while waiting on a chunk.
+
+    Yields:
+        str: Response chunks, until the upstream finishes or the client disconnects.
+    """
+    stream_stats.active += 1
+    upstream = chunks.__aiter__()
+    pending = None
+    outcome = "cancelled"
+    try:
+        while True:
+            pending = asyncio.ensure_future(upstream.__anext__())
+            while not pending.done():
+                await asyncio.wait({pending}, timeout=poll_interval)
+                if not pending.done() and await request.is_disconnected():
+                    return
+            try:
+                chunk = pending.result()
+            except StopAsyncIteration:
+                outcome = "completed"
+                return
+            finally:
+                pending = None
+            yield chunk
+    except Exception:
+        outcome = "failed"
+        raise
+    finally:
+        stream_stats.active -= 1
+        setattr(stream_stats, outcome, getattr(stream_stats, outcome) + 1)
+        if pending is not None and not pending.done():
+            pending.cancel()
+            try:
+                await pending
+            except asyncio.CancelledError:
+                pass
+        if hasattr(upstream, "aclose"):
+            await upstream.aclose()
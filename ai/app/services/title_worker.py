@@ -0,0 +1,215 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import config
+from app.database.db import cold_storage
+from app.database.schema import ChatSession
+from app.enums.ai import EPriority
+from app.enums.chat import ETitleJobStatus
+from app.models.chat_model import ChatMessageResponse
+from app.services.ai import AIService
+from app.services.db_writer import db_writer
+from app.services.scheduler import llm_scheduler, backend_for
+from app.services.read_cache import read_cache
+from app.services.session_versions import session_versions
+
+
+@dataclass
+class TitleJob:
+    """
+    A pending or finished title generation for one chat session.
+    """
+    session_id: str
+    model: Optional[str]
+    variant: Optional[str]
+    api_key: Optional[str] = field(repr=False)
+    messages: List[ChatMessageResponse] = field(repr=False)
+    status: ETitleJobStatus = ETitleJobStatus.PENDING
+    title: Optional[str] = None
+    error: Optional[str] = None
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def group(self) -> Tuple[str, str, str]:
+        """
+        Jobs in the same group can share one LLM call.
+        """
+        key_hash = hashlib.sha256(self.api_key.encode("utf-8")).hexdigest() if self.api_key else ""
+        return (self.model or "").lower(), self.variant or "", key_hash
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "status": self.status,
+            "title": self.title,
+            "error": self.error,
+            "updated_at": self.updated_at,
+        }
+
+
+async def _save_title(db: AsyncSession, session_id: str, title: str) -> None:
+    """
+    Set the title of a session in the tier it lives in, the cold one when it is archived.
+
+    Raises:
+        ValueError: If the session is in neither tier, e.g. it was deleted meanwhile.
+    """
+    for sessions in (ChatSession.__table__, cold_storage.sessions):
+        result = await db.execute(
+            update(sessions)
+            .where(sessions.c.session_id == session_id)
+            .values(session_name=title, version=sessions.c.version + 1)
+        )
+        if result.rowcount:
+            return
+    raise ValueError(f"Chat session {session_id} not found.")
+
+
+class TitleJobQueue:
+    """
+    Background worker that generates chat titles off the request path.
+
+    Submitting a session that is already pending only refreshes its messages, so repeat registrations cost a
+    single LLM call. When the backend is idle, several pending sessions of the same model are titled with one
+    batched LLM call; otherwise jobs run one by one at `EPriority.TITLE`, behind interactive chats.
+    """
+
+    def __init__(self, batch_size: int = config.TITLE_BATCH_SIZE, history_size: int = 1024):
+        self.batch_size = batch_size
+        self.history_size = history_size
+        self._jobs: "OrderedDict[str, TitleJob]" = OrderedDict()
+        self._pending: "OrderedDict[str, None]" = OrderedDict()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.batches = 0
+
+    def submit(
+        self,
+        session_id: str,
+        model: Optional[str],
+        variant: Optional[str],
+        api_key: Optional[str],
+        messages: List[ChatMessageResponse]
+    ) -> TitleJob:
+        """
+        Schedule title generation for a session, deduplicating against a job that is still pending.
+
+        Returns:
+            TitleJob: The job tracking this session's title.
+        """
+        job = self._jobs.get(session_id)
+        if job is not None and job.status == ETitleJobStatus.PENDING:
+            job.model, job.variant, job.api_key, job.messages = model, variant, api_key, messages
+            job.updated_at = time.time()
+            return job
+
+        job = TitleJob(session_id=session_id, model=model, variant=variant, api_key=api_key, messages=messages)
+        self._jobs[session_id] = job
+        self._jobs.move_to_end(session_id)
+        self._pending[session_id] = None
+        self._trim_history()
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    def status(self, session_id: str) -> Optional[TitleJob]:
+        return self._jobs.get(session_id)
+
+    def _trim_history(self) -> None:
+        # Only finished jobs are forgotten, oldest first; pending and running ones stay tracked until they end
+        excess = len(self._jobs) - self.history_size
+        if excess <= 0:
+            return
+        finished = [
+            session_id for session_id, job in self._jobs.items()
+            if job.status in (ETitleJobStatus.DONE, ETitleJobStatus.FAILED)
+        ]
+        for session_id in finished[:excess]:
+            del self._jobs[session_id]
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._wakeup = asyncio.Event()
+            if self._pending:
+                self._wakeup.set()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                await self._run_batch(self._next_batch())
+
+    def _next_batch(self) -> List[TitleJob]:
+        first = self._jobs[next(iter(self._pending))]
+        limit = self.batch_size if llm_scheduler.is_idle(backend_for(first.model)) else 1
+        batch = [
+            self._jobs[session_id] for session_id in self._pending
+            if self._jobs[session_id].group == first.group
+        ][:limit]
+        for job in batch:
+            del self._pending[job.session_id]
+            job.status = ETitleJobStatus.RUNNING
+        return batch
+
+    async def _run_batch(self, batch: List[TitleJob]) -> None:
+        first = batch[0]
+        try:
+            async with llm_scheduler.slot(backend_for(first.model), EPriority.TITLE):
+                if len(batch) == 1:
+                    titles = [await AIService.generate_title(first.model, first.variant, first.api_key, first.messages)]
+                else:
+                    self.batches += 1
+                    titles = await AIService.generate_titles(
+                        first.model, first.variant, first.api_key, [job.messages for job in batch]
+                    )
+                    # Fall back to single calls for any title the batched answer did not contain
+                    for index, job in enumerate(batch):
+                        if not titles[index]:
+                            titles[index] = await AIService.generate_title(job.model, job.variant, job.api_key, job.messages)
+        except Exception as e:
+            print(f"Title generation failed: {e}")
+            for job in batch:
+                self._finish(job, error=str(e))
+            return
+
+        for job, title in zip(batch, titles):
+            try:
+                await db_writer.submit(lambda db: _save_title(db, job.session_id, title))
+                session_versions.invalidate([job.session_id])
+                read_cache.invalidate([job.session_id])
+                self._finish(job, title=title)
+            except Exception as e:
+                print(f"Saving title failed: {e}")
+                self._finish(job, error=str(e))
+
+    @staticmethod
+    def _finish(job: TitleJob, title: Optional[str] = None, error: Optional[str] = None) -> None:
+        job.status = ETitleJobStatus.DONE if error is None else ETitleJobStatus.FAILED
+        job.title, job.error = title, error
+        job.api_key, job.messages = None, []
+        job.updated_at = time.time()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"pending": len(self._pending), "tracked": len(self._jobs), "batched_calls": self.batches}
+
+
+# Shared title worker, started with the app
+title_jobs = TitleJobQueue()
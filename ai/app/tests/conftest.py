@@ -0,0 +1,12 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+# Point the app's database files at a scratch directory before any test imports `app.core.config`, so a test run
+# never opens the files of a local install
+_directory = tempfile.mkdtemp(prefix="focal-first-ai-tests-")
+atexit.register(shutil.rmtree, _directory, ignore_errors=True)
+os.environ["DB_PATH"] = os.path.join(_directory, "focal_first_ai.db")
+os.environ["DB_COLD_PATH"] = os.path.join(_directory, "focal_first_ai_cold.db")
+os.environ["RESPONSE_CACHE_DB_PATH"] = os.path.join(_directory, "focal_first_ai_cache.db")
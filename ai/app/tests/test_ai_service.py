@@ -0,0 +1,77 @@
+import asyncio
+import unittest
+from typing import Any, List
+from unittest.mock import patch
+
+from langchain_core.language_models.fake import FakeStreamingListLLM
+from langchain_core.output_parsers import StrOutputParser
+
+from app.enums.topic import ETopic
+from app.models.chat_model import ChatMessageResponse
+from app.services.ai import AIService
+
+MESSAGES = [ChatMessageResponse(message_id="1", role="user", content="What is recursion?")]
+
+
+class RecordingLLM(FakeStreamingListLLM):
+    """
+    Fake LLM answering "Recursion." that records which of its sync and async entry points were used.
+    """
+    calls: List[str] = []
+
+    def stream(self, *args: Any, **kwargs: Any):
+        self.calls.append("stream")
+        return super().stream(*args, **kwargs)
+
+    async def astream(self, *args: Any, **kwargs: Any):
+        self.calls.append("astream")
+        async for chunk in super().astream(*args, **kwargs):
+            yield chunk
+
+    def _call(self, *args: Any, **kwargs: Any) -> str:
+        self.calls.append("invoke")
+        return super()._call(*args, **kwargs)
+
+    async def _acall(self, *args: Any, **kwargs: Any) -> str:
+        self.calls.append("ainvoke")
+        return await super()._acall(*args, **kwargs)
+
+
+class TestAIServiceAsync(unittest.TestCase):
+    """
+    Test suite for the async generation path of `AIService`, against a fake chain.
+    """
+
+    def setUp(self):
+        self.llm = RecordingLLM(responses=["Recursion."], calls=[])
+        self.select_chain = patch.object(AIService, "select_chain", lambda *args, **options: self.llm | StrOutputParser())
+        self.select_chain.start()
+
+    def tearDown(self):
+        self.select_chain.stop()
+
+    def test_async_stream_matches_sync_stream(self):
+        async def collect():
+            return [chunk async for chunk in AIService.agenerate_ai_response("ollama", "llama3.2", None, MESSAGES)]
+
+        sync_chunks = list(AIService.generate_ai_response("ollama", "llama3.2", None, MESSAGES, ETopic.GENERAL))
+        sync_calls, self.llm.calls = self.llm.calls, []
+        async_chunks = asyncio.run(collect())
+
+        self.assertEqual(async_chunks, sync_chunks)
+        self.assertEqual("".join(async_chunks), "Recursion.")
+        # The fake streams by invoking itself, through the entry point of the same kind
+        self.assertEqual((sync_calls, self.llm.calls), (["stream", "invoke"], ["astream", "ainvoke"]))
+
+    def test_async_summary_and_title_use_ainvoke(self):
+        summary = AIService.summarise_messages("ollama", "llama3.2", None, MESSAGES)
+        sync_calls, self.llm.calls = self.llm.calls, []
+        async_summary = asyncio.run(AIService.asummarise_messages("ollama", "llama3.2", None, MESSAGES))
+        title = asyncio.run(AIService.generate_title("ollama", "llama3.2", None, MESSAGES))
+
+        self.assertEqual((summary, async_summary, title), ("Recursion.", "Recursion.", "Recursion."))
+        self.assertEqual((sync_calls, self.llm.calls), (["invoke"], ["ainvoke", "ainvoke"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+import zstandard
+
+from app.database.cold_storage import ColdStorage
+from app.database.compression import register_sql_functions
+from app.database.migrations import migrate
+from app.services.backup import (
+    SESSIONS_FILE, resolve_target_directory, verify_backup, write_full_backup, write_incremental_backup
+)
+
+
+class TestBackup(unittest.TestCase):
+    """
+    Test suite for the full and incremental backup files.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "hot.db")
+        migrate(f"sqlite:///{self.path}")
+        self.cold = ColdStorage(os.path.join(self.directory.name, "cold.db"), {"journal_mode": "WAL"})
+        self.cold.create()
+        connection = self.connect()
+        connection.execute("PRAGMA journal_mode = WAL")
+        for index in range(3):
+            self.add_session(connection, f"s{index}")
+        connection.execute("ATTACH DATABASE ? AS cold", (self.cold.path,))
+        self.add_session(connection, "archived", schema="cold")
+        connection.close()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        register_sql_functions(connection)
+        return connection
+
+    @staticmethod
+    def add_session(connection: sqlite3.Connection, session_id: str, schema: str = "main") -> None:
+        connection.execute(
+            f"INSERT INTO {schema}.chat_sessions (session_name, session_id, archived, favorite, created_at, version) "
+            f"VALUES (?, ?, ?, 0, '2024-01-01 10:00:00.000000', 0)", (session_id, session_id, schema == "cold")
+        )
+        connection.execute(
+            f"INSERT INTO {schema}.chat_messages (session_id, message_id, role, content, created_at) "
+            f"VALUES (?, ?, 'USER', ?, '2024-01-01 10:00:00.000000')", (session_id, f"{session_id}-m", f"hello {session_id}")
+        )
+
+    def restore(self, directory: str, name: str) -> sqlite3.Connection:
+        path = os.path.join(self.directory.name, f"restored-{name}")
+        with open(os.path.join(directory, f"{name}.db.zst"), "rb") as source, open(path, "wb") as target:
+            zstandard.ZstdDecompressor().copy_stream(source, target)
+        return sqlite3.connect(path)
+
+    def test_full_backup_copies_both_files_with_checksums(self):
+        directory = os.path.join(self.directory.name, "full")
+        manifest, checksum = write_full_backup(self.path, self.cold.path, directory, pages_per_step=2, step_sleep=0)
+
+        self.assertEqual(sorted(manifest["files"]), ["cold.db.zst", "main.db.zst"])
+        self.assertEqual(sorted(manifest["sessions"]), ["archived", "s0", "s1", "s2"])
+        self.assertTrue(verify_backup(directory, checksum))
+        self.assertEqual(self.restore(directory, "main").execute("SELECT count(*) FROM chat_messages").fetchone(), (3,))
+        self.assertEqual(
+            self.restore(directory, "cold").execute("SELECT session_id FROM chat_sessions").fetchall(), [("archived",)]
+        )
+
+        with open(os.path.join(directory, "main.db.zst"), "r+b") as file:
+            file.seek(20)
+            file.write(b"\0")
+        self.assertFalse(verify_backup(directory, checksum))
+
+    def test_incremental_backup_holds_changed_and_deleted_sessions(self):
+        full, _ = write_full_backup(self.path, self.cold.path, os.path.join(self.directory.name, "full"))
+        connection = self.connect()
+        connection.execute("UPDATE chat_sessions SET session_name = 'Renamed', version = version + 1 WHERE session_id = 's1'")
+        connection.execute("DELETE FROM chat_sessions WHERE session_id = 's2'")
+        self.add_session(connection, "s3")
+        connection.close()
+
+        directory = os.path.join(self.directory.name, "incremental")
+        manifest, checksum = write_incremental_backup(self.path, self.cold.path, directory, full)
+        with open(os.path.join(directory, SESSIONS_FILE), "rb") as file:
+            lines = zstandard.ZstdDecompressor().stream_reader(file).read().decode("utf-8").splitlines()
+        records = [json.loads(line) for line in lines]
+
+        self.assertTrue(verify_backup(directory, checksum))
+        self.assertEqual(
+            [(record["type"], record["session_id"]) for record in records],
+            [("session", "s1"), ("session", "s3"), ("message", "s1"), ("message", "s3"), ("deleted", "s2")]
+        )
+        self.assertEqual(records[0]["session_name"], "Renamed")
+        self.assertEqual(records[3]["content"], "hello s3")
+        self.assertEqual(records[3]["role"], "user")
+        self.assertEqual((manifest["changed_sessions"], manifest["deleted_sessions"]), (2, 1))
+
+    def test_full_backup_reads_one_snapshot_while_the_app_writes(self):
+        writing, stop = threading.Event(), threading.Event()
+
+        def write():
+            connection = self.connect()
+            index = 0
+            while not stop.is_set():
+                self.add_session(connection, f"new{index}")
+                index += 1
+                writing.set()
+            connection.close()
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        writing.wait()
+        try:
+            directory = os.path.join(self.directory.name, "full")
+            manifest, _ = write_full_backup(self.path, None, directory, pages_per_step=1, step_sleep=0.001)
+        finally:
+            stop.set()
+            writer.join()
+
+        copied = self.restore(directory, "main").execute("SELECT session_id FROM chat_sessions").fetchall()
+        self.assertEqual(sorted(session_id for session_id, in copied), sorted(manifest["sessions"]))
+
+    def test_target_directory_stays_inside_the_backup_directory(self):
+        root = os.path.join(self.directory.name, "backups")
+        os.makedirs(root)
+        os.symlink(self.directory.name, os.path.join(root, "link"))
+
+        root = os.path.realpath(root)
+
+        self.assertEqual(resolve_target_directory(None, root), root)
+        self.assertEqual(resolve_target_directory("daily/laptop", root), os.path.join(root, "daily", "laptop"))
+        self.assertEqual(resolve_target_directory(os.path.join(root, "weekly"), root), os.path.join(root, "weekly"))
+        for target in ("..", "../elsewhere", "/etc", "link", f"{root}-other"):
+            with self.assertRaises(ValueError):
+                resolve_target_directory(target, root)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+import asyncio
+import base64
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, insert
+
+from app.database.db import async_engine, async_write_engine, cold_storage, engine, init_database
+from app.database.schema import ChatMessage, ChatSession
+from app.routes import chat as chat_module
+from app.services.read_cache import ReadCache
+from app.services.session_counts import SessionCountCache
+from app.services.session_versions import SessionVersionCache
+from app.utils.pagination import decode_cursor, encode_cursor
+
+CREATED_AT = datetime(2024, 1, 1, 12, 0)
+
+
+class TestChatRoutes(unittest.TestCase):
+    """
+    Test suite for the chat session routes, over the scratch database set up by `conftest`.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        init_database()
+        app = FastAPI()
+        app.include_router(chat_module.router)
+        cls.app = app
+
+    def setUp(self):
+        with engine.begin() as connection:
+            cold_storage.attach_connection(connection)
+            for options in ({}, cold_storage.options):
+                connection.execute(delete(ChatSession), execution_options=options)
+        # Fresh caches, so no test sees pages or versions of another
+        self.patches = [
+            patch.object(chat_module, "read_cache", ReadCache()),
+            patch.object(chat_module, "session_counts", SessionCountCache()),
+            patch.object(chat_module, "session_versions", SessionVersionCache()),
+        ]
+        for started in self.patches:
+            started.start()
+        self.client = TestClient(self.app)
+
+    def tearDown(self):
+        self.client.close()
+        for started in self.patches:
+            started.stop()
+        asyncio.run(async_engine.dispose())
+        asyncio.run(async_write_engine.dispose())
+
+    def add_sessions(self, *sessions):
+        """
+        Store `(session_id, archived)` pairs, in order, each with the same creation date.
+        """
+        with engine.begin() as connection:
+            cold_storage.attach_connection(connection)
+            for session_id, archived in sessions:
+                connection.execute(
+                    insert(ChatSession).values(
+                        session_id=session_id, session_name=session_id, archived=archived, created_at=CREATED_AT
+                    ),
+                    execution_options=cold_storage.options if archived else {}
+                )
+
+    def add_messages(self, session_id: str, count: int, start: int = 0):
+        with engine.begin() as connection:
+            for number in range(start, start + count):
+                connection.execute(insert(ChatMessage).values(
+                    session_id=session_id, message_id=f"{session_id}-m{number}", role="user",
+                    content=f"message {number}", created_at=datetime(2024, 1, 1, 12, number)
+                ))
+
+    def list_sessions(self, **params):
+        response = self.client.get("/chat/all/", params=params)
+        self.assertEqual(response.status_code, 200, response.text)
+        return response.json()
+
+    def test_default_listing_includes_archived_sessions(self):
+        self.add_sessions(("live", False), ("archived", True))
+
+        listed = self.list_sessions()
+        archived = self.list_sessions(archived=True)
+
+        self.assertEqual([session["session_id"] for session in listed["data"]], ["live", "archived"])
+        self.assertEqual(listed["totalPage"], 1)
+        self.assertEqual([session["session_id"] for session in archived["data"]], ["archived"])
+
+    def test_cursor_pages_through_sessions_with_equal_dates(self):
+        self.add_sessions(("a", False), ("b", True), ("c", False), ("d", True), ("e", False))
+
+        for limit in (1, 2, 3):
+            listed, cursor = [], None
+            while True:
+                page = self.list_sessions(limit=limit, **({"cursor": cursor} if cursor else {}))
+                listed.append([session["session_id"] for session in page["data"]])
+                cursor = page["nextCursor"]
+                if not cursor:
+                    break
+            offset_pages = [
+                [session["session_id"] for session in self.list_sessions(limit=limit, page=number)["data"]]
+                for number in range(1, len(listed) + 1)
+            ]
+
+            # Row IDs, the tie-breaker, are numbered per file: no session is skipped or listed twice between pages
+            self.assertEqual(sorted(sum(listed, [])), ["a", "b", "c", "d", "e"])
+            self.assertEqual(offset_pages, listed)
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor(CREATED_AT, 7, 1)), (CREATED_AT, 7, 1))
+        # Tokens from before tiers were numbered
+        legacy = base64.urlsafe_b64encode(b'["2024-01-01T12:00:00",7]').decode().rstrip("=")
+        self.assertEqual(decode_cursor(legacy), (CREATED_AT, 7, 0))
+
+    def test_malformed_or_tampered_cursor_is_rejected(self):
+        self.add_sessions(("a", False))
+        tampered = [
+            "not a cursor",
+            encode_cursor(CREATED_AT, 1)[:-3],
+            base64.urlsafe_b64encode(b'["yesterday",1,0]').decode(),
+            base64.urlsafe_b64encode(b'["2024-01-01T12:00:00","one",0]').decode(),
+            base64.urlsafe_b64encode(b'["2024-01-01T12:00:00",1,0,5]').decode(),
+            base64.urlsafe_b64encode(b'{"created_at":"2024-01-01T12:00:00"}').decode(),
+        ]
+
+        for cursor in tampered:
+            response = self.client.get("/chat/all/", params={"cursor": cursor})
+            self.assertEqual(response.status_code, 400, cursor)
+            self.assertEqual(response.json()["detail"], "Invalid pagination cursor.")
+
+    def test_cached_total_is_invalidated_after_an_insert(self):
+        self.add_sessions(("a", False), ("b", True))
+        self.assertEqual(self.list_sessions(limit=1)["totalPage"], 2)
+
+        # Written behind the API's back, the cached total is still served
+        self.add_sessions(("c", False))
+        self.assertEqual(self.list_sessions(limit=1, page=2)["totalPage"], 2)
+
+        response = self.client.post("/register", json={
+            "session_id": "d", "session_name": "d", "model": "local",
+            "messages": [{"message_id": "d-m0", "role": "user", "content": "hello"}],
+        })
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertEqual(self.list_sessions(limit=1)["totalPage"], 4)
+
+    def get_conversation(self, session_id: str, etag: str = None, **params):
+        return self.client.get(
+            f"/chat/{session_id}", params=params, headers={"If-None-Match": etag} if etag else {}
+        )
+
+    def test_conversation_windows_meet_at_their_boundary(self):
+        self.add_sessions(("s1", False))
+        self.add_messages("s1", 5)
+
+        windows, before = [], None
+        while True:
+            window = self.get_conversation("s1", limit=2, **({"before": before} if before else {})).json()
+            windows.append(([message["message_id"] for message in window["messages"]], window["has_more"]))
+            if not window["has_more"]:
+                break
+            before = window["messages"][0]["message_id"]
+        whole = self.get_conversation("s1", limit=5).json()
+
+        self.assertEqual(windows, [(["s1-m3", "s1-m4"], True), (["s1-m1", "s1-m2"], True), (["s1-m0"], False)])
+        self.assertEqual((len(whole["messages"]), whole["has_more"]), (5, False))
+        self.assertEqual(self.get_conversation("s1", limit=2, before="unknown").status_code, 404)
+
+    def test_unchanged_conversation_is_answered_with_304(self):
+        self.add_sessions(("s1", False))
+        self.add_messages("s1", 2)
+
+        first = self.get_conversation("s1", limit=2)
+        again = self.get_conversation("s1", etag=first.headers["ETag"], limit=2)
+        other_window = self.get_conversation("s1", etag=first.headers["ETag"], limit=1)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual((again.status_code, again.content), (304, b""))
+        self.assertEqual(again.headers["ETag"], first.headers["ETag"])
+        self.assertEqual(other_window.status_code, 200)
+
+    def test_appended_message_changes_the_etag(self):
+        self.add_sessions(("s1", False))
+        self.add_messages("s1", 2)
+        etag = self.get_conversation("s1").headers["ETag"]
+
+        response = self.client.post("/register", json={
+            "session_id": "s1", "session_name": "s1", "model": "local",
+            "messages": [{"message_id": "s1-m2", "role": "user", "content": "message 2"}],
+        })
+        self.assertEqual(response.status_code, 200, response.text)
+        changed = self.get_conversation("s1", etag=etag)
+
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers["ETag"], etag)
+        self.assertEqual([message["message_id"] for message in changed.json()["messages"]], ["s1-m0", "s1-m1", "s1-m2"])
+        self.assertEqual(self.get_conversation("s1", etag=changed.headers["ETag"]).status_code, 304)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import asyncio
+import unittest
+
+from app.services.coalescer import StreamCoalescer
+
+
+class TestStreamCoalescer(unittest.TestCase):
+    """
+    Test suite for single-flight coalescing in `StreamCoalescer`.
+    """
+
+    def setUp(self):
+        self.coalescer = StreamCoalescer()
+        self.started = 0
+        self.closed = 0
+        self.release = None
+
+    async def upstream(self):
+        self.started += 1
+        try:
+            yield "a"
+            yield "b"
+            await self.release.wait()
+            yield "c"
+        finally:
+            self.closed += 1
+
+    @staticmethod
+    async def _collect(stream):
+        return [chunk async for chunk in stream]
+
+    def test_identical_requests_share_one_upstream(self):
+        async def scenario():
+            self.release = asyncio.Event()
+            early = asyncio.create_task(self._collect(self.coalescer.subscribe("key", self.upstream)))
+            late = asyncio.create_task(self._collect(self.coalescer.subscribe("key", self.upstream)))
+            await asyncio.sleep(0.01)
+            self.release.set()
+            return await early, await late
+
+        early, late = asyncio.run(scenario())
+
+        self.assertEqual(early, ["a", "b", "c"])
+        self.assertEqual(late, ["a", "b", "c"])
+        self.assertEqual(self.started, 1)
+        self.assertEqual(self.coalescer.stats()["coalesced"], 1)
+
+    def test_late_subscriber_replays_from_start(self):
+        async def scenario():
+            self.release = asyncio.Event()
+            first = self.coalescer.subscribe("key", self.upstream)
+            self.assertEqual(await first.__anext__(), "a")
+            self.assertEqual(await first.__anext__(), "b")
+
+            late = asyncio.create_task(self._collect(self.coalescer.subscribe("key", self.upstream)))
+            await asyncio.sleep(0.01)
+            self.release.set()
+            rest = [chunk async for chunk in first]
+            return await late, rest
+
+        late, rest = asyncio.run(scenario())
+
+        self.assertEqual(late, ["a", "b", "c"])
+        self.assertEqual(rest, ["c"])
+        self.assertEqual(self.started, 1)
+
+    def test_upstream_cancelled_after_last_subscriber_leaves(self):
+        async def scenario():
+            self.release = asyncio.Event()
+            first = self.coalescer.subscribe("key", self.upstream)
+            second = self.coalescer.subscribe("key", self.upstream)
+            await first.__anext__()
+            await second.__anext__()
+
+            await first.aclose()
+            await asyncio.sleep(0)
+            self.assertEqual(self.coalescer.stats()["cancelled_upstreams"], 0)
+
+            await second.aclose()
+            await asyncio.sleep(0.01)
+
+        asyncio.run(scenario())
+
+        self.assertEqual(self.closed, 1)
+        self.assertEqual(self.coalescer.stats()["cancelled_upstreams"], 1)
+        self.assertEqual(self.coalescer.stats()["in_flight"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
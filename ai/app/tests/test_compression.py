@@ -0,0 +1,86 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+import zstandard
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database.compression import MessageCodec
+from app.database.engine_profiles import create_async_sqlite_engine, get_profile
+from app.database.migrations import migrate
+from app.database.schema import ChatMessage, ChatSession
+from app.models.request import ContextSearchRequest
+from app.services.search import search_messages
+
+CODE = "def handler(request):\n    response = process(request.body)\n    return response.json()\n" * 20
+
+
+class TestMessageCodec(unittest.TestCase):
+    """
+    Test suite for the zstd `MessageCodec` of message bodies.
+    """
+
+    def test_only_large_compressible_bodies_are_compressed(self):
+        codec = MessageCodec(min_bytes=512)
+
+        self.assertEqual(codec.compress("short answer"), "short answer")
+        self.assertIsInstance(codec.compress(CODE), bytes)
+        self.assertEqual(codec.decompress(codec.compress(CODE)), CODE)
+        self.assertEqual(codec.decompress("plain"), "plain")
+        # A frame larger than the text is not kept
+        self.assertEqual(MessageCodec(min_bytes=1).compress("ok"), "ok")
+
+    def test_frames_stay_readable_across_dictionaries(self):
+        codec = MessageCodec(min_bytes=64)
+        before = codec.compress(CODE)
+        samples = [f"{CODE[:200]} {index} {CODE[200:400]}".encode() for index in range(300)]
+        dictionary_id = codec.add_dictionary(zstandard.train_dictionary(4096, samples).as_bytes())
+        after = codec.compress(CODE)
+
+        self.assertEqual(zstandard.get_frame_parameters(after).dict_id, dictionary_id)
+        self.assertEqual(codec.decompress(before), CODE)
+        self.assertEqual(codec.decompress(after), CODE)
+        with self.assertRaises(ValueError):
+            MessageCodec().decompress(after)
+
+
+class TestCompressedMessages(unittest.TestCase):
+    """
+    Test suite for compressed `ChatMessage.content` in the database.
+    """
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        migrate(f"sqlite:///{self.path}")
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_compressed_bodies_are_read_and_searched_as_text(self):
+        async def scenario():
+            engine = create_async_sqlite_engine(f"sqlite+aiosqlite:///{self.path}", get_profile())
+            async with async_sessionmaker(engine)() as db:
+                await db.execute(insert(ChatSession).values(session_name="Code", session_id="s1"))
+                await db.execute(insert(ChatMessage).values(
+                    session_id="s1", message_id="m1", role="assistant", content=CODE + "unique marker"
+                ))
+                await db.commit()
+                stored = await db.scalar(text("SELECT typeof(content) FROM chat_messages"))
+                content = await db.scalar(select(ChatMessage.content))
+                results, _ = await search_messages(db, ContextSearchRequest(query="marker"))
+            await engine.dispose()
+            return stored, content, results
+
+        stored, content, results = asyncio.run(scenario())
+
+        self.assertEqual(stored, "blob")
+        self.assertEqual(content, CODE + "unique marker")
+        self.assertEqual([result["message_id"] for result in results], ["m1"])
+        self.assertIn("<mark>marker</mark>", results[0]["snippet"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from app.enums.ai import EPriority
+from app.enums.chat import ERole
+from app.models.chat_model import ChatMessageResponse
+from app.services import context_window as context_window_module
+from app.services.context_window import ContextWindowManager
+from app.services.scheduler import LLMScheduler
+
+
+def make_messages(count: int, size: int = 400):
+    return [
+        ChatMessageResponse(
+            message_id=str(index),
+            role=ERole.USER if index % 2 == 0 else ERole.ASSISTANT,
+            content=f"{index} " + "x" * size
+        )
+        for index in range(count)
+    ]
+
+
+class TestContextWindowManager(unittest.TestCase):
+    """
+    Test suite for the token-budgeted `ContextWindowManager`.
+    """
+
+    def setUp(self):
+        self.manager = ContextWindowManager()
+        # A 1000 token window leaves 750 tokens for the prompt, about seven of the test messages
+        self.manager._limits[("local", "llama3.2")] = (1000, time.monotonic())
+
+    def fit(self, messages, session_id=None):
+        return asyncio.run(self.manager.fit(messages, "local", "llama3.2", None, session_id))
+
+    def test_short_conversation_is_untouched(self):
+        messages = make_messages(3)
+
+        self.assertEqual(self.fit(messages), messages)
+        self.assertEqual(self.manager.stats()["trimmed"], 0)
+
+    def test_truncates_oldest_turns_without_session(self):
+        messages = make_messages(20)
+        fitted = self.fit(messages)
+
+        self.assertLess(len(fitted), len(messages))
+        self.assertEqual(fitted, messages[-len(fitted):])
+
+    def test_summary_is_extended_incrementally(self):
+        stored = {}
+        summarise = AsyncMock(side_effect=lambda *args, previous_summary=None: f"{previous_summary or ''}+{len(args[3])}")
+
+        with patch.object(context_window_module, "_load_summary", lambda session_id: stored.get(session_id)), \
+                patch.object(context_window_module, "_save_summary",
+                             AsyncMock(side_effect=lambda session_id, *row: stored.__setitem__(session_id, row))), \
+                patch.object(context_window_module.AIService, "asummarise_messages", summarise):
+            first = self.fit(make_messages(20), session_id="s1")
+            second = self.fit(make_messages(24), session_id="s1")
+
+        self.assertEqual(first[0].role, ERole.SYSTEM)
+        self.assertEqual(summarise.await_count, 2)
+        # The second call only summarised the messages evicted since the first one
+        first_covered = stored["s1"][1] - 4
+        self.assertEqual(summarise.await_args_list[1].kwargs["previous_summary"], f"+{first_covered}")
+        self.assertEqual(len(summarise.await_args_list[1].args[3]), 4)
+        self.assertEqual(second[1:], make_messages(24)[stored["s1"][1]:])
+
+    def test_falls_back_to_truncation_when_summary_fails(self):
+        messages = make_messages(20)
+        with patch.object(context_window_module, "_load_summary", lambda session_id: None), \
+                patch.object(context_window_module.AIService, "asummarise_messages", AsyncMock(side_effect=RuntimeError)):
+            fitted = self.fit(messages, session_id="s1")
+
+        self.assertEqual(fitted, messages[-len(fitted):])
+        self.assertEqual(self.manager.stats()["summary_failures"], 1)
+
+    def test_summary_is_not_queued_behind_title_jobs(self):
+        scheduler = LLMScheduler(limits={}, default_limit=1)
+        backend = context_window_module.backend_for("local")
+        order = []
+
+        async def title_job():
+            async with scheduler.slot(backend, EPriority.TITLE):
+                order.append("title")
+
+        async def summarise(*args, previous_summary=None):
+            order.append("summary")
+            return "summary"
+
+        async def scenario():
+            await scheduler.acquire(backend)  # A generation of another user holds the only slot
+            title = asyncio.create_task(title_job())
+            await asyncio.sleep(0)
+            fit = asyncio.create_task(self.manager.fit(make_messages(20), "local", "llama3.2", None, "s1"))
+            while len(scheduler._backend(backend).waiters) < 2:
+                await asyncio.sleep(0)
+            scheduler.release(backend)
+            await asyncio.gather(title, fit)
+
+        with patch.object(context_window_module, "llm_scheduler", scheduler), \
+                patch.object(context_window_module, "_load_summary", lambda session_id: None), \
+                patch.object(context_window_module, "_save_summary", AsyncMock()), \
+                patch.object(context_window_module.AIService, "asummarise_messages", summarise):
+            asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+
+        self.assertEqual(order, ["summary", "title"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database.schema import Base, ChatSession
+from app.models.request import ChatRegister
+from app.services.db_writer import DatabaseWriter
+from app.services.ingestion import ingest_chats
+
+
+def make_chat(session_id: str) -> ChatRegister:
+    return ChatRegister(session_id=session_id, session_name="Chat", model="local", variant="llama3.2", messages=[])
+
+
+class TestDatabaseWriter(unittest.TestCase):
+    """
+    Test suite for the group-committing `DatabaseWriter`.
+    """
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def run_writer(self, scenario):
+        async def main():
+            engine = create_async_engine(f"sqlite+aiosqlite:///{self.path}")
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            writer = DatabaseWriter(window=0.01, max_batch=8, session_factory=async_sessionmaker(engine))
+            writer.start()
+            try:
+                result = await scenario(writer)
+            finally:
+                await writer.stop()
+            async with async_sessionmaker(engine)() as db:
+                sessions = await db.scalar(select(func.count()).select_from(ChatSession))
+            await engine.dispose()
+            return result, sessions, writer.stats()
+
+        return asyncio.run(main())
+
+    def test_concurrent_writes_share_a_commit(self):
+        async def scenario(writer):
+            return await asyncio.gather(*(
+                writer.submit(lambda db, index=index: ingest_chats(db, [make_chat(f"s{index}")]))
+                for index in range(8)
+            ))
+
+        results, sessions, stats = self.run_writer(scenario)
+
+        self.assertEqual([result.sessions for result in results], [1] * 8)
+        self.assertEqual(sessions, 8)
+        self.assertEqual((stats["writes"], stats["batches"]), (8, 1))
+
+    def test_failed_write_only_fails_its_caller(self):
+        async def failing(db):
+            raise ValueError("bad write")
+
+        async def scenario(writer):
+            return await asyncio.gather(
+                writer.submit(lambda db: ingest_chats(db, [make_chat("a")])),
+                writer.submit(failing),
+                writer.submit(lambda db: ingest_chats(db, [make_chat("b")])),
+                return_exceptions=True
+            )
+
+        results, sessions, stats = self.run_writer(scenario)
+
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(sessions, 2)
+        self.assertEqual(stats["failed_batches"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
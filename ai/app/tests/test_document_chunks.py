@@ -0,0 +1,115 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database.cold_storage import ColdStorage
+from app.database.engine_profiles import create_async_sqlite_engine, get_profile
+from app.database.migrations import LATEST_VERSION, migrate
+from app.database.schema import ChatSession, Document
+from app.database.vectors import PackedEmbeddings, unpack_vector
+from app.enums.ai import EVectorDType
+from app.services.document_processing.chunk_store import load_document_embeddings, store_document_chunks
+
+# The documents table as version 8 made it
+LEGACY_DOCUMENTS = """
+CREATE TABLE documents (
+    id INTEGER NOT NULL, session_id INTEGER NOT NULL, file_path VARCHAR NOT NULL, uploaded_at DATETIME NOT NULL,
+    embedding BLOB NOT NULL, PRIMARY KEY (id), FOREIGN KEY(session_id) REFERENCES chat_sessions (id) ON DELETE CASCADE
+);
+INSERT INTO documents VALUES (1, 1, 'a.pdf', '2024-01-01 00:00:00.000000', x'00');
+PRAGMA user_version = 8;
+"""
+
+
+class TestDocumentChunks(unittest.TestCase):
+    """
+    Test suite for the packed vector format of chunk embeddings and their storage.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_vectors_round_trip_without_copies(self):
+        vectors = [[0.1 * index + dimension for dimension in range(8)] for index in range(3)]
+
+        full = PackedEmbeddings.from_vectors(vectors, model="nomic-embed-text")
+        half = PackedEmbeddings.from_vectors(vectors, model="nomic-embed-text", dtype=EVectorDType.FLOAT16)
+        stored = list(full.rows())
+        vector = unpack_vector(stored[1], EVectorDType.FLOAT32, 8)
+
+        self.assertEqual((len(stored[1]), len(next(half.rows()))), (32, 16))
+        np.testing.assert_array_equal(vector, np.float32(vectors[1]))
+        np.testing.assert_allclose(half.vectors, vectors, rtol=1e-3)
+        self.assertTrue(np.shares_memory(vector, np.frombuffer(stored[1], dtype=np.uint8)))
+        self.assertFalse(vector.flags.writeable)
+        with self.assertRaises(ValueError):
+            unpack_vector(stored[1], EVectorDType.FLOAT16, 8)
+        with self.assertRaises(ValueError):
+            PackedEmbeddings.from_vectors([[1.0, 2.0], [3.0]], model="nomic-embed-text")
+
+    def test_stored_chunks_load_as_one_matrix_per_model(self):
+        path = os.path.join(self.directory.name, "chunks.db")
+        migrate(f"sqlite:///{path}")
+
+        async def scenario():
+            engine = create_async_sqlite_engine(f"sqlite+aiosqlite:///{path}", get_profile())
+            async with async_sessionmaker(engine)() as db:
+                session = ChatSession(session_name="Docs", session_id="s1")
+                db.add(session)
+                await db.flush()
+                document_ids = []
+                for name in ("a.pdf", "b.pdf"):
+                    result = await db.execute(insert(Document).values(session_id=session.id, file_path=name))
+                    document_ids.append(result.inserted_primary_key[0])
+                await store_document_chunks(db, document_ids[1], PackedEmbeddings.from_vectors(
+                    [[3.0, 3.0]], model="nomic-embed-text"
+                ), contents=["third"])
+                await store_document_chunks(db, document_ids[0], PackedEmbeddings.from_vectors(
+                    [[1.0, 1.0], [2.0, 2.0]], model="nomic-embed-text", dtype=EVectorDType.FLOAT16
+                ))
+                await store_document_chunks(db, document_ids[0], PackedEmbeddings.from_vectors(
+                    [[9.0, 9.0, 9.0]], model="mxbai-embed-large"
+                ))
+                await db.commit()
+
+                nomic = await load_document_embeddings(db, document_ids, "nomic-embed-text")
+                mxbai = await load_document_embeddings(db, document_ids[1:], "mxbai-embed-large")
+            await engine.dispose()
+            return nomic, mxbai
+
+        (chunk_ids, nomic), mxbai = asyncio.run(scenario())
+
+        self.assertEqual(len(chunk_ids), 3)
+        self.assertEqual(nomic.dtype, EVectorDType.FLOAT32)
+        np.testing.assert_array_equal(nomic.vectors, [[1.0, 1.0], [2.0, 2.0], [3.0, 3.0]])
+        self.assertEqual(mxbai, ([], None))
+
+    def test_cold_file_upgrade_keeps_legacy_documents(self):
+        path = os.path.join(self.directory.name, "cold.db")
+        connection = sqlite3.connect(path)
+        connection.executescript(LEGACY_DOCUMENTS)
+        connection.close()
+
+        ColdStorage(path).create()
+
+        connection = sqlite3.connect(path)
+        nullable = {row[1]: not row[3] for row in connection.execute("PRAGMA table_info(documents)")}
+        tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertTrue(nullable["embedding"])
+        self.assertIn("document_chunks", tables)
+        self.assertEqual(connection.execute("SELECT file_path FROM documents").fetchall(), [("a.pdf",)])
+        self.assertEqual(connection.execute("PRAGMA user_version").fetchone()[0], LATEST_VERSION)
+        connection.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
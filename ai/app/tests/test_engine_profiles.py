@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+
+from app.database.engine_profiles import get_profile, create_sync_engine
+from app.enums.database import EDatabaseProfile
+
+
+class TestEngineProfiles(unittest.TestCase):
+    """
+    Test suite for the SQLite engine profiles.
+    """
+
+    def pragmas(self, name: EDatabaseProfile):
+        directory = tempfile.mkdtemp()
+        engine = create_sync_engine(f"sqlite:///{directory}/test.db", get_profile(name))
+        try:
+            with engine.connect() as connection:
+                return {
+                    pragma: connection.exec_driver_sql(f"PRAGMA {pragma}").scalar()
+                    for pragma in ("journal_mode", "synchronous", "foreign_keys", "busy_timeout", "mmap_size")
+                }
+        finally:
+            engine.dispose()
+            for file in os.listdir(directory):
+                os.remove(os.path.join(directory, file))
+            os.rmdir(directory)
+
+    def test_production_profile_tunes_connections(self):
+        pragmas = self.pragmas(EDatabaseProfile.PRODUCTION)
+
+        self.assertEqual(pragmas["journal_mode"], "wal")
+        self.assertEqual(pragmas["synchronous"], 1)  # NORMAL
+        self.assertEqual(pragmas["foreign_keys"], 1)
+        self.assertGreater(pragmas["mmap_size"], 0)
+
+    def test_default_profile_keeps_sqlite_defaults(self):
+        pragmas = self.pragmas(EDatabaseProfile.DEFAULT)
+
+        self.assertEqual(pragmas["journal_mode"], "delete")
+        self.assertEqual(pragmas["synchronous"], 2)  # FULL
+        self.assertEqual(pragmas["foreign_keys"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database.cold_storage import ColdStorage
+from app.database.compression import register_sql_functions
+from app.database.migrations import migrate
+from app.database.schema import ChatMessage, ChatSession
+from app.models.chat_model import ChatMessageResponse
+from app.services import history_cache as history_cache_module
+from app.services.history_cache import SessionHistoryCache
+
+
+def message(message_id: str) -> ChatMessageResponse:
+    return ChatMessageResponse(message_id=message_id, role="user", content=f"message {message_id}")
+
+
+class TestSessionHistoryCache(unittest.TestCase):
+    """
+    Test suite for the in-memory `SessionHistoryCache` of delta requests, over a scratch database.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, "hot.db")
+        migrate(f"sqlite:///{path}")
+        self.cold = ColdStorage(os.path.join(self.directory.name, "cold.db"))
+        self.cold.create()
+        self.engine = create_engine(f"sqlite:///{path}")
+
+        @event.listens_for(self.engine, "connect")
+        def _connect(dbapi_connection, _):
+            register_sql_functions(dbapi_connection)
+
+        with self.engine.begin() as connection:
+            self.cold.attach_connection(connection)
+            for session_id, archived in (("a", False), ("b", False), ("c", False), ("archived", True)):
+                options = self.cold.options if archived else {}
+                connection.execute(
+                    insert(ChatSession).values(session_id=session_id, session_name=session_id, archived=archived),
+                    execution_options=options
+                )
+                for number in range(2):
+                    connection.execute(insert(ChatMessage).values(
+                        session_id=session_id, message_id=f"{session_id}{number}", role="user",
+                        content=f"message {session_id}{number}"
+                    ), execution_options=options)
+
+        self.patches = [
+            patch.object(history_cache_module, "Session", sessionmaker(bind=self.engine)),
+            patch.object(history_cache_module, "cold_storage", self.cold),
+        ]
+        for started in self.patches:
+            started.start()
+        self.cache = SessionHistoryCache(max_sessions=2)
+
+    def tearDown(self):
+        for started in self.patches:
+            started.stop()
+        self.engine.dispose()
+        self.directory.cleanup()
+
+    def get(self, session_id: str):
+        return [item.message_id for item in asyncio.run(self.cache.get(session_id))]
+
+    def test_miss_loads_from_the_database_then_hits(self):
+        self.assertEqual(self.get("a"), ["a0", "a1"])
+        self.assertEqual(self.get("a"), ["a0", "a1"])
+        self.assertEqual(self.cache.stats(), {"hits": 1, "misses": 1, "sessions": 1})
+
+    def test_archived_session_loads_from_the_cold_file(self):
+        self.assertEqual(self.get("archived"), ["archived0", "archived1"])
+
+    def test_append_extends_cached_sessions_only(self):
+        self.get("a")
+        self.cache.append("a", [message("a1"), message("a2")])
+        self.cache.append("b", [message("b9")])
+
+        self.assertEqual(self.get("a"), ["a0", "a1", "a2"])
+        self.assertEqual(self.get("b"), ["b0", "b1"])
+
+    def test_invalidate_reloads_the_session(self):
+        self.get("a")
+        self.cache.append("a", [message("a2")])
+        self.cache.invalidate("a")
+
+        self.assertEqual(self.get("a"), ["a0", "a1"])
+        self.assertEqual(self.cache.stats()["misses"], 2)
+
+    def test_least_recently_used_session_is_evicted(self):
+        self.get("a")
+        self.get("b")
+        self.get("a")
+        self.get("c")
+
+        self.assertEqual(list(self.cache._sessions), ["a", "c"])
+        self.get("b")
+        self.assertEqual(self.cache.stats(), {"hits": 1, "misses": 4, "sessions": 2})
+
+    def test_rebuild_appends_only_new_messages(self):
+        rebuilt = asyncio.run(self.cache.rebuild("a", [message("a1"), message("new")]))
+
+        self.assertEqual([item.message_id for item in rebuilt], ["a0", "a1", "new"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+import zstandard
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database.cold_storage import ColdStorage
+from app.database.engine_profiles import create_async_sqlite_engine, get_profile
+from app.database.migrations import migrate
+from app.database.schema import ChatMessage, ChatSession
+from app.services.db_writer import DatabaseWriter
+from app.services.history_transfer import HistoryTransfer
+from app.services.session_tiers import session_tiers
+
+
+async def chunked(data: bytes, size: int = 7):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+class TestHistoryTransfer(unittest.TestCase):
+    """
+    Test suite for the streaming JSON lines export and import of chat histories.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def database(self, name: str, window: float = 0.0):
+        path = os.path.join(self.directory.name, f"{name}.db")
+        migrate(f"sqlite:///{path}")
+        cold = ColdStorage(os.path.join(self.directory.name, f"{name}-cold.db"))
+        cold.create()
+        engine = create_async_sqlite_engine(f"sqlite+aiosqlite:///{path}", get_profile())
+        cold.attach_on_connect(engine.sync_engine)
+        factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+        writer = DatabaseWriter(window=window, session_factory=factory)
+        return engine, factory, writer, HistoryTransfer(batch_size=2, import_batch=3, session_factory=factory,
+                                                        writer=writer, cold=cold)
+
+    def test_export_then_import_keeps_sessions_messages_and_tiers(self):
+        async def scenario():
+            source_engine, source, source_writer, exporter = self.database("source")
+            async with source() as db:
+                for index, archived in enumerate([False, True, False]):
+                    await db.execute(insert(ChatSession).values(
+                        session_id=f"s{index}", session_name=f"Chat {index}", archived=archived
+                    ))
+                    for number in range(2):
+                        await db.execute(insert(ChatMessage).values(
+                            session_id=f"s{index}", message_id=f"s{index}-m{number}", role="user",
+                            content=f"message {number} of chat {index}"
+                        ))
+                await session_tiers.rebalance(db)
+                await db.commit()
+            exported = b"".join([chunk async for chunk in exporter.export_history()])
+            await source_engine.dispose()
+
+            target_engine, target, writer, importer = self.database("target")
+            writer.start()
+            body = exported + b"not json\n" + json.dumps(
+                {"type": "message", "session_id": "unknown", "message_id": "x", "role": "user", "content": "lost"}
+            ).encode()
+            first = await importer.import_history(chunked(body))
+            again = await importer.import_history(chunked(exported))
+            await writer.stop()
+            async with target() as db:
+                live = list(await db.scalars(select(ChatSession.session_id).order_by(ChatSession.session_id)))
+                archived = list(await db.scalars(select(ChatSession.session_id), execution_options=importer.cold.options))
+                messages = await db.scalar(select(func.count()).select_from(ChatMessage))
+            await target_engine.dispose()
+            return exported, first, again, live, archived, messages
+
+        exported, first, again, live, archived, messages = asyncio.run(scenario())
+        records = [json.loads(line) for line in exported.splitlines()]
+
+        self.assertEqual(
+            [(record["type"], record["session_id"]) for record in records],
+            [("session", "s0"), ("message", "s0"), ("message", "s0"),
+             ("session", "s2"), ("message", "s2"), ("message", "s2"),
+             ("session", "s1"), ("message", "s1"), ("message", "s1")]
+        )
+        self.assertEqual((first.sessions, first.messages, first.orphan_messages, first.invalid_lines), (3, 6, 1, 1))
+        self.assertEqual((again.sessions, again.messages, again.duplicate_messages), (0, 0, 6))
+        self.assertEqual((live, archived, messages), (["s0", "s2"], ["s1"], 4))
+
+    def test_compressed_import_applies_deleted_sessions(self):
+        async def scenario():
+            engine, factory, writer, importer = self.database("target")
+            writer.start()
+            lines = [
+                {"type": "session", "session_id": "keep", "session_name": "Keep"},
+                {"type": "session", "session_id": "gone", "session_name": "Gone"},
+                {"type": "deleted", "session_id": "gone"},
+                {"type": "message", "session_id": "keep", "message_id": "m1", "role": "assistant", "content": "hi"},
+            ]
+            body = zstandard.ZstdCompressor().compress(b"".join(json.dumps(line).encode() + b"\n" for line in lines))
+            result = await importer.import_history(chunked(body), compressed=True)
+            await writer.stop()
+            async with factory() as db:
+                sessions = list(await db.scalars(select(ChatSession.session_id)))
+            await engine.dispose()
+            return result, sessions
+
+        result, sessions = asyncio.run(scenario())
+
+        self.assertEqual((result.deleted_sessions, result.messages), (1, 1))
+        self.assertEqual(sessions, ["keep"])
+
+    def test_retried_batch_is_counted_once(self):
+        async def broken(db):
+            raise RuntimeError("write failed")
+
+        async def scenario():
+            # A write failing in the same group commit makes the writer run the import batch a second time
+            engine, factory, writer, importer = self.database("target", window=0.05)
+            writer.start()
+            lines = [
+                {"type": "session", "session_id": "s1", "session_name": "Chat"},
+                {"type": "message", "session_id": "s1", "message_id": "m1", "role": "user", "content": "hi"},
+                {"type": "message", "session_id": "unknown", "message_id": "m2", "role": "user", "content": "lost"},
+            ]
+            body = b"".join(json.dumps(line).encode() + b"\n" for line in lines)
+            result, failed = await asyncio.gather(
+                importer.import_history(chunked(body)), writer.submit(broken), return_exceptions=True
+            )
+            await writer.stop()
+            await engine.dispose()
+            return result, failed, writer.failed_batches
+
+        result, failed, failed_batches = asyncio.run(scenario())
+
+        self.assertIsInstance(failed, RuntimeError)
+        self.assertEqual(failed_batches, 1)
+        self.assertEqual((result.sessions, result.messages, result.orphan_messages), (1, 1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import asyncio
+import unittest
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database.schema import Base, ChatSession, ChatMessage
+from app.models.chat_model import ChatMessageResponse
+from app.models.request import ChatRegister
+from app.services.ingestion import ingest_chats
+
+
+def make_chat(session_id: str, count: int, content: str = "hello") -> ChatRegister:
+    return ChatRegister(
+        session_id=session_id,
+        session_name=None,
+        model="local",
+        variant="llama3.2",
+        messages=[
+            ChatMessageResponse(message_id=f"{session_id}-{index}", role="user", content=content)
+            for index in range(count)
+        ],
+    )
+
+
+class TestIngestChats(unittest.TestCase):
+    """
+    Test suite for the bulk, idempotent `ingest_chats`.
+    """
+
+    def run_with_db(self, scenario):
+        async def main():
+            engine = create_async_engine("sqlite+aiosqlite://")
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+                result = await scenario(db)
+            await engine.dispose()
+            return result
+
+        return asyncio.run(main())
+
+    def test_ingestion_is_idempotent(self):
+        async def scenario(db):
+            first = await ingest_chats(db, [make_chat("a", 3), make_chat("b", 2)])
+            second = await ingest_chats(db, [make_chat("a", 4)])
+            sessions = await db.scalar(select(func.count()).select_from(ChatSession))
+            messages = await db.scalar(select(func.count()).select_from(ChatMessage))
+            return first, second, sessions, messages
+
+        first, second, sessions, messages = self.run_with_db(scenario)
+
+        self.assertEqual(first.inserted_messages, 5)
+        self.assertEqual(second.inserted_messages, 1)
+        self.assertEqual((sessions, messages), (2, 6))
+
+    def test_short_chat_takes_quoted_title(self):
+        async def scenario(db):
+            await ingest_chats(db, [make_chat("a", 1, 'Call it "Trip plans"'), make_chat("b", 3, '"Ignored"')])
+            return dict((await db.execute(select(ChatSession.session_id, ChatSession.session_name))).all())
+
+        names = self.run_with_db(scenario)
+
+        self.assertEqual(names, {"a": "Trip plans", "b": "Unknown"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.llm_registry import LLMClientRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeClient:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestLLMClientRegistry(unittest.TestCase):
+    """
+    Test suite for the `LLMClientRegistry` pool.
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.registry = LLMClientRegistry(max_size=2, idle_ttl=60, clock=self.clock)
+
+    def test_reuses_client_for_same_key(self):
+        key = LLMClientRegistry.make_key("llm", "ollama", "llama3.2", None)
+        first = self.registry.get_or_create(key, object)
+        second = self.registry.get_or_create(key, object)
+
+        self.assertIs(first, second)
+        self.assertEqual(self.registry.stats()["hits"], 1)
+        self.assertEqual(self.registry.stats()["misses"], 1)
+
+    def test_key_hashes_api_key_and_options(self):
+        key = LLMClientRegistry.make_key("llm", "openai", "gpt-4o", "secret", {"temperature": 0.2})
+
+        self.assertNotIn("secret", repr(key))
+        self.assertNotEqual(key, LLMClientRegistry.make_key("llm", "openai", "gpt-4o", "other", {"temperature": 0.2}))
+        self.assertNotEqual(key, LLMClientRegistry.make_key("llm", "openai", "gpt-4o", "secret", {"temperature": 0.7}))
+
+    def test_slow_factory_does_not_block_other_keys(self):
+        cached = self.registry.get_or_create("cached", object)
+        building, release = threading.Event(), threading.Event()
+
+        def slow_factory():
+            building.set()
+            release.wait(5)
+            return object()
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            slow = pool.submit(self.registry.get_or_create, "slow", slow_factory)
+            self.assertTrue(building.wait(5))
+            try:
+                self.assertIs(pool.submit(self.registry.get_or_create, "cached", object).result(1), cached)
+            finally:
+                release.set()
+            slow.result(5)
+
+    def test_concurrent_builds_share_one_client_and_close_the_other(self):
+        barrier = threading.Barrier(2)
+        built = []
+
+        def factory():
+            client = FakeClient()
+            built.append(client)
+            barrier.wait(5)
+            return client
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(lambda _: self.registry.get_or_create("key", factory), range(2)))
+
+        self.assertIs(results[0], results[1])
+        self.assertEqual(sorted(client.closed for client in built), [False, True])
+        self.assertFalse(results[0].closed)
+        self.assertEqual(len(self.registry), 1)
+
+    def test_evicts_least_recently_used(self):
+        a = self.registry.get_or_create("a", object)
+        self.registry.get_or_create("b", object)
+        self.registry.get_or_create("a", object)
+        self.registry.get_or_create("c", object)
+
+        self.assertIs(self.registry.get_or_create("a", object), a)
+        self.assertEqual(self.registry.stats()["evictions"], 1)
+        self.assertEqual(len(self.registry), 2)
+
+    def test_expires_idle_clients(self):
+        first = self.registry.get_or_create("a", object)
+        self.clock.now = 61
+        second = self.registry.get_or_create("a", object)
+
+        self.assertIsNot(first, second)
+        self.assertEqual(self.registry.stats()["expirations"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime
+
+from sqlalchemy import create_engine, func, select, tuple_
+from sqlalchemy.dialects import sqlite
+
+from app.database.compression import register_sql_functions
+from app.database.migrations import LATEST_VERSION, migrate
+from app.database.schema import ChatMessage, ChatSession
+
+# The chat tables as the old `create_all` made them
+LEGACY_SCHEMA = """
+CREATE TABLE chat_sessions (
+    id INTEGER NOT NULL, session_name VARCHAR NOT NULL, session_id VARCHAR NOT NULL, archived BOOLEAN NOT NULL,
+    favorite BOOLEAN NOT NULL, created_at DATETIME NOT NULL, PRIMARY KEY (id), UNIQUE (session_id)
+);
+CREATE TABLE chat_messages (
+    id INTEGER NOT NULL, session_id INTEGER NOT NULL, message_id VARCHAR NOT NULL, role VARCHAR(9), model VARCHAR,
+    variant VARCHAR, content VARCHAR NOT NULL, created_at DATETIME NOT NULL, PRIMARY KEY (id),
+    FOREIGN KEY(session_id) REFERENCES chat_sessions (id), UNIQUE (message_id)
+);
+CREATE TABLE documents (
+    id INTEGER NOT NULL, session_id INTEGER NOT NULL, file_path VARCHAR NOT NULL, uploaded_at DATETIME NOT NULL,
+    embedding BLOB NOT NULL, PRIMARY KEY (id), FOREIGN KEY(session_id) REFERENCES chat_sessions (id)
+);
+"""
+
+
+class TestMigrations(unittest.TestCase):
+    """
+    Test suite for the versioned schema migrations and the query plans of the hot chat queries.
+    """
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.url = f"sqlite:///{self.path}"
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_upgrades_legacy_database_in_place(self):
+        connection = sqlite3.connect(self.path)
+        connection.executescript(LEGACY_SCHEMA)
+        connection.execute(
+            "INSERT INTO chat_sessions VALUES (1, 'Numbers', '123', 0, 0, '2024-01-01 00:00:00.000000')"
+        )
+        connection.execute(
+            "INSERT INTO chat_messages VALUES (1, '123', 'm1', 'USER', NULL, NULL, 'hi', '2024-01-01 00:00:00.000000')"
+        )
+        connection.commit()
+        connection.close()
+
+        self.assertEqual(migrate(self.url), LATEST_VERSION)
+        self.assertEqual(migrate(self.url), LATEST_VERSION)
+
+        connection = sqlite3.connect(self.path)
+        columns = {row[1]: row[2] for row in connection.execute("PRAGMA table_info(chat_messages)")}
+        self.assertEqual(columns["session_id"], "VARCHAR")
+        self.assertEqual(connection.execute("SELECT typeof(session_id) FROM chat_messages").fetchone()[0], "text")
+        self.assertEqual(
+            connection.execute("SELECT COUNT(*) FROM chat_messages WHERE session_id = ?", ("123",)).fetchone()[0], 1
+        )
+        connection.close()
+
+    def test_rebuilt_tables_keep_foreign_keys_of_new_tables(self):
+        connection = sqlite3.connect(self.path)
+        connection.executescript(LEGACY_SCHEMA)
+        connection.execute(
+            "INSERT INTO chat_sessions VALUES (1, 'Docs', 's1', 0, 0, '2024-01-01 00:00:00.000000')"
+        )
+        connection.execute("INSERT INTO documents VALUES (1, 1, 'a.pdf', '2024-01-01 00:00:00.000000', x'00')")
+        connection.commit()
+        connection.close()
+
+        migrate(self.url)
+
+        connection = sqlite3.connect(self.path)
+        register_sql_functions(connection)
+        connection.execute("PRAGMA foreign_keys=ON")
+        referenced = {row[2] for row in connection.execute("PRAGMA foreign_key_list(document_chunks)")}
+        connection.execute(
+            "INSERT INTO document_chunks (document_id, chunk_index, model, dimension, dtype, embedding) "
+            "VALUES (1, 0, 'nomic-embed-text', 1, 'float32', x'0000803f')"
+        )
+        connection.execute("DELETE FROM chat_sessions")
+        chunks = connection.execute("SELECT count(*) FROM document_chunks").fetchone()[0]
+        connection.close()
+
+        self.assertEqual(referenced, {"documents"})
+        self.assertEqual(chunks, 0)
+
+    def assert_uses_index(self, statement, index: str, ordered: bool = True):
+        migrate(self.url)
+        engine = create_engine(self.url)
+        sql = str(statement.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+        with engine.connect() as connection:
+            plan = " | ".join(row[3] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+        engine.dispose()
+
+        self.assertIn(index, plan)
+        if ordered:
+            self.assertNotIn("TEMP B-TREE", plan)
+        for table in ("chat_sessions", "chat_messages"):
+            self.assertNotRegex(plan, rf"SCAN {table}( |$)(?!USING)", plan)
+
+    def test_conversation_query_uses_index(self):
+        statement = select(ChatMessage).where(ChatMessage.session_id == "abc").order_by(ChatMessage.created_at)
+        self.assert_uses_index(statement, "ix_chat_messages_session_id_created_at")
+
+    def test_history_query_uses_index(self):
+        statement = (
+            select(ChatMessage.message_id, ChatMessage.role, ChatMessage.content)
+            .where(ChatMessage.session_id == "abc")
+            .order_by(ChatMessage.created_at, ChatMessage.id)
+        )
+        self.assert_uses_index(statement, "ix_chat_messages_session_id_created_at")
+
+    def test_session_list_queries_use_indexes(self):
+        page = select(ChatSession).order_by(ChatSession.created_at).limit(10)
+        filtered = page.where(ChatSession.archived == True, ChatSession.favorite == True)
+
+        self.assert_uses_index(filtered, "ix_chat_sessions_archived_favorite_created_at")
+        # Only the archived sessions are sorted here, not the whole table
+        self.assert_uses_index(
+            page.where(ChatSession.archived == True), "ix_chat_sessions_archived_favorite_created_at", ordered=False
+        )
+        self.assert_uses_index(page, "ix_chat_sessions_created_at")
+        # Keyset pages ordered by (created_at, id)
+        after = tuple_(ChatSession.created_at, ChatSession.id) > tuple_(datetime(2024, 1, 1), 42)
+        self.assert_uses_index(
+            select(ChatSession).where(after).order_by(ChatSession.created_at, ChatSession.id).limit(10),
+            "ix_chat_sessions_created_at"
+        )
+        self.assert_uses_index(
+            select(func.count()).select_from(filtered.subquery()), "ix_chat_sessions_archived_favorite_created_at"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
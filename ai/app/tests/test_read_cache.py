@@ -0,0 +1,46 @@
+import unittest
+
+from app.services.read_cache import ReadCache, SESSION_LIST
+
+
+class TestReadCache(unittest.TestCase):
+    """
+    Test suite for the `ReadCache` of rendered session lists and conversations.
+    """
+
+    def test_invalidation_is_per_session(self):
+        cache = ReadCache(max_bytes=1024)
+        cache.set("a", (None, None), b"conversation a", {}, cache.generation)
+        cache.set("b", (None, None), b"conversation b", {}, cache.generation)
+        cache.set(SESSION_LIST, (False, False, None, None, 1, 10, None), b"page", {}, cache.generation)
+
+        cache.invalidate(["a"])
+
+        self.assertIsNone(cache.get("a", (None, None)))
+        self.assertIsNone(cache.get(SESSION_LIST, (False, False, None, None, 1, 10, None)))
+        self.assertEqual(cache.get("b", (None, None)), (b"conversation b", {}))
+        self.assertEqual(cache.stats()["bytes"], len(b"conversation b"))
+
+    def test_evicts_least_recently_used_by_size(self):
+        cache = ReadCache(max_bytes=10)
+        cache.set("a", 1, b"aaaa", {}, cache.generation)
+        cache.set("b", 1, b"bbbb", {}, cache.generation)
+        cache.get("a", 1)
+        cache.set("c", 1, b"cccc", {}, cache.generation)
+
+        self.assertIsNone(cache.get("b", 1))
+        self.assertIsNotNone(cache.get("a", 1))
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["hit_ratio"], 0.6667)
+
+    def test_stale_read_is_not_cached(self):
+        cache = ReadCache(max_bytes=1024)
+        generation = cache.generation  # A reader starts rendering "a"
+        cache.invalidate(["a"])  # A writer changes "a" meanwhile
+        cache.set("a", 1, b"old", {}, generation)
+
+        self.assertIsNone(cache.get("a", 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
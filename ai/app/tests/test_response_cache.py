@@ -0,0 +1,112 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from app.enums.topic import ETopic
+from app.models.chat_model import ChatMessageResponse
+from app.services.cache import response_cache as response_cache_module
+from app.services.cache.response_cache import ResponseCache, make_cache_key, replay_chunks
+
+
+class TestResponseCache(unittest.TestCase):
+    """
+    Test suite for the exact-match `ResponseCache`.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "cache.db")
+        self.cache = ResponseCache(db_path=self.db_path, memory_entries=2, ttl=60, max_bytes=1024)
+
+    def tearDown(self):
+        if self.cache._connection:
+            self.cache._connection.close()
+        self.tmp_dir.cleanup()
+
+    def test_key_is_normalized(self):
+        first = [ChatMessageResponse(message_id="a", role="user", content="What is recursion? ")]
+        retried = [ChatMessageResponse(message_id="b", role="user", content="What is recursion?")]
+
+        self.assertEqual(
+            make_cache_key("Local", "llama3.2", ETopic.GENERAL, first),
+            make_cache_key("local", "llama3.2", ETopic.GENERAL, retried),
+        )
+        self.assertNotEqual(
+            make_cache_key("local", "llama3.2", ETopic.GENERAL, first),
+            make_cache_key("local", "llama3.2", ETopic.GENERAL, first, {"temperature": 0.9}),
+        )
+
+    def test_round_trip_through_disk_tier(self):
+        self.cache.put_sync("key", ["Hello", ", world"])
+        self.cache._memory.clear()
+
+        self.assertEqual(self.cache.get_sync("key"), ["Hello", ", world"])
+        self.assertEqual(self.cache.stats()["disk_hits"], 1)
+        self.assertEqual(self.cache.get_sync("key"), ["Hello", ", world"])
+        self.assertEqual(self.cache.stats()["memory_hits"], 1)
+
+    def test_expired_entries_miss(self):
+        self.cache.put_sync("key", ["old"])
+        self.cache._memory.clear()
+        self.cache._connect().execute("UPDATE response_cache SET created_at = ?", (time.time() - 120,))
+
+        self.assertIsNone(self.cache.get_sync("key"))
+        self.assertEqual(self.cache.stats()["expirations"], 1)
+
+    def test_expired_memory_entries_miss(self):
+        self.cache.put_sync("key", ["old"])
+
+        with patch.object(response_cache_module.time, "time", return_value=time.time() + 120):
+            self.assertIsNone(self.cache.get_sync("key"))
+        self.assertEqual(self.cache.stats()["memory_hits"], 0)
+        self.assertEqual(self.cache.stats()["expirations"], 1)
+        self.assertEqual(self.cache.stats()["memory_entries"], 0)
+
+    def test_prunes_least_recently_used_over_size_limit(self):
+        self.cache.put_sync("a", ["x" * 400])
+        self.cache.put_sync("b", ["y" * 400])
+        self.cache.put_sync("c", ["z" * 400])
+        self.cache._memory.clear()
+
+        self.assertIsNone(self.cache.get_sync("a"))
+        self.assertIsNotNone(self.cache.get_sync("c"))
+
+    def test_size_is_tracked_without_scanning_the_table(self):
+        def stored_bytes():
+            return self.cache._connect().execute("SELECT COALESCE(SUM(size), 0) FROM response_cache").fetchone()[0]
+
+        self.cache.put_sync("a", ["x" * 300])
+        statements = []
+        self.cache._connection.set_trace_callback(statements.append)
+        self.cache.put_sync("a", ["x" * 200])
+        self.cache.put_sync("b", ["y" * 400])
+        self.cache._connection.set_trace_callback(None)
+        self.assertEqual(self.cache.stats()["disk_bytes"], stored_bytes())
+        self.assertFalse([statement for statement in statements if "SUM(" in statement])
+
+        # Over the limit, the expired row goes before the least recently used one
+        self.cache._connect().execute("UPDATE response_cache SET created_at = ? WHERE key = 'b'", (time.time() - 120,))
+        self.cache.put_sync("c", ["z" * 500])
+        self.assertEqual(
+            [row[0] for row in self.cache._connect().execute("SELECT key FROM response_cache ORDER BY key")], ["a", "c"]
+        )
+        self.assertEqual((self.cache.stats()["expirations"], self.cache.stats()["evictions"]), (1, 0))
+
+        # A new instance sums the stored rows once
+        reopened = ResponseCache(db_path=self.db_path, max_bytes=1024)
+        reopened._connect()
+        self.assertEqual(reopened.stats()["disk_bytes"], stored_bytes())
+        reopened._connection.close()
+
+    def test_replay_keeps_chunk_boundaries(self):
+        async def collect():
+            return [chunk async for chunk in replay_chunks(["a", "bc", "d"])]
+
+        self.assertEqual(asyncio.run(collect()), ["a", "bc", "d"])
+
+
+if __name__ == "__main__":
+    unittest.main()
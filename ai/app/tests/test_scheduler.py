@@ -0,0 +1,74 @@
+import asyncio
+import unittest
+
+from app.core.errors import QueueFullError, QueueTimeoutError
+from app.enums.ai import EPriority
+from app.services.scheduler import LLMScheduler, backend_for
+
+
+class TestLLMScheduler(unittest.TestCase):
+    """
+    Test suite for the per-backend `LLMScheduler`.
+    """
+
+    def test_backend_for(self):
+        self.assertEqual(backend_for("local"), "ollama")
+        self.assertEqual(backend_for("ollama"), "ollama")
+        self.assertEqual(backend_for("openai:gpt-4o"), "openai")
+
+    def test_interactive_calls_jump_ahead_of_background_jobs(self):
+        scheduler = LLMScheduler(limits={"ollama": 1}, max_queue_depth=8, queue_timeout=5)
+        order = []
+
+        async def job(name, priority):
+            async with scheduler.slot("ollama", priority):
+                order.append(name)
+                await asyncio.sleep(0)
+
+        async def scenario():
+            await scheduler.acquire("ollama")
+            jobs = [
+                asyncio.create_task(job("title", EPriority.TITLE)),
+                asyncio.create_task(job("summary", EPriority.SUMMARY)),
+                asyncio.create_task(job("chat", EPriority.INTERACTIVE)),
+            ]
+            await asyncio.sleep(0.01)
+            scheduler.release("ollama")
+            await asyncio.gather(*jobs)
+
+        asyncio.run(scenario())
+
+        self.assertEqual(order, ["chat", "title", "summary"])
+        self.assertEqual(scheduler.stats()["backends"]["ollama"]["active"], 0)
+
+    def test_rejects_when_queue_is_full(self):
+        scheduler = LLMScheduler(limits={"ollama": 1}, max_queue_depth=1, queue_timeout=5)
+
+        async def scenario():
+            await scheduler.acquire("ollama")
+            waiting = asyncio.create_task(scheduler.acquire("ollama"))
+            await asyncio.sleep(0)
+            with self.assertRaises(QueueFullError):
+                await scheduler.acquire("ollama")
+            waiting.cancel()
+
+        asyncio.run(scenario())
+
+        self.assertEqual(scheduler.stats()["rejected_queue_full"], 1)
+
+    def test_rejects_after_queue_timeout(self):
+        scheduler = LLMScheduler(limits={"ollama": 1}, max_queue_depth=4, queue_timeout=0.01)
+
+        async def scenario():
+            await scheduler.acquire("ollama")
+            with self.assertRaises(QueueTimeoutError):
+                await scheduler.acquire("ollama", EPriority.TITLE)
+
+        asyncio.run(scenario())
+
+        self.assertEqual(scheduler.stats()["rejected_timeout"], 1)
+        self.assertEqual(scheduler.stats()["backends"]["ollama"]["queued"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import date
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database.compression import register_sql_functions
+from app.database.engine_profiles import create_async_sqlite_engine, get_profile
+from app.database.migrations import migrate
+from app.models.request import ContextSearchRequest
+from app.services.search import build_match_query, highlight, search_messages
+
+
+class TestMessageSearch(unittest.TestCase):
+    """
+    Test suite for the FTS5 chat message search.
+    """
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        migrate(f"sqlite:///{self.path}")
+
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        register_sql_functions(self.connection)
+        self.connection.executemany(
+            "INSERT INTO chat_sessions (session_name, session_id, archived, favorite, created_at, version, topic) "
+            "VALUES (?, ?, ?, 0, '2024-01-01 00:00:00.000000', 0, ?)",
+            [("Python", "s1", 0, "code"), ("Cooking", "s2", 1, "food")]
+        )
+        self.connection.executemany(
+            "INSERT INTO chat_messages (session_id, message_id, role, content, created_at) VALUES (?, ?, 'USER', ?, ?)",
+            [
+                ("s1", "m1", "How do I sort a list in Python?", "2024-01-01 10:00:00.000000"),
+                ("s1", "m2", "Sorting dictionaries by value needs a key function", "2024-02-01 10:00:00.000000"),
+                ("s2", "m3", "Sort the lentils before cooking them", "2024-03-01 10:00:00.000000"),
+            ]
+        )
+        self.connection.commit()
+
+    def tearDown(self):
+        self.connection.close()
+        os.remove(self.path)
+
+    def search_with_flag(self, max_candidates: int = 5000, **fields):
+        async def scenario():
+            engine = create_async_sqlite_engine(f"sqlite+aiosqlite:///{self.path}", get_profile())
+            async with async_sessionmaker(engine)() as db:
+                results = await search_messages(db, ContextSearchRequest(**fields), max_candidates=max_candidates)
+            await engine.dispose()
+            return results
+
+        results, truncated = asyncio.run(scenario())
+        return [result["message_id"] for result in results], truncated
+
+    def search(self, **fields):
+        return self.search_with_flag(**fields)[0]
+
+    def test_match_query_quotes_user_input(self):
+        self.assertEqual(build_match_query('sort "OR dict*'), '"sort" "OR" "dict"*')
+        self.assertIsNone(build_match_query('" ( *'))
+
+    def test_stemmed_and_prefix_matches(self):
+        self.assertEqual(sorted(self.search(query="sorted")), ["m1", "m2", "m3"])
+        self.assertEqual(self.search(query="sort dictio*"), ["m2"])
+
+    def test_filters(self):
+        self.assertEqual(self.search(query="sort", mode="archived"), ["m3"])
+        self.assertEqual(sorted(self.search(query="sort", topic="code")), ["m1", "m2"])
+        self.assertEqual(self.search(query="sort", start_date=date(2024, 2, 1), end_date=date(2024, 2, 1)), ["m2"])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.connection.execute("UPDATE chat_messages SET content = 'Boil the lentils' WHERE message_id = 'm3'")
+        self.connection.execute("DELETE FROM chat_sessions WHERE session_id = 's1'")
+        self.connection.commit()
+
+        self.assertEqual(self.search(query="sort"), [])
+        self.assertEqual(self.search(query="boil"), ["m3"])
+
+    def test_matches_beyond_the_candidates_are_reported(self):
+        self.assertEqual(self.search_with_flag(query="sort", max_candidates=2), (["m3", "m2"], True))
+        self.assertFalse(self.search_with_flag(query="sort", max_candidates=3)[1])
+        self.assertFalse(self.search_with_flag(query="sort", max_candidates=2, topic="code")[1])
+
+    def test_snippet_escapes_stored_html(self):
+        self.connection.execute(
+            "INSERT INTO chat_messages (session_id, message_id, role, content, created_at) VALUES "
+            "('s1', 'm4', 'USER', 'Render <img src=x onerror=alert(1)> & sort \"quoted\" rows', "
+            "'2024-04-01 10:00:00.000000')"
+        )
+        self.connection.commit()
+
+        async def scenario():
+            engine = create_async_sqlite_engine(f"sqlite+aiosqlite:///{self.path}", get_profile())
+            async with async_sessionmaker(engine)() as db:
+                results, _ = await search_messages(db, ContextSearchRequest(query="onerror"))
+            await engine.dispose()
+            return results
+
+        self.assertEqual(
+            asyncio.run(scenario())[0]["snippet"],
+            "Render &lt;img src=x <mark>onerror</mark>=alert(1)&gt; &amp; sort &quot;quoted&quot; rows"
+        )
+        self.assertEqual(highlight("a \ue000<b>\ue001"), "a <mark>&lt;b&gt;</mark>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+from unittest.mock import patch
+
+from app.enums.topic import ETopic
+from app.models.chat_model import ChatMessageResponse
+from app.services.cache.semantic_cache import SemanticCache
+from app.services.document_processing import embeddings as embeddings_module
+from app.services.llm_registry import LLMClientRegistry
+
+# Stub embeddings: paraphrases point in nearly the same direction, unrelated prompts are orthogonal
+EMBEDDINGS = {
+    "what is recursion?": [1.0, 0.0, 0.0],
+    "explain recursion": [0.96, 0.28, 0.0],
+    "how do i sort a list?": [0.0, 1.0, 0.0],
+    "what is a closure?": [0.0, 0.0, 1.0],
+    "weather today": [0.6, 0.8, 0.0],
+}
+
+
+def embed(text: str):
+    if text == "offline":
+        raise RuntimeError("embedding backend offline")
+    return EMBEDDINGS[text]
+
+
+class TestSemanticCache(unittest.TestCase):
+    """
+    Test suite for the embedding-similarity `SemanticCache`, with a stubbed embedding function.
+    """
+
+    def setUp(self):
+        self.cache = SemanticCache(threshold=0.9, max_entries=3, embed=embed)
+        self.scope = SemanticCache.make_scope("local", "llama3.2", ETopic.GENERAL, [])
+
+    def store(self, prompt: str, scope=None):
+        self.cache.store(scope or self.scope, prompt, self.cache.embed(prompt), [f"answer to {prompt}"])
+
+    def lookup(self, prompt: str, scope=None):
+        return self.cache.lookup(scope or self.scope, self.cache.embed(prompt))
+
+    def test_paraphrase_hits_and_unrelated_prompt_misses(self):
+        self.store("what is recursion?")
+
+        self.assertEqual(self.lookup("explain recursion"), ["answer to what is recursion?"])
+        # Cosine similarity 0.6, below the threshold
+        self.assertIsNone(self.lookup("weather today"))
+        self.assertEqual((self.cache.stats()["hits"], self.cache.stats()["misses"]), (1, 1))
+
+    def test_scopes_are_isolated(self):
+        history = [ChatMessageResponse(message_id="1", role="user", content="Let's talk about Python")]
+        follow_up = SemanticCache.make_scope("local", "llama3.2", ETopic.GENERAL, history)
+        other_model = SemanticCache.make_scope("openai", "gpt-4o", ETopic.GENERAL, [])
+        self.store("what is recursion?")
+
+        self.assertIsNone(self.lookup("what is recursion?", scope=follow_up))
+        self.assertIsNone(self.lookup("what is recursion?", scope=other_model))
+        self.assertEqual(self.cache.stats()["scopes"], 1)
+
+    def test_generation_parameters_are_part_of_the_scope(self):
+        warm = SemanticCache.make_scope("local", "llama3.2", ETopic.GENERAL, [], {"temperature": 1.2})
+        self.store("what is recursion?")
+
+        self.assertIsNone(self.lookup("what is recursion?", scope=warm))
+        self.assertEqual(SemanticCache.make_scope("local", "llama3.2", ETopic.GENERAL, [], {"temperature": None}),
+                         self.scope)
+
+    def test_default_embedding_client_is_reused(self):
+        with patch.object(embeddings_module, "llm_registry", LLMClientRegistry()), \
+                patch.object(embeddings_module, "OllamaEmbeddings") as client_class:
+            client_class.return_value.embed_query.side_effect = lambda text: EMBEDDINGS[text]
+            cache = SemanticCache()
+            first = cache.embed("what is recursion?")
+            second = cache.embed("explain recursion")
+
+        self.assertEqual(client_class.call_count, 1)
+        self.assertGreater(float(first @ second), 0.9)
+
+    def test_eviction_keeps_index_rows_consistent(self):
+        for prompt in ("what is recursion?", "how do i sort a list?", "what is a closure?"):
+            self.store(prompt)
+        # The oldest entry goes, and the last row of the matrix is swapped into its slot
+        self.store("weather today")
+        index = self.cache._scopes[self.scope]
+
+        self.assertIsNone(self.lookup("what is recursion?"))
+        for prompt in ("how do i sort a list?", "what is a closure?", "weather today"):
+            self.assertEqual(self.lookup(prompt), [f"answer to {prompt}"])
+        self.assertEqual({entry_id: row for row, entry_id in enumerate(index.ids)}, index.rows)
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        for prompt in ("what is recursion?", "how do i sort a list?", "what is a closure?"):
+            self.store(prompt)
+        self.lookup("what is recursion?")
+        self.store("weather today")
+
+        self.assertEqual(self.cache.stats()["entries"], 3)
+        self.assertEqual(self.lookup("what is recursion?"), ["answer to what is recursion?"])
+        self.assertIsNone(self.lookup("how do i sort a list?"))
+
+    def test_last_entry_of_a_scope_drops_the_scope(self):
+        cache = SemanticCache(threshold=0.9, max_entries=1, embed=embed)
+        other = SemanticCache.make_scope("openai", "gpt-4o", ETopic.GENERAL, [])
+        cache.store(self.scope, "what is recursion?", cache.embed("what is recursion?"), ["a"])
+        cache.store(other, "what is a closure?", cache.embed("what is a closure?"), ["b"])
+
+        self.assertEqual(list(cache._scopes), [other])
+
+    def test_embedding_failure_skips_the_cache(self):
+        self.assertIsNone(self.cache.embed("offline"))
+        self.assertEqual(self.cache.stats()["embedding_errors"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database.engine_profiles import create_async_sqlite_engine, get_profile
+from app.database.migrations import migrate
+from app.database.schema import ChatMessage, ChatSession, ChatSessionSummary, Document
+from app.enums.chat import EBulkSessionAction
+from app.services.session_bulk import apply_bulk_action
+
+
+class TestBulkSessionActions(unittest.TestCase):
+    """
+    Test suite for the set-based `apply_bulk_action` on chat sessions.
+    """
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        migrate(f"sqlite:///{self.path}")
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def run_scenario(self, action, **filters):
+        async def scenario():
+            engine = create_async_sqlite_engine(f"sqlite+aiosqlite:///{self.path}", get_profile())
+            async with async_sessionmaker(engine)() as db:
+                for index, created_at in enumerate([datetime(2024, 1, 1), datetime(2024, 6, 1), datetime(2025, 1, 1)]):
+                    session = ChatSession(session_name=f"Chat {index}", session_id=f"s{index}", created_at=created_at)
+                    db.add(session)
+                    await db.flush()
+                    await db.execute(insert(ChatMessage).values(
+                        session_id=f"s{index}", message_id=f"m{index}", role="user", content=f"hello {index}"
+                    ))
+                    await db.execute(insert(Document).values(session_id=session.id, file_path=f"doc{index}.pdf", embedding=b""))
+                    await db.execute(insert(ChatSessionSummary).values(
+                        session_id=f"s{index}", summary="summary", covered_messages=1
+                    ))
+                await db.commit()
+
+                changed = await apply_bulk_action(db, action, **filters)
+                await db.commit()
+                sessions = (await db.execute(
+                    select(ChatSession.session_id, ChatSession.archived, ChatSession.version).order_by(ChatSession.id)
+                )).all()
+                counts = [
+                    await db.scalar(select(func.count()).select_from(table))
+                    for table in (ChatMessage, Document, ChatSessionSummary)
+                ]
+                indexed = await db.scalar(text("SELECT count(*) FROM chat_messages_fts WHERE chat_messages_fts MATCH 'hello'"))
+            await engine.dispose()
+            return changed, sessions, counts, indexed
+
+        return asyncio.run(scenario())
+
+    def test_delete_cascades_to_messages_documents_and_summaries(self):
+        changed, sessions, counts, indexed = self.run_scenario(
+            EBulkSessionAction.DELETE, before=datetime(2024, 12, 1)
+        )
+
+        self.assertEqual(sorted(changed), ["s0", "s1"])
+        self.assertEqual([session.session_id for session in sessions], ["s2"])
+        self.assertEqual(counts, [1, 1, 1])
+        self.assertEqual(indexed, 1)
+
+    def test_archive_only_changes_matching_sessions(self):
+        changed, sessions, _, _ = self.run_scenario(EBulkSessionAction.ARCHIVE, session_ids=["s1", "s2", "missing"])
+
+        self.assertEqual(sorted(changed), ["s1", "s2"])
+        self.assertEqual([(s.archived, s.version) for s in sessions], [(False, 0), (True, 1), (True, 1)])
+
+    def test_a_filter_is_required(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(apply_bulk_action(None, EBulkSessionAction.DELETE))
+
+
+if __name__ == "__main__":
+    unittest.main()
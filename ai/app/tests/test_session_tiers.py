@@ -0,0 +1,121 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import func, insert, select, text, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database.cold_storage import COLD, ColdStorage
+from app.database.engine_profiles import create_async_sqlite_engine, get_profile
+from app.database.migrations import migrate
+from app.database.schema import ChatMessage, ChatSession, Document, DocumentChunk
+from app.models.request import ContextSearchRequest
+from app.services.search import search_messages
+from app.services.session_tiers import SessionTiering
+
+
+class TestSessionTiering(unittest.TestCase):
+    """
+    Test suite for moving archived chat sessions between the main and the cold file.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "hot.db")
+        migrate(f"sqlite:///{self.path}")
+        self.cold = ColdStorage(os.path.join(self.directory.name, "cold.db"))
+        self.cold.create()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_archived_sessions_move_to_cold_and_back(self):
+        async def scenario():
+            engine = create_async_sqlite_engine(f"sqlite+aiosqlite:///{self.path}", get_profile())
+            self.cold.attach_on_connect(engine.sync_engine)
+            tiers = SessionTiering()
+            async with async_sessionmaker(engine)() as db:
+                for index in range(2):
+                    session = ChatSession(session_name=f"Chat {index}", session_id=f"s{index}", archived=index == 1)
+                    db.add(session)
+                    await db.flush()
+                    await db.execute(insert(ChatMessage).values(
+                        session_id=f"s{index}", message_id=f"m{index}", role="user", content=f"walrus {index}"
+                    ))
+                    document = await db.execute(insert(Document).values(session_id=session.id, file_path="a.pdf"))
+                    await db.execute(insert(DocumentChunk).values(
+                        document_id=document.inserted_primary_key[0], chunk_index=0, model="nomic-embed-text",
+                        dimension=1, embedding=b"\x00\x00\x80?"
+                    ))
+                await db.commit()
+
+                moved = await tiers.rebalance(db)
+                await db.commit()
+                hot = list(await db.scalars(select(ChatSession.session_id)))
+                cold = list(await db.scalars(select(ChatSession.session_id), execution_options=self.cold.options))
+                found, _ = await search_messages(db, ContextSearchRequest(query="walrus"), schemas=("main", COLD))
+
+                await db.execute(update(self.cold.sessions).values(archived=False))
+                await tiers.rebalance(db)
+                await db.commit()
+                documents = await db.scalar(text(
+                    "SELECT count(*) FROM document_chunks c JOIN documents d ON d.id = c.document_id "
+                    "JOIN chat_sessions s ON s.id = d.session_id WHERE s.session_id = 's1'"
+                ))
+                left = await db.scalar(select(func.count()).select_from(ChatMessage), execution_options=self.cold.options)
+            await engine.dispose()
+            return moved, hot, cold, found, documents, left
+
+        moved, hot, cold, found, documents, left = asyncio.run(scenario())
+
+        self.assertEqual(moved, 1)
+        self.assertEqual((hot, cold), (["s0"], ["s1"]))
+        self.assertEqual(sorted(result["session_id"] for result in found), ["s0", "s1"])
+        self.assertEqual(documents, 1)
+        self.assertEqual(left, 0)
+
+    def test_move_interrupted_before_the_delete_runs_again_without_duplicates(self):
+        async def scenario():
+            engine = create_async_sqlite_engine(f"sqlite+aiosqlite:///{self.path}", get_profile())
+            self.cold.attach_on_connect(engine.sync_engine)
+            tiers = SessionTiering()
+            async with async_sessionmaker(engine)() as db:
+                session = ChatSession(session_name="Chat", session_id="s1", archived=True)
+                db.add(session)
+                await db.flush()
+                await db.execute(insert(ChatMessage).values(
+                    session_id="s1", message_id="m1", role="user", content="walrus"
+                ))
+                for file_path in ("a.pdf", "b.pdf"):
+                    document = await db.execute(insert(Document).values(session_id=session.id, file_path=file_path))
+                    await db.execute(insert(DocumentChunk).values(
+                        document_id=document.inserted_primary_key[0], chunk_index=0, model="nomic-embed-text",
+                        dimension=1, embedding=b"\x00\x00\x80?"
+                    ))
+                await db.commit()
+
+                # The copy reaches the cold file but the delete from the main one is lost, as after a crash
+                await db.execute(text(
+                    "CREATE TEMP TRIGGER keep_sessions BEFORE DELETE ON main.chat_sessions "
+                    "BEGIN SELECT RAISE(IGNORE); END"
+                ))
+                await tiers.demote_archived(db)
+                await db.execute(text("DROP TRIGGER temp.keep_sessions"))
+                await db.commit()
+                await tiers.demote_archived(db)
+                await db.commit()
+
+                counts = [
+                    await db.scalar(text(f"SELECT count(*) FROM {schema}.{table}"))
+                    for schema in ("main", COLD) for table in ("chat_sessions", "chat_messages", "documents",
+                                                               "document_chunks")
+                ]
+            await engine.dispose()
+            return counts
+
+        self.assertEqual(asyncio.run(scenario()), [0, 0, 0, 0, 1, 1, 2, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+from app.services.session_versions import SessionVersionCache, etag_matches, make_etag
+
+
+class TestSessionVersionCache(unittest.TestCase):
+    """
+    Test suite for the `SessionVersionCache` behind conversation ETags.
+    """
+
+    def test_invalidation_drops_version(self):
+        cache = SessionVersionCache(max_sessions=4)
+        cache.set("a", 3, cache.generation)
+        self.assertEqual(cache.get("a"), 3)
+
+        cache.invalidate(["a"])
+        self.assertIsNone(cache.get("a"))
+
+    def test_stale_read_is_not_cached(self):
+        cache = SessionVersionCache(max_sessions=4)
+        generation = cache.generation  # A reader starts loading "a"
+        cache.invalidate(["a"])  # A writer bumps "a" meanwhile
+        cache.set("a", 3, generation)
+
+        self.assertIsNone(cache.get("a"))
+
+    def test_etag_depends_on_version_and_window(self):
+        etag = make_etag("a", 1, 50, None)
+
+        self.assertTrue(etag_matches(f'W/{etag}, "other"', etag))
+        self.assertFalse(etag_matches(etag, make_etag("a", 2, 50, None)))
+        self.assertFalse(etag_matches(etag, make_etag("a", 1, 50, "m1")))
+
+
+if __name__ == "__main__":
+    unittest.main()
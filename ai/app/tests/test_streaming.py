@@ -0,0 +1,75 @@
+import asyncio
+import unittest
+
+from app.services.streaming import stream_stats, stream_until_disconnect
+
+
+class FakeRequest:
+    """
+    Stands in for a Starlette request whose client goes away once `disconnected` is set.
+    """
+
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self) -> bool:
+        return self.disconnected
+
+
+class TestStreamUntilDisconnect(unittest.TestCase):
+    """
+    Test suite for relaying generated chunks until the client disconnects.
+    """
+
+    def setUp(self):
+        self.events = []
+
+    async def producer(self, cleanup_error: Exception = None):
+        try:
+            yield "first"
+            await asyncio.Event().wait()  # A long generation with no output yet
+            yield "never"
+        except asyncio.CancelledError:
+            self.events.append("cancelled")
+            if cleanup_error is not None:
+                raise cleanup_error
+            raise
+        finally:
+            self.events.append("closed")
+
+    async def relay(self, request: FakeRequest, chunks):
+        received = []
+        async for chunk in stream_until_disconnect(request, chunks, poll_interval=0.01):
+            received.append(chunk)
+            request.disconnected = True
+        return received
+
+    def test_disconnect_cancels_the_producer(self):
+        cancelled = stream_stats.cancelled
+
+        received = asyncio.run(asyncio.wait_for(self.relay(FakeRequest(), self.producer()), timeout=5))
+
+        self.assertEqual(received, ["first"])
+        self.assertEqual(self.events, ["cancelled", "closed"])
+        self.assertEqual(stream_stats.cancelled, cancelled + 1)
+        self.assertEqual(stream_stats.active, 0)
+
+    def test_producer_errors_are_not_swallowed(self):
+        async def failing():
+            yield "first"
+            raise ValueError("provider error")
+
+        failed = stream_stats.failed
+        with self.assertRaises(ValueError):
+            asyncio.run(self.relay(FakeRequest(), failing()))
+        self.assertEqual(stream_stats.failed, failed + 1)
+
+        # An error raised by the producer while it is being cancelled reaches the caller too
+        with self.assertRaises(RuntimeError):
+            asyncio.run(asyncio.wait_for(
+                self.relay(FakeRequest(), self.producer(cleanup_error=RuntimeError("cleanup failed"))), timeout=5
+            ))
+
+
+if __name__ == "__main__":
+    unittest.main()
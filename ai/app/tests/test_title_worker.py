@@ -0,0 +1,152 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database.cold_storage import ColdStorage
+from app.database.engine_profiles import create_async_sqlite_engine, get_profile
+from app.database.migrations import migrate
+from app.database.schema import ChatSession
+from app.enums.chat import ETitleJobStatus
+from app.models.chat_model import ChatMessageResponse
+from app.services import title_worker as title_worker_module
+from app.services.title_worker import TitleJobQueue, _save_title
+
+
+def make_messages(text: str):
+    return [ChatMessageResponse(message_id=text, role="user", content=text)]
+
+
+class TestTitleJobQueue(unittest.TestCase):
+    """
+    Test suite for the background `TitleJobQueue`, with the LLM and the database stubbed out.
+    """
+
+    def setUp(self):
+        self.saved = {}
+        self.queue = TitleJobQueue(batch_size=4, history_size=8)
+
+    async def submit_write(self, operation):
+        return await operation(None)
+
+    async def save_title(self, db, session_id, title):
+        if session_id == "deleted":
+            raise ValueError(f"Chat session {session_id} not found.")
+        self.saved[session_id] = title
+
+    def run_queue(self, generate_title=None, generate_titles=None):
+        generate_title = generate_title or AsyncMock(side_effect=lambda model, variant, key, messages: messages[0].content)
+        generate_titles = generate_titles or AsyncMock(
+            side_effect=lambda model, variant, key, histories: [history[0].content for history in histories]
+        )
+
+        async def scenario():
+            self.queue.start()
+            while self.queue.stats()["pending"] or any(
+                job.status == ETitleJobStatus.RUNNING for job in self.queue._jobs.values()
+            ):
+                await asyncio.sleep(0.01)
+            await self.queue.stop()
+
+        with patch.object(title_worker_module.db_writer, "submit", self.submit_write), \
+                patch.object(title_worker_module, "_save_title", self.save_title), \
+                patch.object(title_worker_module.AIService, "generate_title", generate_title), \
+                patch.object(title_worker_module.AIService, "generate_titles", generate_titles):
+            asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+        return generate_title, generate_titles
+
+    def test_pending_session_is_submitted_once(self):
+        first = self.queue.submit("s1", "ollama", "llama3.2", None, make_messages("first"))
+        again = self.queue.submit("s1", "ollama", "llama3.2", None, make_messages("second"))
+
+        self.assertIs(first, again)
+        self.assertEqual(first.status, ETitleJobStatus.PENDING)
+        self.assertEqual(first.messages, make_messages("second"))
+        self.assertEqual(self.queue.stats()["pending"], 1)
+
+    def test_sessions_of_one_model_share_a_call(self):
+        for session_id in ("a", "b", "c"):
+            self.queue.submit(session_id, "ollama", "llama3.2", None, make_messages(f"title {session_id}"))
+        self.queue.submit("d", "openai", "gpt-4o", "key", make_messages("title d"))
+
+        generate_title, generate_titles = self.run_queue()
+
+        generate_titles.assert_awaited_once()
+        self.assertEqual(len(generate_titles.await_args.args[3]), 3)
+        generate_title.assert_awaited_once()
+        self.assertEqual(self.saved, {session_id: f"title {session_id}" for session_id in "abcd"})
+        self.assertEqual(self.queue.stats()["batched_calls"], 1)
+
+    def test_job_status_lifecycle(self):
+        done = self.queue.submit("s1", "ollama", "llama3.2", None, make_messages("title"))
+        lost = self.queue.submit("deleted", "ollama", "llama3.2", None, make_messages("title"))
+        self.run_queue()
+        self.queue.submit("broken", "ollama", "llama3.2", None, make_messages("title"))
+        self.run_queue(generate_title=AsyncMock(side_effect=RuntimeError("model offline")))
+
+        self.assertEqual((done.status, done.title, done.messages), (ETitleJobStatus.DONE, "title", []))
+        self.assertEqual(lost.status, ETitleJobStatus.FAILED)
+        self.assertEqual(self.queue.status("broken").status, ETitleJobStatus.FAILED)
+        self.assertEqual(self.queue.status("broken").error, "model offline")
+
+    def test_history_forgets_finished_jobs_only(self):
+        self.queue.history_size = 2
+        self.queue.submit("queued", "ollama", "llama3.2", None, make_messages("title"))
+        finished = self.queue.submit("finished", "ollama", "llama3.2", None, make_messages("title"))
+        del self.queue._pending["finished"]
+        self.queue._finish(finished, title="title")
+        self.queue.submit("new", "ollama", "llama3.2", None, make_messages("title"))
+
+        self.assertEqual(list(self.queue._jobs), ["queued", "new"])
+
+
+class TestSaveTitle(unittest.TestCase):
+    """
+    Test suite for storing generated titles in the tier of their session.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "hot.db")
+        migrate(f"sqlite:///{self.path}")
+        self.cold = ColdStorage(os.path.join(self.directory.name, "cold.db"))
+        self.cold.create()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_title_is_saved_in_either_tier(self):
+        async def scenario():
+            engine = create_async_sqlite_engine(f"sqlite+aiosqlite:///{self.path}", get_profile())
+            self.cold.attach_on_connect(engine.sync_engine)
+            async with async_sessionmaker(engine)() as db:
+                await db.execute(insert(ChatSession).values(session_id="hot", session_name="New chat"))
+                await db.execute(
+                    insert(ChatSession).values(session_id="cold", session_name="New chat", archived=True),
+                    execution_options=self.cold.options
+                )
+                await _save_title(db, "hot", "Hot title")
+                await _save_title(db, "cold", "Cold title")
+                with self.assertRaises(ValueError):
+                    await _save_title(db, "deleted", "Lost title")
+                await db.commit()
+
+                hot = (await db.execute(select(ChatSession.session_name, ChatSession.version))).all()
+                cold = (await db.execute(
+                    select(ChatSession.session_name, ChatSession.version), execution_options=self.cold.options
+                )).all()
+            await engine.dispose()
+            return hot, cold
+
+        hot, cold = asyncio.run(scenario())
+
+        self.assertEqual(hot, [("Hot title", 1)])
+        self.assertEqual(cold, [("Cold title", 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -38,6 +38,8 @@ def build_prompt_from_messages(
     # Add a topic-specific message if provided
     if topic == ETopic.TITLE:
         base_messages.insert(0, ("system", f"Create a concise, 3-4 word title that accurately summarizes the following conversation"))
+    elif topic == ETopic.SUMMARIZE:
+        base_messages.insert(0, ("system", "Summarise the following conversation concisely, keeping key facts, decisions and open questions"))
     elif topic:
         base_messages.insert(0, ("system", f"This is a {topic.value} related conversation."))
 
@@ -0,0 +1,30 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(created_at: datetime, row_id: int, tier: int = 0) -> str:
+    """
+    Opaque token for the keyset position just after the row `(created_at, row_id)` of the storage tier numbered
+    `tier`, row IDs being numbered per tier.
+    """
+    payload = json.dumps([created_at.isoformat(), row_id, tier], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int, int]:
+    """
+    Position encoded in a cursor token. Tokens from before tiers were numbered point into the first one.
+
+    Raises:
+        ValueError: If the token was not produced by `encode_cursor`.
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id, *tier = json.loads(payload)
+        if len(tier) > 1:
+            raise ValueError("too many values")
+        return datetime.fromisoformat(created_at), int(row_id), int(tier[0]) if tier else 0
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor.") from e
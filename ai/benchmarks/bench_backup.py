@@ -0,0 +1,147 @@
+"""
+Backup benchmark: cost of full and incremental backups, and write latency of the app while a full backup runs.
+
+Fills a temporary database with `--sessions` sessions of `--session-size` messages each, then keeps one client
+registering chats through `db_writer` and reports:
+
+* p50/p99 write latency with no backup running, and while a full backup copies the files page by page
+* duration, throughput and compressed size of the full backup
+* the same for an incremental backup after `--changed` sessions got a new message
+
+Usage:
+    python -m benchmarks.bench_backup --sessions 20000 --changed 200
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+os.chdir(tempfile.mkdtemp(prefix="bench-backup-"))  # Before the app opens its database file
+
+from app.database.compression import register_sql_functions
+from app.database.db import async_engine, async_write_engine, engine, init_database
+from app.database.schema import BackupConfiguration
+from app.enums.backup import EBackupKind
+from app.models.chat_model import ChatMessageResponse
+from app.models.request import ChatRegister
+from app.services.backup import backup_engine
+from app.services.db_writer import db_writer
+from app.services.ingestion import ingest_chats
+
+WORDS = (
+    "the a to of and in that is for it with as on be this are by or not you can we an use function value "
+    "return list dictionary key error file data request response server client model query table index"
+).split()
+
+
+def fill(sessions: int, session_size: int) -> None:
+    rng = random.Random(13)
+    started = datetime(2024, 1, 1)
+    connection = sqlite3.connect("focal_first_ai.db")
+    register_sql_functions(connection)
+    connection.executemany(
+        "INSERT INTO chat_sessions (session_name, session_id, archived, favorite, created_at, version) "
+        "VALUES (?, ?, 0, 0, ?, 0)",
+        ((f"Session {index}", f"s{index}", (started + timedelta(minutes=index)).strftime("%Y-%m-%d %H:%M:%S.%f"))
+         for index in range(sessions))
+    )
+    connection.executemany(
+        "INSERT INTO chat_messages (session_id, message_id, role, content, created_at) VALUES (?, ?, ?, ?, ?)",
+        (
+            (
+                f"s{index // session_size}", f"m{index}", "USER" if index % 2 == 0 else "ASSISTANT",
+                " ".join(rng.choices(WORDS, k=rng.randint(10, 120))),
+                (started + timedelta(seconds=index)).strftime("%Y-%m-%d %H:%M:%S.%f"),
+            )
+            for index in range(sessions * session_size)
+        )
+    )
+    connection.commit()
+    connection.close()
+
+
+def register(session_id: str) -> ChatRegister:
+    return ChatRegister(
+        session_id=session_id, session_name="Benchmark", model="local", variant="bench",
+        messages=[ChatMessageResponse(message_id=uuid.uuid4().hex, role="user", content="one more message")],
+    )
+
+
+async def write_until(done: asyncio.Event, latencies: List[float]) -> None:
+    while not done.is_set():
+        chat = register(uuid.uuid4().hex)
+        started = time.perf_counter()
+        await db_writer.submit(lambda db: ingest_chats(db, [chat]))
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.005)
+
+
+def percentiles(latencies: List[float]) -> Tuple[float, float]:
+    latencies = sorted(latencies)
+    return statistics.median(latencies), latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+
+
+async def create_configuration(db) -> int:
+    configuration = BackupConfiguration(schedule_frequency="daily", enabled_service="local", target_directory="backups")
+    db.add(configuration)
+    await db.flush()
+    return configuration.id
+
+
+async def scenario(changed: int, sessions: int, idle_seconds: float) -> None:
+    db_writer.start()
+    configuration_id = await db_writer.submit(create_configuration)
+
+    done, idle = asyncio.Event(), []
+    writer = asyncio.create_task(write_until(done, idle))
+    await asyncio.sleep(idle_seconds)
+    done.set()
+    await writer
+
+    done, during = asyncio.Event(), []
+    writer = asyncio.create_task(write_until(done, during))
+    full = await backup_engine.run(configuration_id, EBackupKind.FULL)
+    done.set()
+    await writer
+
+    for session_id in random.Random(7).sample(range(sessions), changed):
+        chat = register(f"s{session_id}")
+        await db_writer.submit(lambda db: ingest_chats(db, [chat]))
+    incremental = await backup_engine.run(configuration_id, EBackupKind.INCREMENTAL)
+    await db_writer.stop()
+
+    for name, latencies in (("no backup", idle), ("full backup", during)):
+        p50, p99 = percentiles(latencies)
+        print(f"  writes, {name:12} p50 {p50:6.2f} ms  p99 {p99:6.2f} ms  ({len(latencies)} writes)")
+    for backup in (full, incremental):
+        print(f"  {backup.kind:11} backup {backup.duration:6.2f} s  {backup.source_bytes / 2**20:8.1f} MiB read  "
+              f"{backup.throughput / 2**20:7.1f} MiB/s  {backup.size_bytes / 2**20:7.2f} MiB written  "
+              f"{backup.sessions} sessions")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20_000)
+    parser.add_argument("--session-size", type=int, default=20)
+    parser.add_argument("--changed", type=int, default=200, help="Sessions changed between the two backups")
+    parser.add_argument("--idle-seconds", type=float, default=3.0, help="Writes measured without a backup")
+    args = parser.parse_args()
+
+    # Keep SQL logging out of the timings
+    engine.echo = async_engine.echo = async_write_engine.echo = False
+    init_database()
+
+    fill(args.sessions, args.session_size)
+    print(f"{args.sessions} sessions x {args.session_size} messages, {args.changed} changed between the backups")
+    asyncio.run(scenario(args.changed, args.sessions, args.idle_seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Message compression benchmark: database size and read cost before and after compressing stored messages.
+
+Fills a temporary database with `--messages` plain-text chat messages, a mix of short user questions and long
+assistant answers made of prose and code, in sessions of `--session-size`. Then runs the background
+`MessageCompressor` (dictionary training and compression of the stored bodies) and reports:
+
+* the file size before and after, both after VACUUM
+* how long loading whole conversations takes on plain and on compressed bodies
+* that a search returns the same messages as before
+
+Usage:
+    python -m benchmarks.bench_compression --messages 50000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+os.chdir(tempfile.mkdtemp(prefix="bench-compression-"))  # Before the app opens its database file
+
+from sqlalchemy import select
+
+from app.database.compression import register_sql_functions
+from app.database.db import AsyncSessionLocal, async_engine, async_write_engine, engine, init_database
+from app.database.schema import ChatMessage
+from app.models.request import ContextSearchRequest
+from app.services.db_writer import db_writer
+from app.services.message_compression import message_compressor
+from app.services.search import search_messages
+
+WORDS = (
+    "the a to of and in that is for it with as on be this are by or not you can we an use function value "
+    "return list dictionary key error file data request response server client model query table index "
+    "python javascript async await import class method string number object array config cache session"
+).split()
+IDENTIFIERS = ["user", "items", "result", "payload", "config", "session", "rows", "cursor", "handler", "index"]
+CODE_LINES = [
+    "def {a}({b}, {c}=None):",
+    "    {a} = {b}.get('{c}', [])",
+    "    for {a} in {b}:",
+    "        if not {a}:",
+    "            raise ValueError(f'missing {{{a}}}')",
+    "    return {{'{a}': {b}, '{c}': len({b})}}",
+    "const {a} = await fetch(`/api/{b}/${{{c}}}`);",
+    "    {a}.append({b}[{c}])",
+    "import {a} from './{b}';",
+    "SELECT {a}, {b} FROM {c} WHERE {a} = ? ORDER BY {b};",
+]
+
+
+def sentence(rng: random.Random) -> str:
+    words = rng.choices(WORDS, k=rng.randint(6, 18))
+    return " ".join(words).capitalize() + "."
+
+
+def answer(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.randint(2, 8)):
+        if rng.random() < 0.5:
+            parts.append(" ".join(sentence(rng) for _ in range(rng.randint(2, 6))))
+        else:
+            lines = [
+                rng.choice(CODE_LINES).format(a=rng.choice(IDENTIFIERS), b=rng.choice(IDENTIFIERS), c=rng.choice(IDENTIFIERS))
+                for _ in range(rng.randint(4, 30))
+            ]
+            parts.append("```python\n" + "\n".join(lines) + "\n```")
+    return "\n\n".join(parts)
+
+
+def fill(messages: int, session_size: int) -> None:
+    rng = random.Random(3)
+    started = datetime(2024, 1, 1)
+    connection = sqlite3.connect("focal_first_ai.db")
+    register_sql_functions(connection)
+    sessions = messages // session_size + 1
+    connection.executemany(
+        "INSERT INTO chat_sessions (session_name, session_id, archived, favorite, created_at, version) "
+        "VALUES (?, ?, 0, 0, ?, 0)",
+        ((f"Session {index}", f"s{index}", started.strftime("%Y-%m-%d %H:%M:%S.%f")) for index in range(sessions))
+    )
+    connection.executemany(
+        "INSERT INTO chat_messages (session_id, message_id, role, content, created_at) VALUES (?, ?, ?, ?, ?)",
+        (
+            (
+                f"s{index // session_size}", f"m{index}", "USER" if index % 2 == 0 else "ASSISTANT",
+                sentence(rng) if index % 2 == 0 else answer(rng),
+                (started + timedelta(seconds=index)).strftime("%Y-%m-%d %H:%M:%S.%f"),
+            )
+            for index in range(messages)
+        )
+    )
+    connection.commit()
+    connection.close()
+
+
+def file_size() -> int:
+    connection = sqlite3.connect("focal_first_ai.db")
+    connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    connection.execute("VACUUM")
+    connection.close()
+    return os.path.getsize("focal_first_ai.db")
+
+
+async def load_conversations(session_ids: List[str]) -> float:
+    timings = []
+    async with AsyncSessionLocal() as db:
+        for session_id in session_ids:
+            started = time.perf_counter()
+            (await db.scalars(
+                select(ChatMessage.content).where(ChatMessage.session_id == session_id)
+                .order_by(ChatMessage.created_at, ChatMessage.id)
+            )).all()
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def search() -> List[str]:
+    async with AsyncSessionLocal() as db:
+        results = await search_messages(db, ContextSearchRequest(query="dictionary handler"), limit=50)
+    return [result["message_id"] for result in results]
+
+
+async def compress() -> float:
+    db_writer.start()
+    started = time.perf_counter()
+    await message_compressor.train_dictionary()
+    await message_compressor.compress_stored()
+    elapsed = time.perf_counter() - started
+    await db_writer.stop()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=50_000)
+    parser.add_argument("--session-size", type=int, default=40)
+    parser.add_argument("--conversations", type=int, default=200)
+    args = parser.parse_args()
+
+    # Keep SQL logging out of the timings
+    engine.echo = async_engine.echo = async_write_engine.echo = False
+    init_database()
+
+    fill(args.messages, args.session_size)
+    session_ids = [f"s{index}" for index in random.Random(5).sample(range(args.messages // args.session_size), args.conversations)]
+    plain_size = file_size()
+    plain_load = asyncio.run(load_conversations(session_ids))
+    plain_results = asyncio.run(search())
+    asyncio.run(async_engine.dispose())
+
+    elapsed = asyncio.run(compress())
+    asyncio.run(async_engine.dispose())
+    asyncio.run(async_write_engine.dispose())
+    compressed_size = file_size()
+    compressed_load = asyncio.run(load_conversations(session_ids))
+    compressed_results = asyncio.run(search())
+
+    stats = message_compressor.stats()
+    print(f"{args.messages} messages, {stats['compressed_rows']} compressed in {elapsed:.1f} s "
+          f"(dictionary {stats['dictionary_id']})")
+    print(f"  bodies      {stats['bytes_before'] / 2**20:8.1f} MiB -> {stats['bytes_after'] / 2**20:6.1f} MiB "
+          f"({stats['bytes_after'] / max(stats['bytes_before'], 1):.0%})")
+    print(f"  file        {plain_size / 2**20:8.1f} MiB -> {compressed_size / 2**20:6.1f} MiB "
+          f"({compressed_size / plain_size:.0%})")
+    print(f"  load conversation of {args.session_size} messages p50: plain {plain_load:.2f} ms, "
+          f"compressed {compressed_load:.2f} ms")
+    print(f"  search results unchanged: {plain_results == compressed_results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Concurrency benchmark for the `/generate` streaming path.
+
+Runs N parallel generations against a fake LLM that takes `--delay` seconds per chunk and compares:
+
+* sync  - the old route: `AIService.generate_ai_response` iterated inside an `async def` generator
+* async - the new route: `AIService.agenerate_ai_response`, built on `chain.astream`
+
+While the streams run, a heartbeat task measures how late the event loop wakes it up. With the sync path
+the streams serialize and the loop is blocked; with the async path the wall time stays close to a single
+stream and the loop keeps ticking.
+
+Usage:
+    python -m benchmarks.bench_concurrent_streams --streams 8 --chunks 20 --delay 0.02
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+
+from app.models.chat_model import ChatMessageResponse
+from app.services.ai import AIService
+
+
+class SlowStreamingLLM(LLM):
+    """
+    Fake LLM that emits `chunks` tokens, waiting `delay` seconds before each one.
+    """
+    chunks: int = 20
+    delay: float = 0.02
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-streaming-fake"
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> str:
+        return "".join(chunk.text for chunk in self._stream(prompt))
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> Iterator[GenerationChunk]:
+        for index in range(self.chunks):
+            time.sleep(self.delay)  # Blocking socket read
+            yield GenerationChunk(text=f"t{index} ")
+
+    async def _astream(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> AsyncIterator[GenerationChunk]:
+        for index in range(self.chunks):
+            await asyncio.sleep(self.delay)  # Non-blocking socket read
+            yield GenerationChunk(text=f"t{index} ")
+
+
+MESSAGES = [ChatMessageResponse(message_id="bench-1", role="user", content="Say something")]
+
+
+async def consume_sync_path() -> int:
+    async def generate_response():
+        for chunk in AIService.generate_ai_response(model="local", variant="bench", api_key=None, messages=MESSAGES):
+            yield chunk
+
+    return len([chunk async for chunk in generate_response()])
+
+
+async def consume_async_path() -> int:
+    return len([
+        chunk async for chunk in AIService.agenerate_ai_response(
+            model="local", variant="bench", api_key=None, messages=MESSAGES
+        )
+    ])
+
+
+async def heartbeat(stop: asyncio.Event, interval: float, lags: List[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def run(consumer, streams: int) -> dict:
+    stop = asyncio.Event()
+    lags: List[float] = []
+    beat = asyncio.create_task(heartbeat(stop, 0.005, lags))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(consumer() for _ in range(streams)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await beat
+    return {"wall_s": elapsed, "max_loop_lag_ms": max(lags, default=0.0) * 1000}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=8)
+    parser.add_argument("--chunks", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    # Serve every request from the fake LLM instead of a real provider
+    fake_llm = SlowStreamingLLM(chunks=args.chunks, delay=args.delay)
+    AIService._create_llm = staticmethod(lambda *_, **__: fake_llm)
+
+    single_stream = args.chunks * args.delay
+    print(f"{args.streams} parallel streams x {args.chunks} chunks x {args.delay * 1000:.0f} ms "
+          f"(one stream alone: {single_stream:.2f} s)")
+    for name, consumer in (("sync", consume_sync_path), ("async", consume_async_path)):
+        result = asyncio.run(run(consumer, args.streams))
+        print(f"  {name:<5} wall={result['wall_s']:.2f} s  "
+              f"speedup_vs_serial={args.streams * single_stream / result['wall_s']:.1f}x  "
+              f"max_loop_lag={result['max_loop_lag_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+SQLite engine profile benchmark: SQLite's defaults versus the production profile of `engine_profiles`.
+
+For each profile, a fresh database in a temporary directory gets two workloads:
+
+* register - `--clients` clients register `--chats` chats of `--messages` messages each through a `DatabaseWriter`,
+             then a single client registers a tenth as many, so every commit is on its own
+* list     - `--clients` clients page through the session list and open conversations, `--reads` requests in
+             total, while one client keeps registering chats
+
+The benchmark reports throughput and p50/p99 latency of both workloads.
+
+Usage:
+    python -m benchmarks.bench_db_profiles --chats 2000 --reads 4000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from typing import List, Tuple
+
+os.chdir(tempfile.mkdtemp(prefix="bench-profiles-"))  # Before the app opens its database file
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database.engine_profiles import EngineProfile, get_profile, create_async_sqlite_engine
+from app.database.migrations import migrate
+from app.database.schema import ChatMessage, ChatSession
+from app.enums.database import EDatabaseProfile
+from app.models.chat_model import ChatMessageResponse
+from app.models.request import ChatRegister
+from app.services.db_writer import DatabaseWriter
+from app.services.ingestion import ingest_chats
+
+
+def make_register(messages: int) -> ChatRegister:
+    session_id = uuid.uuid4().hex
+    return ChatRegister(
+        session_id=session_id,
+        session_name="Benchmark",
+        model="local",
+        variant="bench",
+        messages=[
+            ChatMessageResponse(message_id=f"{session_id}-{index}", role="user", content=f"message {index} " * 20)
+            for index in range(messages)
+        ],
+    )
+
+
+def summary(latencies: List[float], elapsed: float) -> str:
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    return (
+        f"{len(latencies) / elapsed:8.1f} req/s  p50={statistics.median(latencies) * 1000:7.2f} ms  "
+        f"p99={p99 * 1000:7.2f} ms"
+    )
+
+
+async def register(writer: DatabaseWriter, count: int, messages: int, latencies: List[float]) -> None:
+    for _ in range(count):
+        chat = make_register(messages)
+        started = time.perf_counter()
+        await writer.submit(lambda db: ingest_chats(db, [chat]))
+        latencies.append(time.perf_counter() - started)
+
+
+async def read(sessions: async_sessionmaker, count: int, session_ids: List[str], latencies: List[float]) -> None:
+    rng = random.Random()
+    for _ in range(count):
+        started = time.perf_counter()
+        async with sessions() as db:
+            if rng.random() < 0.5:
+                offset = rng.randrange(max(len(session_ids) - 20, 1))
+                (await db.scalars(
+                    select(ChatSession).order_by(ChatSession.created_at, ChatSession.id).offset(offset).limit(20)
+                )).all()
+            else:
+                (await db.execute(
+                    select(ChatMessage.message_id, ChatMessage.role, ChatMessage.content)
+                    .where(ChatMessage.session_id == rng.choice(session_ids))
+                    .order_by(ChatMessage.created_at, ChatMessage.id)
+                )).all()
+        latencies.append(time.perf_counter() - started)
+
+
+async def run(profile: EngineProfile, args: argparse.Namespace) -> List[Tuple[str, str]]:
+    url = f"{tempfile.mkdtemp(dir='.')}/chat.db"
+    migrate(f"sqlite:///{url}")
+    engine = create_async_sqlite_engine(f"sqlite+aiosqlite:///{url}", profile)
+    write_engine = (
+        create_async_sqlite_engine(f"sqlite+aiosqlite:///{url}", profile, pool_size=1)
+        if profile.dedicated_writer else engine
+    )
+    for bench_engine in {engine, write_engine}:
+        bench_engine.echo = False
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    writer = DatabaseWriter(session_factory=async_sessionmaker(write_engine, class_=AsyncSession, expire_on_commit=False))
+    writer.start()
+
+    latencies: List[float] = []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        register(writer, args.chats // args.clients, args.messages, latencies) for _ in range(args.clients)
+    ))
+    registered = summary(latencies, time.perf_counter() - started)
+
+    latencies = []
+    started = time.perf_counter()
+    await register(writer, args.chats // 10, args.messages, latencies)
+    registered_alone = summary(latencies, time.perf_counter() - started)
+
+    async with sessions() as db:
+        session_ids = list(await db.scalars(select(ChatSession.session_id)))
+    latencies = []
+    background = asyncio.create_task(register(writer, 10 ** 9, args.messages, []))
+    started = time.perf_counter()
+    await asyncio.gather(*(read(sessions, args.reads // args.clients, session_ids, latencies) for _ in range(args.clients)))
+    listed = summary(latencies, time.perf_counter() - started)
+    background.cancel()
+
+    await writer.stop()
+    await engine.dispose()
+    await write_engine.dispose()
+    return [
+        (f"register x{args.clients}", registered), ("register x1", registered_alone), (f"list x{args.clients}", listed)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--chats", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=10)
+    parser.add_argument("--reads", type=int, default=4000)
+    args = parser.parse_args()
+
+    for name in (EDatabaseProfile.DEFAULT, EDatabaseProfile.PRODUCTION):
+        results = asyncio.run(run(get_profile(name), args))
+        print(f"{name}:")
+        for workload, result in results:
+            print(f"  {workload:<12} {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Embedding storage benchmark: packed float32/float16 chunk vectors against lists of Python floats.
+
+Stores `--chunks` random `--dimension`-wide embeddings three ways, spread over documents of `--document-size`
+chunks:
+
+* as JSON arrays, decoded to the `List[List[float]]` that `generate_embeddings` returns
+* as packed float32 rows of `document_chunks`, loaded by `load_document_embeddings`
+* the same as float16
+
+and reports for each the bytes stored per chunk, the Python memory held by the decoded embeddings and the peak
+while loading them (through `tracemalloc`), the time to load and decode every chunk, and the time of a
+brute-force cosine similarity search over them.
+
+Usage:
+    python -m benchmarks.bench_embeddings --chunks 20000 --dimension 768
+"""
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, List, Tuple
+
+os.chdir(tempfile.mkdtemp(prefix="bench-embeddings-"))  # Before the app opens its database file
+
+import numpy as np
+from sqlalchemy import text
+
+from app.database.db import AsyncSessionLocal, async_engine, async_write_engine, engine, init_database
+from app.database.vectors import PackedEmbeddings
+from app.enums.ai import EVectorDType
+from app.services.document_processing.chunk_store import load_document_embeddings
+
+MODELS = {EVectorDType.FLOAT32: "bench-float32", EVectorDType.FLOAT16: "bench-float16"}
+
+
+def fill(vectors: np.ndarray, document_size: int) -> List[int]:
+    connection = sqlite3.connect("focal_first_ai.db")
+    connection.execute("INSERT INTO chat_sessions (session_name, session_id, archived, favorite, created_at, version) "
+                       "VALUES ('Documents', 's1', 0, 0, '2024-01-01 00:00:00.000000', 0)")
+    documents = range(1, (len(vectors) - 1) // document_size + 2)
+    connection.executemany(
+        "INSERT INTO documents (id, session_id, file_path, uploaded_at) VALUES (?, 1, ?, '2024-01-01 00:00:00.000000')",
+        ((document, f"document-{document}.pdf") for document in documents)
+    )
+    connection.execute("CREATE TABLE json_chunks (document_id INTEGER, chunk_index INTEGER, embedding TEXT)")
+    connection.executemany(
+        "INSERT INTO json_chunks VALUES (?, ?, ?)",
+        ((index // document_size + 1, index % document_size, json.dumps(vector)) for index, vector in
+         enumerate(vectors.tolist()))
+    )
+    for dtype, model in MODELS.items():
+        packed = PackedEmbeddings.from_vectors(vectors, model=model, dtype=dtype)
+        connection.executemany(
+            "INSERT INTO document_chunks (document_id, chunk_index, model, dimension, dtype, embedding) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            ((index // document_size + 1, index % document_size, model, packed.dimension, str(dtype), row)
+             for index, row in enumerate(packed.rows()))
+        )
+    connection.commit()
+    connection.close()
+    return list(documents)
+
+
+def stored_bytes(where: str) -> float:
+    connection = sqlite3.connect("focal_first_ai.db")
+    total, count = connection.execute(f"SELECT sum(length(CAST(embedding AS BLOB))), count(*) FROM {where}").fetchone()
+    connection.close()
+    return total / count
+
+
+async def load_lists(document_ids: List[int]) -> List[List[float]]:
+    async with AsyncSessionLocal() as db:
+        rows = await db.execute(text(
+            "SELECT embedding FROM json_chunks WHERE document_id IN (SELECT value FROM json_each(:ids)) "
+            "ORDER BY document_id, chunk_index"
+        ), {"ids": json.dumps(document_ids)})
+        return [json.loads(row[0]) for row in rows]
+
+
+async def load_packed(document_ids: List[int], dtype: EVectorDType) -> np.ndarray:
+    async with AsyncSessionLocal() as db:
+        _, embeddings = await load_document_embeddings(db, document_ids, MODELS[dtype])
+        return embeddings.vectors
+
+
+def search_lists(vectors: List[List[float]], query: List[float]) -> int:
+    norms = [sum(value * value for value in vector) ** 0.5 for vector in vectors]
+    scores = [sum(a * b for a, b in zip(vector, query)) / norm for vector, norm in zip(vectors, norms)]
+    return max(range(len(scores)), key=scores.__getitem__)
+
+
+def search_matrix(vectors: np.ndarray, query: np.ndarray) -> int:
+    # Float16 rows are widened by the product, numpy computes it in float32
+    matrix = vectors.astype(np.float32, copy=False)
+    return int(np.argmax(matrix @ query / np.linalg.norm(matrix, axis=1)))
+
+
+async def measure(load: Callable[[], Awaitable[Any]]) -> Tuple[float, float, float, Any]:
+    """
+    Best load time of three runs, then the memory held by the result and the peak while loading it, in MiB.
+    """
+    elapsed = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        await load()
+        elapsed = min(elapsed, time.perf_counter() - started)
+    tracemalloc.start()
+    result = await load()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, held / 2**20, peak / 2**20, result
+
+
+async def scenario(vectors: np.ndarray, document_ids: List[int]) -> None:
+    query = vectors[0].tolist()
+    runs = [
+        ("lists", "json_chunks", load_lists, lambda loaded: search_lists(loaded, query)),
+        ("float32", "document_chunks WHERE dtype = 'float32'",
+         lambda ids: load_packed(ids, EVectorDType.FLOAT32), lambda loaded: search_matrix(loaded, np.float32(query))),
+        ("float16", "document_chunks WHERE dtype = 'float16'",
+         lambda ids: load_packed(ids, EVectorDType.FLOAT16), lambda loaded: search_matrix(loaded, np.float32(query))),
+    ]
+    for name, where, load, search in runs:
+        elapsed, held, peak, loaded = await measure(lambda: load(document_ids))
+        started = time.perf_counter()
+        best = search(loaded)
+        searched = time.perf_counter() - started
+        assert best == 0
+        print(f"  {name:8} {stored_bytes(where):8.0f} B/chunk stored  held {held:7.1f} MiB  peak {peak:7.1f} MiB  "
+              f"load {elapsed * 1000:8.1f} ms  {len(vectors) / elapsed:9.0f} chunks/s  search {searched * 1000:8.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=20_000)
+    parser.add_argument("--dimension", type=int, default=768, help="768 for nomic-embed-text")
+    parser.add_argument("--document-size", type=int, default=50, help="Chunks per document")
+    args = parser.parse_args()
+
+    # Keep SQL logging out of the timings
+    engine.echo = async_engine.echo = async_write_engine.echo = False
+    init_database()
+
+    vectors = np.random.default_rng(11).standard_normal((args.chunks, args.dimension)).astype(np.float32)
+    document_ids = fill(vectors, args.document_size)
+    print(f"{args.chunks} chunks x {args.dimension} dimensions in {len(document_ids)} documents")
+    asyncio.run(scenario(vectors, document_ids))
+
+
+if __name__ == "__main__":
+    main()
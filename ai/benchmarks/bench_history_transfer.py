@@ -0,0 +1,151 @@
+"""
+Chat history transfer benchmark: throughput and memory of the streaming JSON lines export and import.
+
+Fills a temporary database with `--sessions` sessions of `--session-size` messages each, `--archived` of them
+archived and moved to the cold file, then:
+
+* exports the whole history to a file through `HistoryTransfer.export_history`
+* empties the database and imports the file back through `HistoryTransfer.import_history`, read in 64 KiB
+  chunks as a request body would arrive
+* imports it a second time, where every message is skipped as already stored
+
+and reports MiB/s, rows/s and the peak of Python memory allocated during each run (through `tracemalloc`, in a
+separate run of the same work), which should not grow with the history size.
+
+Usage:
+    python -m benchmarks.bench_history_transfer --sessions 20000 --session-size 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Tuple
+
+os.chdir(tempfile.mkdtemp(prefix="bench-transfer-"))  # Before the app opens its database file
+
+from app.database.compression import register_sql_functions
+from app.database.db import async_engine, async_write_engine, cold_storage, engine, init_database
+from app.services.db_writer import db_writer
+from app.services.history_transfer import history_transfer
+from app.services.session_tiers import session_tiers
+
+WORDS = (
+    "the a to of and in that is for it with as on be this are by or not you can we an use function value "
+    "return list dictionary key error file data request response server client model query table index"
+).split()
+EXPORT_FILE = "history.jsonl"
+
+
+def fill(sessions: int, session_size: int, archived: float) -> None:
+    rng = random.Random(17)
+    started = datetime(2024, 1, 1)
+    connection = sqlite3.connect("focal_first_ai.db")
+    register_sql_functions(connection)
+    connection.executemany(
+        "INSERT INTO chat_sessions (session_name, session_id, archived, favorite, created_at, version) "
+        "VALUES (?, ?, ?, 0, ?, 0)",
+        ((f"Session {index}", f"s{index}", int(rng.random() < archived),
+          (started + timedelta(minutes=index)).strftime("%Y-%m-%d %H:%M:%S.%f")) for index in range(sessions))
+    )
+    connection.executemany(
+        "INSERT INTO chat_messages (session_id, message_id, role, content, created_at) VALUES (?, ?, ?, ?, ?)",
+        (
+            (
+                f"s{index // session_size}", f"m{index}", "USER" if index % 2 == 0 else "ASSISTANT",
+                " ".join(rng.choices(WORDS, k=rng.randint(10, 120))),
+                (started + timedelta(seconds=index)).strftime("%Y-%m-%d %H:%M:%S.%f"),
+            )
+            for index in range(sessions * session_size)
+        )
+    )
+    connection.commit()
+    connection.close()
+
+
+def empty() -> None:
+    for path in ("focal_first_ai.db", cold_storage.path):
+        connection = sqlite3.connect(path)
+        register_sql_functions(connection)  # Of the full-text index triggers
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.execute("DELETE FROM chat_sessions")
+        connection.commit()
+        connection.close()
+
+
+async def export() -> None:
+    with open(EXPORT_FILE, "wb") as file:
+        async for chunk in history_transfer.export_history():
+            file.write(chunk)
+
+
+async def read_chunks():
+    with open(EXPORT_FILE, "rb") as file:
+        while chunk := file.read(64 * 1024):
+            yield chunk
+
+
+async def import_history():
+    return await history_transfer.import_history(read_chunks())
+
+
+async def timed(run: Callable[[], Awaitable[object]]) -> Tuple[float, object]:
+    started = time.perf_counter()
+    result = await run()
+    return time.perf_counter() - started, result
+
+
+async def peak_memory(run: Callable[[], Awaitable[object]]) -> float:
+    tracemalloc.start()
+    await run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+async def scenario(rows: int) -> None:
+    db_writer.start()
+    await db_writer.submit(session_tiers.rebalance)
+
+    elapsed, _ = await timed(export)
+    size = os.path.getsize(EXPORT_FILE)
+    peak = await peak_memory(export)
+    print(f"  export           {elapsed:6.2f} s  {size / 2**20 / elapsed:7.1f} MiB/s  {rows / elapsed:9.0f} rows/s  "
+          f"peak {peak:6.1f} MiB  ({size / 2**20:.1f} MiB)")
+
+    for name, emptied in (("import", True), ("import again", False)):
+        if emptied:
+            empty()
+        elapsed, result = await timed(import_history)
+        if emptied:
+            empty()
+        peak = await peak_memory(import_history)
+        print(f"  {name:16} {elapsed:6.2f} s  {result.throughput / 2**20:7.1f} MiB/s  {rows / elapsed:9.0f} rows/s  "
+              f"peak {peak:6.1f} MiB  ({result.sessions} sessions, {result.messages} messages added, "
+              f"{result.duplicate_messages} skipped)")
+    await db_writer.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20_000)
+    parser.add_argument("--session-size", type=int, default=20)
+    parser.add_argument("--archived", type=float, default=0.5, help="Share of archived sessions")
+    args = parser.parse_args()
+
+    # Keep SQL logging out of the timings
+    engine.echo = async_engine.echo = async_write_engine.echo = False
+    init_database()
+
+    fill(args.sessions, args.session_size, args.archived)
+    rows = args.sessions * (args.session_size + 1)
+    print(f"{args.sessions} sessions x {args.session_size} messages, {args.archived:.0%} archived")
+    asyncio.run(scenario(rows))
+
+
+if __name__ == "__main__":
+    main()
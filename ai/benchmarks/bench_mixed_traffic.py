@@ -0,0 +1,151 @@
+"""
+Mixed traffic benchmark: streamed generations running while chats are registered.
+
+Runs `--streams` parallel generations against a fake LLM together with `--registers` `/register` calls and
+compares two database paths for the register handler:
+
+* sync  - the old handler: sync `Session` queries and commits inside an `async def` route
+* async - the new handler: `register_chat` over `AsyncSession`/aiosqlite
+
+Each register blocks the event loop for the duration of its queries and commits on the sync path, which shows
+up as stalls between the chunks of the concurrent streams. The benchmark reports wall time, the worst gap
+between two chunks of a stream, and the event loop lag.
+
+The database is created in a temporary directory, the app's own database file is not touched.
+
+Usage:
+    python -m benchmarks.bench_mixed_traffic --streams 8 --registers 64 --messages 20
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, List
+
+os.chdir(tempfile.mkdtemp(prefix="bench-mixed-"))  # Before the app opens its database file
+
+from benchmarks.bench_concurrent_streams import SlowStreamingLLM, heartbeat
+from app.database.db import Session, async_engine, engine, init_database
+from app.database.schema import ChatSession, ChatMessage
+from app.models.chat_model import ChatMessageResponse
+from app.models.request import ChatRegister
+from app.routes.chat import register_chat
+from app.services.ai import AIService
+from app.services.generation import stream_chat_response
+from app.services.scheduler import llm_scheduler
+
+PROMPT = [ChatMessageResponse(message_id="bench-prompt", role="user", content="Say something")]
+
+
+def make_register(messages: int) -> ChatRegister:
+    session_id = uuid.uuid4().hex
+    return ChatRegister(
+        session_id=session_id,
+        session_name="Benchmark",
+        model="local",
+        variant="bench",
+        messages=[
+            ChatMessageResponse(message_id=f"{session_id}-{index}", role="user", content=f"message {index}")
+            for index in range(messages)
+        ],
+    )
+
+
+async def register_sync(request: ChatRegister) -> None:
+    """
+    The register handler as it was before the async database layer.
+    """
+    db = Session()
+    try:
+        chat_session = db.query(ChatSession).filter(ChatSession.session_id == request.session_id).first()
+        if not chat_session:
+            db.add(ChatSession(session_name=request.session_name, session_id=request.session_id, created_at=datetime.now()))
+            db.commit()
+        for message in request.messages:
+            existing_message = db.query(ChatMessage).filter(
+                ChatMessage.session_id == request.session_id,
+                ChatMessage.message_id == message.message_id
+            ).first()
+            if not existing_message:
+                db.add(ChatMessage(
+                    session_id=request.session_id,
+                    message_id=message.message_id,
+                    content=message.content,
+                    role=message.role,
+                    model=request.model,
+                    variant=request.variant,
+                    created_at=datetime.now(),
+                ))
+        db.commit()
+    finally:
+        db.close()
+
+
+async def register_async(request: ChatRegister) -> None:
+    await register_chat(request)
+
+
+async def stream(gaps: List[float]) -> None:
+    last = None
+    async for _ in stream_chat_response("local", "bench", None, PROMPT, use_cache=False):
+        now = time.perf_counter()
+        if last is not None:
+            gaps.append(now - last)
+        last = now
+
+
+async def run(register: Callable, streams: int, registers: int, messages: int, interval: float) -> dict:
+    stop = asyncio.Event()
+    lags: List[float] = []
+    gaps: List[float] = []
+    beat = asyncio.create_task(heartbeat(stop, 0.005, lags))
+
+    async def register_all():
+        for _ in range(registers):
+            await asyncio.sleep(interval)  # Requests arrive while the streams are running
+            await register(make_register(messages))
+
+    started = time.perf_counter()
+    await asyncio.gather(register_all(), *(stream(gaps) for _ in range(streams)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await beat
+    return {
+        "wall_s": elapsed,
+        "max_chunk_gap_ms": max(gaps, default=0.0) * 1000,
+        "max_loop_lag_ms": max(lags, default=0.0) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=8)
+    parser.add_argument("--registers", type=int, default=64)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.01, help="Seconds between two registers")
+    parser.add_argument("--chunks", type=int, default=100)
+    parser.add_argument("--delay", type=float, default=0.01)
+    args = parser.parse_args()
+
+    # Serve every request from the fake LLM, all streams at once, and keep SQL logging out of the timings
+    fake_llm = SlowStreamingLLM(chunks=args.chunks, delay=args.delay)
+    AIService._create_llm = staticmethod(lambda *_, **__: fake_llm)
+    llm_scheduler.limits["ollama"] = args.streams
+    engine.echo = async_engine.echo = False
+    init_database()
+
+    print(f"{args.streams} streams x {args.chunks} chunks x {args.delay * 1000:.0f} ms, "
+          f"{args.registers} registers x {args.messages} messages")
+    for name, register in (("sync", register_sync), ("async", register_async)):
+        result = asyncio.run(run(register, args.streams, args.registers, args.messages, args.interval))
+        print(f"  {name:<5} wall={result['wall_s']:.2f} s  "
+              f"max_chunk_gap={result['max_chunk_gap_ms']:.1f} ms  "
+              f"max_loop_lag={result['max_loop_lag_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Full-text search benchmark for `/search` over a large message table.
+
+Fills a temporary database with `--messages` chat messages of random words drawn from a Zipf-like vocabulary,
+so a few words appear in a large share of messages and most are rare, then times `search_messages` for common,
+rare, multi-word, prefix and filtered queries.
+
+Usage:
+    python -m benchmarks.bench_search --messages 1000000
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import sqlite3
+import statistics
+import string
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.chdir(tempfile.mkdtemp(prefix="bench-search-"))  # Before the app opens its database file
+
+from app.database.compression import register_sql_functions
+from app.database.db import AsyncSessionLocal, async_engine, engine, init_database
+from app.models.request import ContextSearchRequest
+from app.services.search import search_messages
+
+VOCABULARY = sorted({
+    "".join(random.Random(index).choices(string.ascii_lowercase, k=random.Random(-index).randint(3, 10)))
+    for index in range(20_000)
+}, key=lambda word: (len(word), word))
+CUMULATIVE_WEIGHTS = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(VOCABULARY))))
+SESSION_SIZE = 50
+
+
+def fill(messages: int) -> None:
+    rng = random.Random(7)
+    started = datetime(2024, 1, 1)
+    connection = sqlite3.connect("focal_first_ai.db")
+    connection.execute("PRAGMA foreign_keys=ON")
+    register_sql_functions(connection)
+    sessions = messages // SESSION_SIZE + 1
+    connection.executemany(
+        "INSERT INTO chat_sessions (session_name, session_id, archived, favorite, created_at, version, topic) "
+        "VALUES (?, ?, ?, 0, ?, 0, ?)",
+        (
+            (f"Session {index}", f"s{index}", index % 5 == 0, started.strftime("%Y-%m-%d %H:%M:%S.%f"),
+             "code" if index % 3 == 0 else "general")
+            for index in range(sessions)
+        )
+    )
+    batch = 50_000
+    for first in range(0, messages, batch):
+        rows = []
+        for index in range(first, min(first + batch, messages)):
+            words = rng.choices(VOCABULARY, cum_weights=CUMULATIVE_WEIGHTS, k=rng.randint(8, 40))
+            created_at = (started + timedelta(seconds=index * 30)).strftime("%Y-%m-%d %H:%M:%S.%f")
+            rows.append((f"s{index // SESSION_SIZE}", f"m{index}", "USER", " ".join(words), created_at))
+        # The FTS index is maintained by the insert trigger, as in the app
+        connection.executemany(
+            "INSERT INTO chat_messages (session_id, message_id, role, content, created_at) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+        connection.commit()
+    connection.execute("INSERT INTO chat_messages_fts (chat_messages_fts) VALUES ('optimize')")
+    connection.commit()
+    connection.close()
+
+
+async def timed(request: ContextSearchRequest, repeats: int) -> (float, float, int):
+    timings, found = [], 0
+    async with AsyncSessionLocal() as db:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            found = len(await search_messages(db, request, limit=20))
+            timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1], found
+
+
+async def run(repeats: int) -> None:
+    cases = {
+        "common word": ContextSearchRequest(query=VOCABULARY[0]),
+        "mid word": ContextSearchRequest(query=VOCABULARY[150]),
+        "rare word": ContextSearchRequest(query=VOCABULARY[15_000]),
+        "two words": ContextSearchRequest(query=f"{VOCABULARY[3]} {VOCABULARY[40]}"),
+        "prefix": ContextSearchRequest(query=f"{VOCABULARY[5_000][:4]}*"),
+        "archived": ContextSearchRequest(query=VOCABULARY[150], mode="archived"),
+        "topic+date": ContextSearchRequest(
+            query=VOCABULARY[150], topic="code",
+            start_date=datetime(2024, 3, 1).date(), end_date=datetime(2024, 6, 1).date()
+        ),
+    }
+    for name, request in cases.items():
+        p50, p95, found = await timed(request, repeats)
+        print(f"  {name:<11} p50={p50:7.2f} ms  p95={p95:7.2f} ms  results={found}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    # Keep SQL logging out of the timings
+    engine.echo = async_engine.echo = False
+    init_database()
+
+    started = time.perf_counter()
+    fill(args.messages)
+    print(f"{args.messages} messages indexed in {time.perf_counter() - started:.1f} s")
+    asyncio.run(run(args.repeats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Pagination benchmark for `/chat/all/` over a large session table.
+
+Fills a temporary database with `--sessions` chat sessions, then times `get_chat_sessions` fetching pages at
+increasing depth in both modes:
+
+* offset - `page`/`limit`: SQLite steps over every earlier row before the page starts
+* cursor - `cursor`/`limit`: the page is looked up through the (created_at, id) index
+
+Totals are cached, so after the first request neither mode runs `COUNT(*)` again.
+
+Usage:
+    python -m benchmarks.bench_session_pagination --sessions 100000 --limit 50
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.chdir(tempfile.mkdtemp(prefix="bench-pagination-"))  # Before the app opens its database file
+
+from sqlalchemy import select
+
+from app.database.db import AsyncSessionLocal, async_engine, engine, init_database
+from app.database.schema import ChatSession
+from app.routes.chat import get_chat_sessions
+from app.utils.pagination import encode_cursor
+
+
+def fill(sessions: int) -> None:
+    started = datetime(2024, 1, 1)
+    connection = sqlite3.connect("focal_first_ai.db")
+    connection.executemany(
+        "INSERT INTO chat_sessions (session_name, session_id, archived, favorite, created_at) VALUES (?, ?, ?, ?, ?)",
+        (
+            (f"Session {index}", f"bench-{index}", index % 7 == 0, index % 11 == 0,
+             (started + timedelta(seconds=index)).strftime("%Y-%m-%d %H:%M:%S.%f"))
+            for index in range(sessions)
+        )
+    )
+    connection.commit()
+    connection.close()
+
+
+async def fetch(**params) -> dict:
+    async with AsyncSessionLocal() as db:
+        return await get_chat_sessions(
+            archived=False, favorite=False, start_date=None, end_date=None, db=db,
+            **{"page": 1, "cursor": None, **params}
+        )
+
+
+async def timed(repeats: int, **params) -> float:
+    started = time.perf_counter()
+    for _ in range(repeats):
+        await fetch(**params)
+    return (time.perf_counter() - started) / repeats * 1000
+
+
+async def run(sessions: int, limit: int, repeats: int) -> None:
+    await fetch(limit=limit)  # Warm the connection pool and the cached total
+
+    for fraction in (0.0, 0.5, 0.99):
+        page = int(sessions * fraction) // limit + 1
+        async with AsyncSessionLocal() as db:
+            # The cursor that a client walking the pages would hold for this page
+            previous = (await db.execute(
+                select(ChatSession.created_at, ChatSession.id)
+                .order_by(ChatSession.created_at, ChatSession.id)
+                .offset((page - 1) * limit - 1)
+                .limit(1)
+            )).first() if page > 1 else None
+        cursor = encode_cursor(*previous) if previous else None
+
+        offset_ms = await timed(repeats, page=page, limit=limit)
+        cursor_ms = await timed(repeats, cursor=cursor, limit=limit)
+        print(f"  page {page:>6}  offset={offset_ms:7.2f} ms  cursor={cursor_ms:6.2f} ms")
+
+    started = time.perf_counter()
+    pages, cursor = 0, None
+    while True:
+        result = await fetch(cursor=cursor, limit=limit)
+        pages += 1
+        cursor = result["nextCursor"]
+        if cursor is None:
+            break
+    print(f"  walked {pages} pages by cursor in {time.perf_counter() - started:.2f} s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    # Keep SQL logging out of the timings
+    engine.echo = async_engine.echo = False
+    init_database()
+    fill(args.sessions)
+
+    print(f"{args.sessions} sessions, {args.limit} per page")
+    asyncio.run(run(args.sessions, args.limit, args.repeats))
+
+
+if __name__ == "__main__":
+    main()
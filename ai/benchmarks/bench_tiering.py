@@ -0,0 +1,171 @@
+"""
+Storage tiering benchmark: size of the main database file and live query latency before and after archived
+sessions move to the cold file.
+
+Fills a temporary database with `--sessions` sessions of `--session-size` messages each, `--archived` of them
+archived, then moves the archived ones with `SessionTiering.rebalance()`, compacts both files with
+`SpaceReclaimer.reclaim()` as the app does after a move, and reports:
+
+* the main and cold file sizes, both after VACUUM
+* p50 latency of the live session list, of loading a live conversation and of a search over the main file
+* p50 latency of the archived session list, now read from the attached cold file
+
+Usage:
+    python -m benchmarks.bench_tiering --sessions 20000 --archived 0.8
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+os.chdir(tempfile.mkdtemp(prefix="bench-tiering-"))  # Before the app opens its database file
+
+from app.database.compression import register_sql_functions
+from app.database.db import AsyncSessionLocal, async_engine, async_write_engine, cold_storage, engine, init_database
+from app.models.request import ContextSearchRequest
+from app.routes.chat import get_chat_sessions, get_conversation
+from app.services.db_writer import db_writer
+from app.services.read_cache import read_cache
+from app.services.search import search_messages
+from app.services.session_counts import session_counts
+from app.services.session_tiers import session_tiers
+from app.services.space_reclaimer import space_reclaimer
+
+WORDS = (
+    "the a to of and in that is for it with as on be this are by or not you can we an use function value "
+    "return list dictionary key error file data request response server client model query table index"
+).split()
+
+
+def fill(sessions: int, session_size: int, archived: float) -> None:
+    rng = random.Random(11)
+    started = datetime(2024, 1, 1)
+    connection = sqlite3.connect("focal_first_ai.db")
+    register_sql_functions(connection)
+    connection.executemany(
+        "INSERT INTO chat_sessions (session_name, session_id, archived, favorite, created_at, version) "
+        "VALUES (?, ?, ?, 0, ?, 0)",
+        (
+            (f"Session {index}", f"s{index}", int(rng.random() < archived),
+             (started + timedelta(minutes=index)).strftime("%Y-%m-%d %H:%M:%S.%f"))
+            for index in range(sessions)
+        )
+    )
+    connection.executemany(
+        "INSERT INTO chat_messages (session_id, message_id, role, content, created_at) VALUES (?, ?, ?, ?, ?)",
+        (
+            (
+                f"s{index // session_size}", f"m{index}", "USER" if index % 2 == 0 else "ASSISTANT",
+                " ".join(rng.choices(WORDS, k=rng.randint(10, 120))),
+                (started + timedelta(seconds=index)).strftime("%Y-%m-%d %H:%M:%S.%f"),
+            )
+            for index in range(sessions * session_size)
+        )
+    )
+    connection.commit()
+    connection.close()
+
+
+def file_size(path: str) -> int:
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    connection.execute("VACUUM")
+    connection.close()
+    return os.path.getsize(path)
+
+
+async def p50(run: Callable[[int], Awaitable[object]], repeats: int) -> float:
+    timings = []
+    for index in range(repeats):
+        # Every call goes to the database, not to the app's caches
+        read_cache.invalidate([])
+        session_counts.invalidate()
+        started = time.perf_counter()
+        await run(index)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def measure(live_ids, repeats: int):
+    read_cache.invalidate(live_ids)  # Conversations rendered by an earlier measurement
+    async def live_list(index):
+        async with AsyncSessionLocal() as db:
+            await get_chat_sessions(page=1 + index % 20, limit=20, archived=False, favorite=False,
+                                    start_date=None, end_date=None, cursor=None, db=db)
+
+    async def archived_list(index):
+        async with AsyncSessionLocal() as db:
+            await get_chat_sessions(page=1 + index % 20, limit=20, archived=True, favorite=False,
+                                    start_date=None, end_date=None, cursor=None, db=db)
+
+    async def conversation(index):
+        async with AsyncSessionLocal() as db:
+            await get_conversation(live_ids[index % len(live_ids)], limit=None, before=None, if_none_match=None, db=db)
+
+    async def search(index):
+        async with AsyncSessionLocal() as db:
+            await search_messages(db, ContextSearchRequest(query=WORDS[index % len(WORDS)] + " index"))
+
+    return {
+        "live list": await p50(live_list, repeats),
+        "live conversation": await p50(conversation, repeats),
+        "live search": await p50(search, repeats),
+        "archived list": await p50(archived_list, repeats),
+    }
+
+
+async def move() -> float:
+    db_writer.start()
+    started = time.perf_counter()
+    await db_writer.submit(session_tiers.rebalance)
+    await space_reclaimer.reclaim()
+    elapsed = time.perf_counter() - started
+    await db_writer.stop()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20_000)
+    parser.add_argument("--session-size", type=int, default=20)
+    parser.add_argument("--archived", type=float, default=0.8, help="Share of archived sessions")
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    # Keep SQL logging out of the timings
+    engine.echo = async_engine.echo = async_write_engine.echo = False
+    init_database()
+
+    fill(args.sessions, args.session_size, args.archived)
+    connection = sqlite3.connect("focal_first_ai.db")
+    live_ids = [row[0] for row in connection.execute("SELECT session_id FROM chat_sessions WHERE archived = 0")]
+    archived_ids = [row[0] for row in connection.execute("SELECT session_id FROM chat_sessions WHERE archived = 1")]
+    connection.close()
+    random.Random(5).shuffle(live_ids)
+
+    size_before = file_size("focal_first_ai.db")
+    before = asyncio.run(measure(live_ids, args.repeats))
+    asyncio.run(async_engine.dispose())
+
+    elapsed = asyncio.run(move())
+    asyncio.run(async_write_engine.dispose())
+    hot_size, cold_size = file_size("focal_first_ai.db"), file_size(cold_storage.path)
+    after = asyncio.run(measure(live_ids, args.repeats))
+    asyncio.run(async_engine.dispose())
+
+    stats = session_tiers.stats()
+    print(f"{args.sessions} sessions x {args.session_size} messages, {len(archived_ids)} archived, "
+          f"moved {stats['demoted_sessions']} sessions / {stats['moved_messages']} messages in {elapsed:.1f} s")
+    print(f"  main file   {size_before / 2**20:8.1f} MiB -> {hot_size / 2**20:6.1f} MiB, cold file {cold_size / 2**20:.1f} MiB")
+    for name in before:
+        print(f"  {name:18} p50 {before[name]:7.2f} ms -> {after[name]:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
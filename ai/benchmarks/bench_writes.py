@@ -0,0 +1,122 @@
+"""
+Concurrent write benchmark: every client committing on its own versus the single `db_writer` queue.
+
+Runs `--clients` concurrent clients, each registering `--writes` chats of `--messages` messages and renaming
+every chat it registered, through two paths:
+
+* direct - each write opens its own `AsyncSession` and commits, as the routes did before the writer
+* writer - each write is submitted to a `DatabaseWriter`, which group-commits the writes queued together
+
+The benchmark reports throughput, p50/p99 write latency and how many writes failed, e.g. with
+"database is locked". Both paths use a fresh database in a temporary directory.
+
+Usage:
+    python -m benchmarks.bench_writes --clients 32 --writes 20 --messages 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from typing import Awaitable, Callable, List
+
+os.chdir(tempfile.mkdtemp(prefix="bench-writes-"))  # Before the app opens its database file
+
+from sqlalchemy import update
+
+from app.database.db import AsyncSessionLocal, async_engine, async_write_engine, engine, init_database
+from app.database.schema import ChatSession
+from app.models.chat_model import ChatMessageResponse
+from app.models.request import ChatRegister
+from app.services.db_writer import DatabaseWriter, WriteOperation
+from app.services.ingestion import ingest_chats
+
+
+def make_register(messages: int) -> ChatRegister:
+    session_id = uuid.uuid4().hex
+    return ChatRegister(
+        session_id=session_id,
+        session_name="Benchmark",
+        model="local",
+        variant="bench",
+        messages=[
+            ChatMessageResponse(message_id=f"{session_id}-{index}", role="user", content=f"message {index}")
+            for index in range(messages)
+        ],
+    )
+
+
+def rename(session_id: str) -> WriteOperation:
+    async def apply(db):
+        await db.execute(
+            update(ChatSession).where(ChatSession.session_id == session_id)
+            .values(session_name="Renamed", version=ChatSession.version + 1)
+        )
+    return apply
+
+
+async def write_direct(operation: WriteOperation) -> None:
+    async with AsyncSessionLocal() as db:
+        await operation(db)
+        await db.commit()
+
+
+async def client(submit: Callable[[WriteOperation], Awaitable], writes: int, messages: int,
+                 latencies: List[float], errors: List[str]) -> None:
+    for _ in range(writes):
+        chat = make_register(messages)
+        for operation in (lambda db: ingest_chats(db, [chat]), rename(chat.session_id)):
+            started = time.perf_counter()
+            try:
+                await submit(operation)
+                latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                errors.append(str(e))
+
+
+async def run(path: str, clients: int, writes: int, messages: int) -> None:
+    latencies: List[float] = []
+    errors: List[str] = []
+    writer = DatabaseWriter()
+    if path == "writer":
+        writer.start()
+    submit = writer.submit if path == "writer" else write_direct
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(submit, writes, messages, latencies, errors) for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    await writer.stop()
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else float("nan")
+    print(
+        f"  {path:<6} {len(latencies) / elapsed:8.1f} writes/s  "
+        f"p50={statistics.median(latencies) * 1000 if latencies else float('nan'):7.2f} ms  p99={p99:7.2f} ms  "
+        f"failed={len(errors)}" + (f"  batches={writer.batches}" if path == "writer" else "")
+    )
+    if errors:
+        print(f"         first error: {errors[0][:100]}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--writes", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=10)
+    args = parser.parse_args()
+
+    # Keep SQL logging out of the timings
+    engine.echo = async_engine.echo = async_write_engine.echo = False
+    init_database()
+
+    print(f"{args.clients} clients x {args.writes} chats of {args.messages} messages, registered then renamed")
+    for path in ("direct", "writer"):
+        asyncio.run(run(path, args.clients, args.writes, args.messages))
+        asyncio.run(async_engine.dispose())
+        asyncio.run(async_write_engine.dispose())
+
+
+if __name__ == "__main__":
+    main()
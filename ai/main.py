@@ -1,16 +1,50 @@
+from contextlib import asynccontextmanager
+
 import uvicorn
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.database.db import init_database
+from app.routes.backup import router as backup_router
 from app.routes.chat import router as chat_router
+from app.routes.metrics import router as metrics_router
+from app.routes.search import router as search_router
+from app.services.backup import backup_engine
+from app.services.db_writer import db_writer
+from app.services.message_compression import message_compressor
+from app.services.session_tiers import session_tiers
+from app.services.space_reclaimer import space_reclaimer
+from app.services.title_worker import title_jobs
 
 import app.tests.test
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_database()
+
+    # Background workers
+    db_writer.start()
+    title_jobs.start()
+    message_compressor.start()
+    session_tiers.start()
+    space_reclaimer.start()
+    backup_engine.start()
+    yield
+    await backup_engine.stop()
+    await space_reclaimer.stop()
+    await session_tiers.stop()
+    await message_compressor.stop()
+    await title_jobs.stop()
+    await db_writer.stop()
+
+
 # FastAPI app
 app = FastAPI(
     title="localfirst.ai",
     version="0.0.1",
     description="Local First AI | Local First AI Server | Langchain Server",
+    lifespan=lifespan,
 )
 
 # CORS Middleware
@@ -24,7 +58,10 @@ app.add_middleware(
 
 
 # Routes
+app.include_router(backup_router)
 app.include_router(chat_router)
+app.include_router(metrics_router)
+app.include_router(search_router)
 
 
 # Run the FastAPI app